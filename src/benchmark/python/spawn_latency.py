@@ -0,0 +1,67 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    measures the latency of executing a program through a shell
+    (execute_command) and without a shell (execute_argv), with and without
+    writing the output log.
+
+        PYTHONPATH=src/main/python python src/benchmark/python/spawn_latency.py
+"""
+
+from __future__ import print_function
+
+import os
+import subprocess
+import time
+
+from shtub.spawn import spawn_and_capture
+from shtub.testbase import IntegrationTestBase
+
+EXECUTIONS = 200
+
+
+def measure(execute):
+    started = time.time()
+
+    for _ in range(EXECUTIONS):
+        execute()
+
+    return (time.time() - started) / EXECUTIONS
+
+
+def main():
+    test = IntegrationTestBase('run')
+    test.setUp()
+    test.prepare_testbed({'PATH': os.environ.get('PATH', os.defpath)}, [])
+
+    def spawn_through_shell():
+        subprocess.Popen(args=['true'], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                         shell=True, cwd=test.base_dir, env=test.env).communicate()
+
+    try:
+        for name, execute in [('shell spawn', spawn_through_shell),
+                              ('argv spawn', lambda: spawn_and_capture(['true'], test.base_dir, test.env)),
+                              ('execute_command', lambda: test.execute_command('true')),
+                              ('execute_argv', lambda: test.execute_argv(['true']))]:
+            seconds = measure(execute)
+            print('%-16s %8.2f ms per execution' % (name, seconds * 1000))
+    finally:
+        test.tear_down_base_dirs(failed=False)
+
+
+if __name__ == '__main__':
+    main()
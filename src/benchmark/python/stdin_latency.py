@@ -0,0 +1,92 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    measures how long a command stub takes to answer depending on what its
+    stdin is: /dev/null, a regular file or a pipe which never gets any data.
+
+        PYTHONPATH=src/main/python python src/benchmark/python/stdin_latency.py
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from shtub.fixture import Fixture
+from shtub.testbase import STUB_SCRIPT_CONTENT
+
+EXECUTIONS = 10
+
+
+def prepare(base_dir):
+    stubs_dir = os.path.join(base_dir, 'shtub', 'stubs')
+    os.makedirs(stubs_dir)
+    stub_filename = os.path.join(stubs_dir, 'ssh')
+
+    with open(stub_filename, 'w') as stub_file:
+        stub_file.write(STUB_SCRIPT_CONTENT)
+    os.chmod(stub_filename, 0o755)
+
+    current_dir = os.getcwd()
+    os.chdir(base_dir)
+    try:
+        with Fixture(base_dir) as when:
+            when.calling('ssh').then_return(0)
+    finally:
+        os.chdir(current_dir)
+
+    return stub_filename
+
+
+def measure(stub_filename, base_dir, env, open_stdin):
+    started = time.time()
+
+    for _ in range(EXECUTIONS):
+        stdin = open_stdin()
+        subprocess.call([stub_filename], stdin=stdin, cwd=base_dir, env=env)
+        if hasattr(stdin, 'close'):
+            stdin.close()
+
+    return (time.time() - started) / EXECUTIONS
+
+
+def main():
+    base_dir = tempfile.mkdtemp()
+    try:
+        stub_filename = prepare(base_dir)
+        regular_file = os.path.join(base_dir, 'input')
+        with open(regular_file, 'w') as input_file:
+            input_file.write('Hello world')
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+
+        for name, open_stdin in [('/dev/null', lambda: open(os.devnull)),
+                                 ('regular file', lambda: open(regular_file)),
+                                 ('silent pipe', lambda: subprocess.PIPE)]:
+            seconds = measure(stub_filename, base_dir, env, open_stdin)
+            print('%-14s %8.1f ms per execution' % (name, seconds * 1000))
+    finally:
+        shutil.rmtree(base_dir)
+
+
+if __name__ == '__main__':
+    main()
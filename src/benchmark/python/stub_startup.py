@@ -0,0 +1,117 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    compares the startup of the command stub and the stub launcher: the
+    import time as reported by "python -X importtime" and the wall clock
+    time of complete executions with stdin from /dev/null.
+
+        PYTHONPATH=src/main/python python src/benchmark/python/stub_startup.py
+"""
+
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import shtub
+from shtub.fixture import Fixture
+from shtub.testbase import STUB_SCRIPT_CONTENT, launcher_script_content
+
+EXECUTIONS = 20
+
+
+def measure_import_time(module, interpreter_flags):
+    """
+        returns the cumulative import time of the given module in
+        microseconds and the count of imported modules.
+    """
+
+    shtub_path = os.path.dirname(os.path.dirname(os.path.abspath(shtub.__file__)))
+    statement = 'import sys; sys.path.insert(0, %r); import %s' % (shtub_path, module)
+    process = subprocess.Popen([sys.executable] + interpreter_flags + ['-X', 'importtime', '-c', statement],
+                               stderr=subprocess.PIPE)
+    _, stderr = process.communicate()
+
+    lines = [line.split('|') for line in stderr.decode('utf-8').splitlines()[1:]
+             if line.startswith('import time:')]
+    top_level_lines = [line for line in lines if not line[2].startswith('  ')]
+
+    return sum(int(line[1]) for line in top_level_lines), len(lines)
+
+
+def write_stub(stubs_dir, command, content):
+    stub_filename = os.path.join(stubs_dir, command)
+
+    with open(stub_filename, 'w') as stub_file:
+        stub_file.write(content)
+    os.chmod(stub_filename, 0o755)
+
+    return stub_filename
+
+
+def measure_executions(stub_filename, base_dir, env):
+    started = time.time()
+
+    for _ in range(EXECUTIONS):
+        with open(os.devnull) as stdin:
+            subprocess.call([stub_filename], stdin=stdin, cwd=base_dir, env=env)
+
+    return (time.time() - started) / EXECUTIONS
+
+
+def main():
+    if sys.version_info < (3, 7):
+        print('"-X importtime" requires python 3.7 or later.')
+        return
+
+    for name, module, flags in [('command stub', 'shtub.commandstub', []),
+                                ('stub launcher', 'shtub.launcher', ['-I', '-S'])]:
+        microseconds, count_of_modules = measure_import_time(module, flags)
+        print('%-14s %8.1f ms import time, %3d modules' % (name, microseconds / 1000, count_of_modules))
+
+    base_dir = tempfile.mkdtemp()
+    try:
+        stubs_dir = os.path.join(base_dir, 'shtub', 'stubs')
+        os.makedirs(stubs_dir)
+        stubs = [('command stub', write_stub(stubs_dir, 'ssh', STUB_SCRIPT_CONTENT)),
+                 ('stub launcher', write_stub(stubs_dir, 'scp', launcher_script_content()))]
+
+        current_dir = os.getcwd()
+        os.chdir(base_dir)
+        try:
+            with Fixture(base_dir) as when:
+                when.calling('ssh').then_return(0)
+                when.calling('scp').then_return(0)
+        finally:
+            os.chdir(current_dir)
+
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.pathsep.join(sys.path)
+
+        for name, stub_filename in stubs:
+            seconds = measure_executions(stub_filename, base_dir, env)
+            print('%-14s %8.1f ms per execution' % (name, seconds * 1000))
+    finally:
+        shutil.rmtree(base_dir)
+
+
+if __name__ == '__main__':
+    main()
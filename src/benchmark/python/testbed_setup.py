@@ -0,0 +1,60 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    measures the per-test setup time of prepare_testbed with and without
+    cloning the testbed from a template.
+
+        PYTHONPATH=src/main/python python src/benchmark/python/testbed_setup.py
+"""
+
+from __future__ import print_function
+
+import shutil
+import time
+
+from shtub.testbase import IntegrationTestBase
+
+TESTS = 200
+STUBS = ['command%02d' % number for number in range(30)]
+
+
+def measure(use_template):
+    base_dirs = []
+    started = time.time()
+
+    for _ in range(TESTS):
+        test = IntegrationTestBase('run')
+        test.setUp()
+        test.prepare_testbed({}, STUBS, use_template=use_template)
+        base_dirs.append(test.base_dir)
+
+    elapsed = time.time() - started
+
+    for base_dir in base_dirs:
+        shutil.rmtree(base_dir)
+
+    return elapsed / TESTS
+
+
+def main():
+    for name, use_template in [('fresh testbed', False), ('from template', True)]:
+        seconds = measure(use_template)
+        print('%-14s %8.3f ms per test (%d stubs)' % (name, seconds * 1000, len(STUBS)))
+
+
+if __name__ == '__main__':
+    main()
@@ -68,9 +68,9 @@ class IntegrationTestSupport (shtub.testbase.IntegrationTestBase):
                'PYTHONPATH': self.create_python_path()}
         return env
 
-    def prepare_default_testbed(self, stubs_list):
+    def prepare_default_testbed(self, stubs_list, **testbed_options):
         env = self.create_environment()
-        self.prepare_testbed(env, stubs_list)
+        self.prepare_testbed(env, stubs_list, **testbed_options)
 
     def assert_file_permissions(self, filename, expected_permissions):
         actual_permissions = stat.S_IMODE(os.stat(filename).st_mode)
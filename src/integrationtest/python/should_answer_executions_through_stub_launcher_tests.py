@@ -0,0 +1,73 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+import unittest
+
+import integrationtest_support
+
+from shtub import LOG_FILENAME
+from shtub.fixture import Fixture
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub'], use_launcher=True)
+        self.create_command_wrapper(
+            'command_wrapper', 'command_stub', ['-arg1', '-arg2', '-arg3'], 'stdin')
+
+        with open(os.path.join(self.stubs_dir, 'command_stub')) as stub_file:
+            self.assertEqual('#!%s' % sys.executable, stub_file.readline().split(' ')[0])
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1', '-arg2', '-arg3').and_input('stdin') \
+                .then_answer('Hello world.', 'Hello error!', 0) \
+                .then_answer('Spam eggs.', 'Error!', 21)
+
+        actual_first_result = self.execute_command_and_capture_output('command_wrapper')
+        actual_second_result = self.execute_command_and_capture_output('command_wrapper')
+
+        self.assertFalse(os.path.exists(os.path.join(self.base_dir, LOG_FILENAME)))
+
+        actual_third_return_code = self.execute_command('command_stub -unexpected')
+
+        self.assertEqual((0, 'Hello world.', 'Hello error!'), actual_first_result)
+        self.assertEqual((21, 'Spam eggs.', 'Error!'), actual_second_result)
+        self.assertEqual(255, actual_third_return_code)
+        self.assertTrue(os.path.exists(os.path.join(self.base_dir, LOG_FILENAME)))
+
+        with self.verify() as verify:
+            verify.called('command_stub').with_arguments(
+                '-arg1', '-arg2', '-arg3').and_input('stdin')
+            verify.called('command_stub').with_arguments(
+                '-arg1', '-arg2', '-arg3').and_input('stdin')
+
+
+    def test_should_not_use_compiled_stubs_of_earlier_fixtures(self):
+        self.prepare_default_testbed(['command_stub'], use_launcher=True)
+
+        with self.fixture() as when:
+            when.calling('command_stub').then_return(1)
+
+        with Fixture(self.base_dir) as when:
+            when.calling('command_stub').then_return(2)
+
+        self.assertEqual(2, self.execute_command('command_stub'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub', 'input_stub'], use_shell_functions=True)
+        script_filename = os.path.join(self.stubs_dir, 'sut')
+
+        with open(script_filename, 'w') as script_file:
+            script_file.write('#!/usr/bin/env bash\n'
+                              'command_stub -arg1 -arg2\n'
+                              'echo -n stdin | input_stub -arg1\n')
+
+        os.chmod(script_filename, 0o755)
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1').then_answer('Hello world.\n', None, 0)
+            when.calling('input_stub').and_input('stdin').then_answer('Spam eggs.', 'Error!', 21)
+
+        actual_result = self.execute_command_and_capture_output('sut')
+
+        self.assertEqual((21, 'Hello world.\nSpam eggs.', 'Error!'), actual_result)
+
+        with open(os.path.join(self.base_dir, 'shtub', 'shell-functions')) as shell_functions_file:
+            shell_functions = shell_functions_file.read()
+
+        self.assertTrue('command_stub () {' in shell_functions)
+        self.assertFalse('input_stub () {' in shell_functions)
+
+        with self.verify() as verify:
+            verify.called('command_stub').at_least_with_arguments('-arg1', '-arg2')
+            verify.called('input_stub').at_least_with_arguments('-arg1').with_input('stdin')
+
+
+if __name__ == '__main__':
+    unittest.main()
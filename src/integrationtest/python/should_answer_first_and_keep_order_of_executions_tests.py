@@ -0,0 +1,85 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test_should_keep_order_of_answers(self):
+        self.prepare_default_testbed(['first_stub', 'second_stub', 'third_stub'], use_launcher=True)
+        script_filename = os.path.join(self.stubs_dir, 'sut')
+
+        with open(script_filename, 'w') as script_file:
+            script_file.write('#!/usr/bin/env bash\n'
+                              'first_stub -arg1 | second_stub -arg2\n'
+                              'third_stub -arg3\n')
+
+        os.chmod(script_filename, 0o755)
+
+        with self.fixture(answer_first=True) as when:
+            when.calling('first_stub').then_answer('Hello world.', 'Hello error!', 0)
+            when.calling('second_stub').and_input('Hello world.').then_answer('Spam eggs.', None, 0)
+            when.calling('third_stub').then_return(21)
+
+        actual_result = self.execute_command_and_capture_output('sut')
+
+        self.assertEqual((21, 'Spam eggs.', 'Hello error!'), actual_result)
+
+        with self.verify() as verify:
+            verify.called('first_stub').at_least_with_arguments('-arg1')
+            verify.called('second_stub').at_least_with_arguments('-arg2').with_input('Hello world.')
+            verify.called('third_stub').at_least_with_arguments('-arg3')
+
+    def test_should_not_block_stubs_reading_the_answer(self):
+        self.prepare_default_testbed(['big_stub', 'other_stub'], use_launcher=True)
+
+        with self.fixture(answer_first=True) as when:
+            when.calling('big_stub').then_answer(('x' * 50000 + '\n') * 3, None, 0)
+            when.calling('other_stub').then_return(0)
+
+        actual_return_code = self.execute_command('big_stub | while read line; do other_stub; done')
+
+        self.assertEqual(0, actual_return_code)
+
+        with self.verify() as verify:
+            verify.called('big_stub')
+            verify.called('other_stub')
+            verify.called('other_stub')
+            verify.called('other_stub')
+
+
+    def test_should_record_execution_when_reader_closes_pipe_early(self):
+        self.prepare_default_testbed(['big_stub', 'other_stub'], use_launcher=True)
+
+        with self.fixture(answer_first=True) as when:
+            when.calling('big_stub').then_answer(('x' * 50000 + '\n') * 3, None, 0)
+            when.calling('other_stub').then_return(0)
+
+        actual_return_code = self.execute_command('big_stub | head -c 1; other_stub')
+
+        self.assertEqual(0, actual_return_code)
+
+        with self.verify() as verify:
+            verify.called('big_stub')
+            verify.called('other_stub')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import subprocess
+import time
+import unittest
+
+import integrationtest_support
+
+COMMANDS = ['ssh', 'rsync', 'curl', 'scp']
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def execute_in_parallel(self, commands):
+        """
+            starts the given stubs at once with a stdin pipe which never gets
+            any data and returns the seconds it took until all of them exited.
+        """
+        started = time.time()
+        processes = [subprocess.Popen([os.path.join(self.stubs_dir, command), '--parallel'],
+                                      stdin=subprocess.PIPE,
+                                      stdout=subprocess.PIPE,
+                                      stderr=subprocess.PIPE,
+                                      cwd=self.base_dir,
+                                      env=self.env)
+                     for command in commands]
+
+        for process in processes:
+            process.stdout.read()
+            process.wait()
+            process.stdin.close()
+            process.stdout.close()
+            process.stderr.close()
+            self.assertEqual(0, process.returncode)
+
+        return time.time() - started
+
+    def test(self):
+        self.prepare_default_testbed(COMMANDS)
+
+        with self.fixture() as when:
+            for command in COMMANDS:
+                when.calling(command).at_least_with_arguments('--parallel').with_input('').then_return(0)
+
+        elapsed_for_one_caller = self.execute_in_parallel(COMMANDS[:1])
+        elapsed_for_all_callers = self.execute_in_parallel(COMMANDS)
+
+        throughput_of_one_caller = 1 / elapsed_for_one_caller
+        throughput_of_all_callers = len(COMMANDS) / elapsed_for_all_callers
+
+        self.assertTrue(throughput_of_all_callers > 2 * throughput_of_one_caller,
+                        'Throughput of %d parallel callers (%.2f/s) is not higher than of one caller (%.2f/s).'
+                        % (len(COMMANDS), throughput_of_all_callers, throughput_of_one_caller))
+
+        with self.verify() as verify:
+            self.assertEqual(1 + len(COMMANDS), len(verify.executions))
+            verify.finished()
+
+
+if __name__ == '__main__':
+    unittest.main()
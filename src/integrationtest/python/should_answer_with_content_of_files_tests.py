@@ -0,0 +1,63 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+
+import integrationtest_support
+
+from shtub.answer import FileSource
+
+DUMP = 'dump line\n' * 20000
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def assert_answers_with_content_of_files(self, **testbed_options):
+        self.prepare_default_testbed(['command_stub'], **testbed_options)
+        dump_filename = os.path.join(self.base_dir, 'dump')
+
+        with open(dump_filename, 'w') as dump_file:
+            dump_file.write(DUMP)
+
+        with self.fixture() as when:
+            when.calling('command_stub').then_answer(FileSource(dump_filename), 'warning', 0)
+
+        actual_result = self.execute_command_and_capture_output('command_stub -arg1')
+
+        self.assertEqual((0, DUMP, 'warning'), actual_result)
+
+        with open(os.path.join(self.base_dir, 'shtub', 'stub-configurations')) as configurations_file:
+            self.assertTrue(len(configurations_file.read()) < 1000)
+
+        with self.verify() as verify:
+            verify.called('command_stub').at_least_with_arguments('-arg1')
+
+    def test_command_stub(self):
+        self.assert_answers_with_content_of_files()
+
+    def test_stub_launcher(self):
+        self.assert_answers_with_content_of_files(use_launcher=True)
+
+    def test_stub_server(self):
+        self.assert_answers_with_content_of_files(use_stub_server=True)
+
+    def test_shell_functions(self):
+        self.assert_answers_with_content_of_files(use_shell_functions=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub1', 'command_stub2'], use_template=True)
+        first_stub = os.path.join(self.stubs_dir, 'command_stub1')
+
+        self.set_base_dir(None)
+        self.prepare_default_testbed(['command_stub1', 'command_stub2'], use_template=True)
+        second_stub = os.path.join(self.stubs_dir, 'command_stub1')
+
+        self.assertNotEqual(first_stub, second_stub)
+        self.assertEqual(os.stat(first_stub).st_ino, os.stat(second_stub).st_ino)
+
+        with self.fixture() as when:
+            when.calling('command_stub2').at_least_with_arguments('-arg1').then_write('Hello world.')
+
+        actual_result = self.execute_command_and_capture_output('command_stub2 -arg1')
+
+        self.assertEqual((0, 'Hello world.', ''), actual_result)
+
+        with self.verify() as verify:
+            verify.called('command_stub2').at_least_with_arguments('-arg1')
+
+
+if __name__ == '__main__':
+    unittest.main()
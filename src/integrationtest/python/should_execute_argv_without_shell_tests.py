@@ -0,0 +1,49 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub'])
+        self.create_command_wrapper(
+            'command_wrapper', 'command_stub', ['-arg1', '-arg2'], 'stdin')
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1', '-arg2').and_input('stdin') \
+                .then_answer('Hello world.', 'Hello error!', 0)
+            when.calling('command_stub').at_least_with_arguments('with space') \
+                .then_answer('Spam eggs.', 'Error!', 21)
+
+        actual_first_result = self.execute_argv_and_capture_output(['command_wrapper'])
+        actual_second_return_code = self.execute_argv(['command_stub', 'with space'])
+
+        self.assertEqual((0, 'Hello world.', 'Hello error!'), actual_first_result)
+        self.assertEqual(21, actual_second_return_code)
+        self.assertEqual("command_stub 'with space'", self.read_output(1).command)
+        self.assertEqual('Spam eggs.', self.read_output(1).stdout)
+
+        with self.verify() as verify:
+            verify.called('command_stub').with_arguments('-arg1', '-arg2').and_input('stdin')
+            verify.called('command_stub').with_arguments('with space')
+
+
+if __name__ == '__main__':
+    unittest.main()
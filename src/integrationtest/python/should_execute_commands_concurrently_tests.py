@@ -0,0 +1,53 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import time
+import unittest
+
+import integrationtest_support
+
+COMMANDS = ['ssh', 'rsync', 'curl', 'scp']
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(COMMANDS)
+
+        with self.fixture() as when:
+            for return_code, command in enumerate(COMMANDS):
+                when.calling(command).at_least_with_arguments('-arg1').then_answer(command, None, return_code, 500)
+
+        started = time.time()
+        actual_results = self.execute_commands_concurrently(['%s -arg1 </dev/null' % command for command in COMMANDS])
+        elapsed = time.time() - started
+
+        self.assertEqual([(return_code, command, '') for return_code, command in enumerate(COMMANDS)],
+                         actual_results)
+        self.assertTrue(elapsed < 0.5 * len(COMMANDS), 'Commands took %.2f seconds.' % elapsed)
+        self.assertEqual(len(COMMANDS), self.command_counter)
+
+        for number, command in enumerate(COMMANDS):
+            self.assertEqual(command, self.read_output(number).stdout)
+
+        with self.verify() as verify:
+            actual_commands = [execution.command_input.command for execution in verify.executions]
+            self.assertEqual(sorted(COMMANDS), sorted(actual_commands))
+            verify.finished()
+
+
+if __name__ == '__main__':
+    unittest.main()
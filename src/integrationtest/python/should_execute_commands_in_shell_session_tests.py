@@ -0,0 +1,60 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import signal
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub'])
+        self.create_command_wrapper(
+            'command_wrapper', 'command_stub', ['-arg1'], 'stdin')
+        self.start_shell_session()
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1').and_input('stdin') \
+                .then_answer('Hello world.', 'Hello error!', 0) \
+                .then_answer('Spam eggs.', 'Error!', 21)
+
+        actual_first_result = self.execute_command_and_capture_output('command_wrapper')
+        session_pid = self.shell_session.process.pid
+        actual_second_result = self.execute_command_and_capture_output('command_wrapper')
+
+        self.assertEqual((0, 'Hello world.', 'Hello error!'), actual_first_result)
+        self.assertEqual((21, 'Spam eggs.', 'Error!'), actual_second_result)
+        self.assertEqual(session_pid, self.shell_session.process.pid)
+        self.assertEqual('Spam eggs.', self.read_output(1).stdout)
+
+        os.kill(session_pid, signal.SIGKILL)
+        self.shell_session.process.wait()
+
+        actual_third_result = self.execute_command_and_capture_output('command_wrapper')
+
+        self.assertEqual((21, 'Spam eggs.', 'Error!'), actual_third_result)
+        self.assertEqual(None, self.shell_session)
+
+        with self.verify() as verify:
+            for _ in range(3):
+                verify.called('command_stub').at_least_with_arguments('-arg1').and_input('stdin')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import subprocess
+import unittest
+
+from shtub.interception import Interception
+
+
+class Test (unittest.TestCase):
+
+    def test(self):
+        with Interception() as interception:
+            interception.calling('command_stub').at_least_with_arguments('-arg1').and_input('stdin') \
+                .then_answer('Hello world.', 'Hello error!', 0) \
+                .then_answer('Spam eggs.', 'Error!', 21)
+
+            first_result = subprocess.run(['command_stub', '-arg1', '-arg2'], input='stdin',
+                                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            second_result = subprocess.run('command_stub -arg1', shell=True, input='stdin',
+                                           stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            passed_through_output = subprocess.check_output(['echo', 'not stubbed'], universal_newlines=True)
+
+        self.assertEqual((0, 'Hello world.', 'Hello error!'),
+                         (first_result.returncode, first_result.stdout, first_result.stderr))
+        self.assertEqual((21, 'Spam eggs.', 'Error!'),
+                         (second_result.returncode, second_result.stdout, second_result.stderr))
+        self.assertEqual('not stubbed\n', passed_through_output)
+
+        with interception.verify() as verify:
+            verify.called('command_stub').at_least_with_arguments('-arg1', '-arg2').with_input('stdin')
+            verify.called('command_stub').with_arguments('-arg1').with_input('stdin')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import subprocess
+import unittest
+
+from select import select
+
+import integrationtest_support
+
+from shtub.verification import VerificationException
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub', 'input_stub'])
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1').then_answer('Hello world.', None, 0)
+            when.calling('input_stub').with_read_stdin_timeout(0.5).then_return(0)
+
+        read_file_descriptor, write_file_descriptor = os.pipe()
+        self.addCleanup(os.close, read_file_descriptor)
+        self.addCleanup(os.close, write_file_descriptor)
+        os.write(write_file_descriptor, b'unread')
+
+        return_code = subprocess.call([os.path.join(self.stubs_dir, 'command_stub'), '-arg1'],
+                                      stdin=read_file_descriptor, cwd=self.base_dir, env=self.env)
+
+        self.assertEqual(0, return_code)
+        self.assertEqual(([read_file_descriptor], [], []), select([read_file_descriptor], [], [], 0))
+        self.assertEqual(b'unread', os.read(read_file_descriptor, 1024))
+        self.assertEqual(0, self.execute_command('echo -n stdin | input_stub'))
+
+        with self.verify() as verify:
+            verifier = verify.called('command_stub').at_least_with_arguments('-arg1')
+            self.assertRaises(VerificationException, verifier.with_input, '')
+            verify.called('input_stub').with_input('stdin')
+
+
+if __name__ == '__main__':
+    unittest.main()
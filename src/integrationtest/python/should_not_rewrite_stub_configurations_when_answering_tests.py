@@ -0,0 +1,50 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import unittest
+
+from os.path import join
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed(['command_stub'])
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1') \
+                .then_return(0) \
+                .then_return(1) \
+                .then_return(2)
+
+        stub_configurations_filename = join(self.base_dir, 'shtub', 'stub-configurations')
+
+        with open(stub_configurations_filename) as stub_configurations_file:
+            expected_stub_configurations = stub_configurations_file.read()
+
+        actual_return_codes = [self.execute_command('command_stub -arg1') for _ in range(4)]
+
+        self.assertEqual([0, 1, 2, 2], actual_return_codes)
+
+        with open(stub_configurations_filename) as stub_configurations_file:
+            self.assertEqual(expected_stub_configurations, stub_configurations_file.read())
+
+
+if __name__ == '__main__':
+    unittest.main()
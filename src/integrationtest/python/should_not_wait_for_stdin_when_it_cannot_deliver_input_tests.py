@@ -0,0 +1,69 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import time
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def execute_stub(self, stdin):
+        """
+            executes the ssh stub with the given stdin and returns the return
+            code and the seconds it took until the stub exited.
+        """
+        started = time.time()
+        process = subprocess.Popen([os.path.join(self.stubs_dir, 'ssh'), '-arg1'],
+                                   stdin=stdin,
+                                   cwd=self.base_dir,
+                                   env=self.env)
+        process.wait()
+
+        return process.returncode, time.time() - started
+
+    def assert_answers_without_waiting(self, **testbed_options):
+        self.prepare_default_testbed(['ssh'], **testbed_options)
+
+        with self.fixture() as when:
+            when.calling('ssh').at_least_with_arguments('-arg1').with_read_stdin_timeout(0.1).then_return(0)
+
+        with open(os.devnull) as dev_null:
+            return_code_with_dev_null, elapsed_with_dev_null = self.execute_stub(dev_null)
+
+        return_code_with_silent_pipe, elapsed_with_silent_pipe = self.execute_stub(subprocess.PIPE)
+
+        self.assertEqual(0, return_code_with_dev_null)
+        self.assertEqual(0, return_code_with_silent_pipe)
+        self.assertTrue(elapsed_with_dev_null < 0.9, 'Waited %.2f seconds for /dev/null.' % elapsed_with_dev_null)
+        self.assertTrue(elapsed_with_silent_pipe < 0.9, 'Waited %.2f seconds for silent pipe.' % elapsed_with_silent_pipe)
+
+        with self.verify() as verify:
+            verify.called('ssh').at_least_with_arguments('-arg1').with_input('')
+            verify.called('ssh').at_least_with_arguments('-arg1').with_input('')
+
+    def test_command_stub(self):
+        self.assert_answers_without_waiting()
+
+    def test_stub_server(self):
+        self.assert_answers_without_waiting(use_stub_server=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import integrationtest_support
+
+from shtub.testbase import ram_backed_directory
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def stub_and_execute_command(self):
+        self.prepare_default_testbed(['command_stub'])
+
+        with self.fixture() as when:
+            when.calling('command_stub').at_least_with_arguments('-arg1').then_return(3)
+
+        self.assertEqual(3, self.execute_command('command_stub -arg1'))
+
+        with self.verify() as verify:
+            verify.called('command_stub').at_least_with_arguments('-arg1')
+
+    def test_temporary_base_dir(self):
+        self.set_base_dir(None, ram_backed=True)
+        self.addCleanup(shutil.rmtree, self.base_dir)
+
+        self.stub_and_execute_command()
+
+        if ram_backed_directory():
+            self.assertTrue(self.ram_backed)
+            self.assertTrue(self.base_dir.startswith(ram_backed_directory()))
+
+    def test_given_base_dir(self):
+        parent_dir = tempfile.mkdtemp(prefix='integration-test-')
+        self.addCleanup(shutil.rmtree, parent_dir)
+        self.make_base_dir(os.path.join(parent_dir, 'base-dir'), ram_backed=True)
+
+        if self.state_dir:
+            self.addCleanup(shutil.rmtree, self.state_dir)
+
+        self.stub_and_execute_command()
+
+        if ram_backed_directory():
+            self.assertTrue(os.path.islink(os.path.join(self.base_dir, 'shtub')))
+            self.assertTrue(os.path.exists(os.path.join(self.state_dir, 'executions')))
+
+
+if __name__ == '__main__':
+    unittest.main()
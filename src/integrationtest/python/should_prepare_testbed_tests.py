@@ -40,6 +40,11 @@ class Test (integrationtest_support.IntegrationTestSupport):
         for stub_name in list_of_stubs:
             path_to_stub = os.path.join(actual_testbase.stubs_dir, stub_name)
             self.assert_file_content(path_to_stub, STUB_SCRIPT_CONTENT)
+            self.assertTrue(os.path.islink(path_to_stub))
+
+        actual_stub_scripts = set(os.path.realpath(os.path.join(actual_testbase.stubs_dir, stub_name))
+                                  for stub_name in list_of_stubs)
+        self.assertEqual(1, len(actual_stub_scripts))
 
         test_execution_directory = os.path.join(
             actual_testbase.base_dir, 'shtub')
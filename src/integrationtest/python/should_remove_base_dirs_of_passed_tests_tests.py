@@ -0,0 +1,67 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import unittest
+
+import integrationtest_support
+
+from shtub.testbase import BASE_DIR_REMOVER, IntegrationTestBase
+
+
+def base_dirs_test_case(base_dirs):
+    """
+        returns a test case which records the base directories of its tests
+        in the given dictionary.
+    """
+
+    class TestWithBaseDirs (IntegrationTestBase):
+
+        def test_passes(self):
+            base_dirs['passes'] = self.base_dir
+
+        def test_fails(self):
+            base_dirs['fails'] = self.base_dir
+            self.fail('fails on purpose')
+
+        def test_keeps_base_dir(self):
+            base_dirs['keeps'] = self.base_dir
+            self.cleanup_base_dir = False
+
+    return TestWithBaseDirs
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        base_dirs = {}
+        suite = unittest.defaultTestLoader.loadTestsFromTestCase(base_dirs_test_case(base_dirs))
+        result = unittest.TestResult()
+
+        suite.run(result)
+        BASE_DIR_REMOVER.join()
+
+        self.assertEqual(1, len(result.failures))
+        self.assertFalse(os.path.exists(base_dirs['passes']))
+        self.assertTrue(os.path.exists(base_dirs['fails']))
+        self.assertTrue(os.path.exists(base_dirs['keeps']))
+
+        BASE_DIR_REMOVER.remove(base_dirs['fails'])
+        BASE_DIR_REMOVER.remove(base_dirs['keeps'])
+        BASE_DIR_REMOVER.join()
+
+if __name__ == '__main__':
+    unittest.main()
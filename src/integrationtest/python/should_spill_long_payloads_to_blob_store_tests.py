@@ -0,0 +1,65 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import unittest
+
+import integrationtest_support
+
+LONG_INPUT = 'input line\n' * 20000
+LONG_OUTPUT = 'output line\n' * 20000
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def assert_spills_long_payloads(self, **testbed_options):
+        self.prepare_default_testbed(['command_stub'], **testbed_options)
+        input_filename = os.path.join(self.base_dir, 'input')
+
+        with open(input_filename, 'w') as input_file:
+            input_file.write(LONG_INPUT)
+
+        with self.fixture() as when:
+            when.calling('command_stub').and_input(LONG_INPUT).then_answer(LONG_OUTPUT, None, 0)
+
+        actual_result = self.execute_command_and_capture_output('command_stub -arg1 < input')
+
+        self.assertEqual((0, LONG_OUTPUT, ''), actual_result)
+
+        with open(os.path.join(self.base_dir, 'shtub', 'executions')) as executions_file:
+            self.assertTrue(len(executions_file.read()) < 1000)
+
+        with open(os.path.join(self.base_dir, 'shtub', 'stub-configurations')) as configurations_file:
+            self.assertTrue(len(configurations_file.read()) < 1000)
+
+        self.assertEqual(2, len(os.listdir(os.path.join(self.base_dir, 'shtub', 'blobs'))))
+
+        with self.verify() as verify:
+            verify.called('command_stub').at_least_with_arguments('-arg1').with_input(LONG_INPUT)
+
+    def test_command_stub(self):
+        self.assert_spills_long_payloads()
+
+    def test_stub_launcher(self):
+        self.assert_spills_long_payloads(use_launcher=True)
+
+    def test_stub_server(self):
+        self.assert_spills_long_payloads(use_stub_server=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
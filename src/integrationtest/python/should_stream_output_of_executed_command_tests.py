@@ -0,0 +1,49 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import unittest
+
+import integrationtest_support
+
+
+class Test (integrationtest_support.IntegrationTestSupport):
+
+    def test(self):
+        self.prepare_default_testbed([])
+        self.env['PYTHON'] = sys.executable
+
+        command = '"$PYTHON" -c "import sys; sys.stdout.write(\'x\' * 5000000 + \'end\'); sys.stderr.write(\'error\')"'
+        return_code, stdout, stderr = self.execute_command_and_stream_output(command, tail_limit=10)
+
+        self.assertEqual(0, return_code)
+        self.assertEqual('xxxxxxxend', stdout.tail)
+        self.assertTrue(stdout.truncated)
+        self.assertEqual(5000003, stdout.length)
+        self.assertEqual('error', stderr.tail)
+        self.assertFalse(stderr.truncated)
+
+        with stdout.open() as stdout_file:
+            self.assertEqual('x' * 10, stdout_file.read(10))
+
+        actual_record = self.read_output(0)
+
+        self.assertEqual(5000003, len(actual_record.stdout))
+        self.assertEqual('error', actual_record.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
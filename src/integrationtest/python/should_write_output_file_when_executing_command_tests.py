@@ -44,18 +44,30 @@ class Test (integrationtest_support.IntegrationTestSupport):
         expected_file_content = ('--------------- ENVIRONMENT ----------------\n'
                                  'PATH=%s\n'
                                  'PYTHONPATH=%s\n'
+                                 '================= COMMAND 00 =================\n'
+                                 'command_wrapper\n'
                                  '----------------- STDOUT -------------------\n'
                                  'Hello world!\n'
                                  '----------------- STDERR -------------------\n'
-                                 'Hello error.'
+                                 'Hello error.\n'
+                                 '================= COMMAND 01 =================\n'
+                                 'command_wrapper\n'
+                                 '----------------- STDOUT -------------------\n'
+                                 'Hello world!\n'
+                                 '----------------- STDERR -------------------\n'
+                                 'Hello error.\n'
                                  ) % (self.create_path(), self.create_python_path())
 
-        output_filename_00 = join(self.base_dir, 'shtub', '00-command_wrapper')
-        self.assert_file_content(output_filename_00, expected_file_content)
+        output_log_filename = join(self.base_dir, 'shtub', 'output-log')
+        self.assert_file_content(output_log_filename, expected_file_content)
 
-        output_filename_01 = join(self.base_dir, 'shtub', '01-command_wrapper')
-        self.assert_file_content(output_filename_01, expected_file_content)
+        actual_record = self.read_output(1)
 
+        self.assertEqual(1, actual_record.number)
+        self.assertEqual('command_wrapper', actual_record.command)
+        self.assertEqual(0, actual_record.return_code)
+        self.assertEqual('Hello world!\n', actual_record.stdout)
+        self.assertEqual('Hello error.', actual_record.stderr)
 
 if __name__ == '__main__':
     unittest.main()
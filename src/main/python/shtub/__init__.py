@@ -16,50 +16,131 @@
 
 """
     shtub - shell command stub.
+
+    Command stubs import this package on every execution, so logging and the
+    model classes are imported when they are needed only.
 """
 
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
+import binascii
 import json
-import logging
 import fcntl
 
 import os
 from os.path import join
 
-from shtub.execution import Execution
-from shtub.stubconfiguration import StubConfiguration
-
 __version__ = '${version}'
 
 BASEDIR = 'shtub'
 
+BLOBS_DIRECTORY = join(BASEDIR, 'blobs')
 EXECUTIONS_FILENAME = join(BASEDIR, 'executions')
 CONFIGURED_STUBS_FILENAME = join(BASEDIR, 'stub-configurations')
+ANSWER_CURSORS_FILENAME = join(BASEDIR, 'answer-cursors')
+COMPILED_STUBS_DIRECTORY = join(BASEDIR, 'compiled-stubs')
+DISPATCH_INDEX_DIRECTORY = join(BASEDIR, 'dispatch-index')
 LOCK_FILENAME = join(BASEDIR, 'lock')
 SERIALIZATION_LOCK_FILENAME = join(BASEDIR, 'serialization-lock')
+SHELL_FUNCTIONS_FILENAME = join(BASEDIR, 'shell-functions')
 LOG_FILENAME = join(BASEDIR, 'log')
+OUTPUT_LOG_FILENAME = join(BASEDIR, 'output-log')
+OUTPUT_LOG_INDEX_FILENAME = join(BASEDIR, 'output-log-index')
+OUTPUT_STREAMS_DIRECTORY = join(BASEDIR, 'output-streams')
 STUBS_DIRECTORY = join(BASEDIR, 'stubs')
+STUB_SCRIPTS_DIRECTORY = join(BASEDIR, 'stub-scripts')
+STUB_SERVER_SOCKET_FILENAME = join(BASEDIR, 'stub-server')
 
 READ_STDIN_TIMEOUT_IN_SECONDS = 1
 
+PLACEHOLDER_KEY = 'placeholder'
+
 
 def deserialize_stub_configurations (filename):
     """
         loads the given json file and returns a list of stub configurations.
     """
+    from shtub.stubconfiguration import StubConfiguration
+
     stub_configurations = _load_json_file(filename)
     return list(map(lambda e: StubConfiguration.from_dictionary(e), stub_configurations))
 
 
+class JournalException (Exception):
+
+    """
+        to be raised when a journal contains a record which has not been
+        written completely or a placeholder without its record, e.g. because
+        the writing stub has been killed.
+    """
+
+
 def deserialize_executions (filename):
     """
-        loads the given json file and returns a list of executions.
+        loads the given executions journal and returns a list of executions
+        in the order they have been recorded. Files containing a json array
+        of executions are supported as well.
     """
-    executions = _load_json_file(filename)
+    from shtub.execution import Execution
+
+    with open(filename, mode='r') as journal_file:
+        file_content = journal_file.read()
+
+    if file_content.lstrip().startswith('['):
+        executions = json.loads(file_content)
+    else:
+        executions = _fill_placeholders(filename, _parse_journal(filename, file_content))
+
     return list(map(lambda e: Execution.from_dictionary(e), executions))
 
 
+def append_as_dictionary (filename, dictionarizable):
+    """
+        appends the dictionary of the given object as one line of json to the
+        journal with the given filename. The line is written using a single
+        write to a file opened with O_APPEND, so concurrent appends of
+        several processes do not interleave.
+    """
+    _append_to_journal(filename, dictionarizable.as_dictionary())
+
+
+def reserve_journal_record (filename):
+    """
+        appends a placeholder record to the journal with the given filename
+        and returns its token. The record appended later using
+        append_reserved_record takes the position of the placeholder.
+    """
+    token = binascii.hexlify(os.urandom(8)).decode('ascii')
+    _append_to_journal(filename, {PLACEHOLDER_KEY: token})
+
+    return token
+
+
+def append_reserved_record (filename, token, dictionarizable):
+    """
+        appends the dictionary of the given object as the record of the
+        placeholder with the given token.
+    """
+    dictionary = dictionarizable.as_dictionary()
+    dictionary[PLACEHOLDER_KEY] = token
+    _append_to_journal(filename, dictionary)
+
+
+def _append_to_journal (filename, dictionary):
+    line = json.dumps(dictionary, sort_keys=True) + '\n'
+    data = line.encode('utf-8')
+
+    file_descriptor = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        written = os.write(file_descriptor, data)
+    finally:
+        os.close(file_descriptor)
+
+    if written != len(data):
+        raise JournalException('Could only append %d of %d bytes to journal "%s".'
+                               % (written, len(data), filename))
+
+
 def serialize_as_dictionaries (filename, dictionarizables):
     """
         writes the given execution objects into a json file with the given filename.
@@ -70,6 +151,56 @@ def serialize_as_dictionaries (filename, dictionarizables):
     with open(filename, mode='w') as json_file:
         json_file.write(json_string)
 
+def _parse_journal (filename, file_content):
+    """
+        returns the list of dictionaries of the records in the given journal
+        content and raises a JournalException when a record is torn.
+    """
+    records = []
+    lines = file_content.split('\n')
+
+    for line_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+
+        is_last_line = line_number == len(lines)
+
+        try:
+            if is_last_line:
+                raise ValueError('record is not terminated by a newline')
+            records.append(json.loads(line))
+        except ValueError as error:
+            raise JournalException('Torn record in line %d of journal "%s" (%s): %s'
+                                   % (line_number, filename, error, line))
+
+    return records
+
+
+def _fill_placeholders (filename, records):
+    """
+        returns the given records with the records of placeholders moved to
+        the positions of their placeholders and raises a JournalException
+        when a placeholder has no record, e.g. because its stub has failed.
+    """
+    reserved_records = dict((record[PLACEHOLDER_KEY], record) for record in records
+                            if PLACEHOLDER_KEY in record and len(record) > 1)
+    filled_records = []
+
+    for record in records:
+        if PLACEHOLDER_KEY not in record:
+            filled_records.append(record)
+        elif len(record) == 1:
+            if record[PLACEHOLDER_KEY] not in reserved_records:
+                raise JournalException('Placeholder %s in journal "%s" has no record.'
+                                       % (record[PLACEHOLDER_KEY], filename))
+
+            filled_record = dict(reserved_records[record[PLACEHOLDER_KEY]])
+            del filled_record[PLACEHOLDER_KEY]
+            filled_records.append(filled_record)
+
+    return filled_records
+
+
 def _load_json_file (filename):
     """
         loads the given json file and returns the json content as dictionary.
@@ -85,6 +216,8 @@ def lock (file_name=LOCK_FILENAME):
     """
         creates a file lock and blocks if the file lock is already taken.
     """
+    import logging
+
     if not os.path.exists(BASEDIR):
         os.mkdir(BASEDIR)
 
@@ -100,6 +233,7 @@ def unlock (file_handle):
     """
         releases the given file lock by closing it.
     """
+    import logging
 
     logging.info('Lock released.')
     file_handle.close()
@@ -16,11 +16,70 @@
 
 """
     This module provides a class called Answer, which represents the answer
-    the command stub will send when an stub configuration is fulfilled.
+    the command stub will send when an stub configuration is fulfilled, and
+    the class FileSource, which lets an answer send the content of a file.
 """
 
 __author__ = 'Michael Gruber'
 
+import os
+
+from shtub.blobs import payload_as_dictionary, payload_from_dictionary
+
+
+class FileSource (object):
+
+    """
+        References a file which is the stdout or stderr of an answer. The
+        content of the file is copied when the answer is sent, it is not
+        stored with the stub configurations.
+    """
+
+    def __init__(self, filename):
+        """
+            initializes a new reference to the given file. Relative filenames
+            are relative to the current working directory.
+        """
+
+        self.filename = os.path.abspath(filename)
+
+    def read(self):
+        """
+            returns the content of the file as bytes.
+        """
+
+        with open(self.filename, mode='rb') as source_file:
+            return source_file.read()
+
+    def as_dictionary(self):
+        """
+            returns a dictionary representation of this reference.
+        """
+
+        return {'file': self.filename}
+
+    def __eq__(self, other):
+        return isinstance(other, FileSource) and self.filename == other.filename
+
+    def __ne__(self, other):
+        return not(self == other)
+
+    def __hash__(self):
+        return hash(self.filename)
+
+    def __str__(self):
+        return 'file %s' % self.filename
+
+    __repr__ = __str__
+
+    @staticmethod
+    def from_dictionary(dictionary):
+        """
+            returns a new reference with the properties from the given dictionary.
+        """
+
+        return FileSource(dictionary['file'])
+
 
 class Answer (object):
 
@@ -41,8 +100,8 @@ class Answer (object):
         """
             returns a dictionary representation of this object.
         """
-        return {'stdout': self.stdout,
-                'stderr': self.stderr,
+        return {'stdout': payload_as_dictionary(self.stdout),
+                'stderr': payload_as_dictionary(self.stderr),
                 'return_code': self.return_code,
                 'milliseconds_to_wait': self.milliseconds_to_wait}
 
@@ -70,7 +129,7 @@ class Answer (object):
             returns a new Answer object with the properties from the dictionary.
         """
 
-        return Answer(dictionary['stdout'],
-                      dictionary['stderr'],
+        return Answer(payload_from_dictionary(dictionary['stdout']),
+                      payload_from_dictionary(dictionary['stderr']),
                       dictionary['return_code'],
                       dictionary['milliseconds_to_wait'])
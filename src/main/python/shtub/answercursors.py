@@ -0,0 +1,104 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides functions to keep the answer cursors of stub
+    configurations in a file of fixed-size counters. The n-th counter
+    belongs to the n-th stub configuration, so moving a cursor forward only
+    rewrites a few bytes in place and the file of stub configurations is
+    never rewritten.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import fcntl
+import os
+import struct
+
+CURSOR_FORMAT = '>I'
+CURSOR_SIZE = struct.calcsize(CURSOR_FORMAT)
+
+
+def pack_cursor(current_answer):
+    """
+        returns the counter for the given cursor. Counters store the cursor
+        plus one, so a counter of zero (e.g. a hole in the file) means the
+        cursor has not been written yet.
+    """
+
+    return struct.pack(CURSOR_FORMAT, current_answer + 1)
+
+
+def unpack_cursor(data, initial_answer):
+    """
+        returns the cursor stored in the given counter or initial_answer when
+        the counter has not been written yet.
+    """
+
+    if len(data) != CURSOR_SIZE:
+        return initial_answer
+
+    counter = struct.unpack(CURSOR_FORMAT, data)[0]
+
+    if counter == 0:
+        return initial_answer
+
+    return counter - 1
+
+
+def write_answer_cursors(filename, stub_configurations):
+    """
+        writes the current answer of each of the given stub configurations
+        into the file with the given filename.
+    """
+
+    data = b''.join([pack_cursor(stub_configuration.current_answer)
+                     for stub_configuration in stub_configurations])
+
+    with open(filename, mode='wb') as cursors_file:
+        cursors_file.write(data)
+
+
+def advance_answer_cursor(filename, index, stub_configuration):
+    """
+        reads the cursor of the stub configuration with the given index,
+        returns its next answer and writes the moved cursor back in place.
+        Only the bytes of this cursor are locked while doing so, stubs
+        fulfilling other stub configurations are not blocked. A stub
+        configuration with a static answer is answered without touching the
+        file at all.
+    """
+
+    if stub_configuration.has_static_answer():
+        return stub_configuration.next_answer()
+
+    offset = index * CURSOR_SIZE
+    file_descriptor = os.open(filename, os.O_RDWR | os.O_CREAT, 0o644)
+
+    try:
+        fcntl.lockf(file_descriptor, fcntl.LOCK_EX, CURSOR_SIZE, offset, os.SEEK_SET)
+        os.lseek(file_descriptor, offset, os.SEEK_SET)
+        data = os.read(file_descriptor, CURSOR_SIZE)
+        stub_configuration.current_answer = unpack_cursor(data, stub_configuration.current_answer)
+
+        answer = stub_configuration.next_answer()
+
+        os.lseek(file_descriptor, offset, os.SEEK_SET)
+        os.write(file_descriptor, pack_cursor(stub_configuration.current_answer))
+    finally:
+        os.close(file_descriptor)  # releases the lock as well
+
+    return answer
@@ -0,0 +1,95 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module writes the answers of the stub launcher and of stub
+    configurations answering first. It imports as little as the stub
+    launcher does.
+"""
+
+from __future__ import division
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import os
+import sys
+import time
+
+from shtub import EXECUTIONS_FILENAME, append_reserved_record, reserve_journal_record
+from shtub.blobs import write_payload
+
+
+def write_answer(answer):
+    """
+        writes stdout and stderr of the given answer after waiting the
+        configured time.
+    """
+
+    if answer.milliseconds_to_wait:
+        time.sleep(answer.milliseconds_to_wait / 1000)
+
+    if answer.stdout is not None:
+        write_payload(sys.stdout, answer.stdout)
+
+    if answer.stderr is not None:
+        write_payload(sys.stderr, answer.stderr)
+
+
+def send_answer(answer):
+    """
+        writes stdout and stderr of the given answer after waiting the
+        configured time and exits with its return code.
+    """
+
+    write_answer(answer)
+    sys.exit(answer.return_code)
+
+
+def detach_output():
+    """
+        flushes stdout and stderr and replaces them with /dev/null, so the
+        reader of their pipes gets the end of file.
+    """
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    null_file_descriptor = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(null_file_descriptor, sys.stdout.fileno())
+    os.dup2(null_file_descriptor, sys.stderr.fileno())
+    os.close(null_file_descriptor)
+
+
+def send_answer_first(answer, execution, executions_filename=EXECUTIONS_FILENAME):
+    """
+        sends the given answer and detaches stdout and stderr before the
+        given execution is recorded, then exits with the return code of the
+        answer. A placeholder reserves the position of the execution in the
+        journal before answering, so executions started after this answer
+        are recorded after this one. No lock is held while answering. The
+        execution is recorded even if the answer could not be written, e.g.
+        because the reader closed the pipe early.
+    """
+
+    token = reserve_journal_record(executions_filename)
+
+    try:
+        write_answer(answer)
+        detach_output()
+    finally:
+        append_reserved_record(executions_filename, token, execution)
+
+    sys.exit(answer.return_code)
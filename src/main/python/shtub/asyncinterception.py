@@ -0,0 +1,257 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+    this module provides the class AsyncInterception, which answers executions
+    of stubbed commands started through asyncio.create_subprocess_exec and
+    asyncio.create_subprocess_shell within the test process. The returned
+    processes feed their stdout and stderr stream readers from the answer and
+    wait using asyncio.sleep, so they do not block the event loop.
+    This module requires python 3.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import asyncio
+import asyncio.subprocess
+import os
+import sys
+
+from asyncio.subprocess import DEVNULL, PIPE, STDOUT
+
+from shtub.blobs import payload_as_bytes
+from shtub.interception import UNEXPECTED_EXECUTION_RETURN_CODE, Interception, split_shell_command
+
+DEFAULT_LIMIT = 2 ** 16
+
+
+class AsyncInterception (Interception):
+
+    """
+        Answers executions of stubbed commands started through the asyncio
+        subprocess api. Please use instances of this class in a "with"
+        statement. Since it is an Interception, subprocess.Popen and os.system
+        are intercepted as well.
+    """
+
+    def __init__(self, stub_configurations=None):
+        super(AsyncInterception, self).__init__(stub_configurations)
+        self.original_create_subprocess_exec = None
+        self.original_create_subprocess_shell = None
+
+    async def create_subprocess_exec(self, program, *args, stdin=None, stdout=None, stderr=None,
+                                     limit=DEFAULT_LIMIT, **keyword_arguments):
+        """
+            replaces asyncio.create_subprocess_exec.
+        """
+
+        arguments = [str(program)] + [str(argument) for argument in args]
+
+        if not self.is_stubbed(os.path.basename(arguments[0])):
+            return await self.original_create_subprocess_exec(
+                program, *args, stdin=stdin, stdout=stdout, stderr=stderr, limit=limit, **keyword_arguments)
+
+        return InterceptedAsyncProcess(self, arguments, stdin, stdout, stderr, limit)
+
+    async def create_subprocess_shell(self, command, stdin=None, stdout=None, stderr=None,
+                                      limit=DEFAULT_LIMIT, **keyword_arguments):
+        """
+            replaces asyncio.create_subprocess_shell. Only simple commands
+            are intercepted, see split_shell_command.
+        """
+
+        arguments = split_shell_command(command)
+
+        if not arguments or not self.is_stubbed(os.path.basename(arguments[0])):
+            return await self.original_create_subprocess_shell(
+                command, stdin=stdin, stdout=stdout, stderr=stderr, limit=limit, **keyword_arguments)
+
+        return InterceptedAsyncProcess(self, arguments, stdin, stdout, stderr, limit)
+
+    def __enter__(self):
+        """
+            patches the asyncio subprocess api, subprocess.Popen and os.system.
+        """
+
+        self.original_create_subprocess_exec = asyncio.subprocess.create_subprocess_exec
+        self.original_create_subprocess_shell = asyncio.subprocess.create_subprocess_shell
+
+        for module in (asyncio, asyncio.subprocess):
+            module.create_subprocess_exec = self.create_subprocess_exec
+            module.create_subprocess_shell = self.create_subprocess_shell
+
+        return super(AsyncInterception, self).__enter__()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        """
+            restores the asyncio subprocess api, subprocess.Popen and os.system.
+        """
+
+        for module in (asyncio, asyncio.subprocess):
+            module.create_subprocess_exec = self.original_create_subprocess_exec
+            module.create_subprocess_shell = self.original_create_subprocess_shell
+
+        return super(AsyncInterception, self).__exit__(exception_type, exception_value, traceback)
+
+
+class InterceptedStdin (object):
+
+    """
+        Collects the input written to an intercepted process. Closing it
+        dispatches the execution.
+    """
+
+    def __init__(self, process):
+        self.process = process
+        self.chunks = []
+        self.closed = False
+
+    def write(self, data):
+        self.chunks.append(data)
+
+    def writelines(self, lines):
+        self.chunks.extend(lines)
+
+    async def drain(self):
+        pass
+
+    def can_write_eof(self):
+        return True
+
+    def write_eof(self):
+        self.close()
+
+    def is_closing(self):
+        return self.closed
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.process.start_dispatch()
+
+    async def wait_closed(self):
+        pass
+
+    def getvalue(self):
+        return b''.join(self.chunks)
+
+
+class InterceptedAsyncProcess (object):
+
+    """
+        Represents the execution of a stubbed command in place of an
+        asyncio.subprocess.Process. The execution is dispatched in a task as
+        soon as the input has been given: immediately unless stdin is a pipe,
+        otherwise when stdin is closed or communicate or wait is awaited.
+    """
+
+    def __init__(self, interception, arguments, stdin, stdout, stderr, limit):
+        self.interception = interception
+        self.arguments = arguments
+        self.pid = None
+        self.returncode = None
+        self.stdout_target = stdout
+        self.stderr_target = stderr
+        self.stdin = InterceptedStdin(self) if stdin == PIPE else None
+        self.stdout = asyncio.StreamReader(limit=limit) if stdout == PIPE else None
+        self.stderr = asyncio.StreamReader(limit=limit) if stderr == PIPE else None
+        self.task = None
+
+        if self.stdin is None:
+            self.start_dispatch()
+
+    def start_dispatch(self):
+        if self.task is None:
+            self.task = asyncio.ensure_future(self.dispatch())
+
+    async def dispatch(self):
+        stdin = self.stdin.getvalue().decode('utf-8') if self.stdin is not None else ''
+        command = os.path.basename(self.arguments[0])
+        answer = self.interception.dispatch(command, self.arguments[1:], stdin)
+        stdout_data, stderr_data = b'', b''
+
+        if answer is None:
+            return_code = UNEXPECTED_EXECUTION_RETURN_CODE
+        else:
+            if answer.milliseconds_to_wait:
+                await asyncio.sleep(answer.milliseconds_to_wait / 1000)
+            stdout_data = payload_as_bytes(answer.stdout)
+            stderr_data = payload_as_bytes(answer.stderr)
+            return_code = answer.return_code
+
+        if self.stderr_target == STDOUT:
+            stdout_data, stderr_data = stdout_data + stderr_data, b''
+
+        self.deliver(stdout_data, self.stdout, self.stdout_target, sys.stdout)
+        self.deliver(stderr_data, self.stderr, self.stderr_target, sys.stderr)
+        self.returncode = return_code
+
+    def deliver(self, data, stream_reader, target, inherited):
+        """
+            feeds the given data to the given stream reader or writes it to the
+            given target like a child process would.
+        """
+
+        if stream_reader is not None:
+            stream_reader.feed_data(data)
+            stream_reader.feed_eof()
+            return
+
+        if target in (STDOUT, DEVNULL) or not data:
+            return
+
+        if target is None:
+            target = inherited
+
+        if isinstance(target, int):
+            os.write(target, data)
+        elif hasattr(target, 'buffer'):
+            target.flush()
+            target.buffer.write(data)
+            target.buffer.flush()
+        else:
+            target.write(data.decode('utf-8', 'replace'))
+            target.flush()
+
+    async def wait(self):
+        if self.stdin is not None:
+            self.stdin.close()
+
+        await self.task
+        return self.returncode
+
+    async def communicate(self, input=None):
+        if self.stdin is not None:
+            if input is not None:
+                self.stdin.write(input)
+            self.stdin.close()
+
+        await self.task
+
+        stdout = await self.stdout.read() if self.stdout is not None else None
+        stderr = await self.stderr.read() if self.stderr is not None else None
+
+        return (stdout, stderr)
+
+    def send_signal(self, signal):
+        pass
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
@@ -0,0 +1,131 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the classes removing the base directories of
+    integration tests in background threads and keeping the base
+    directories of failed tests up to a maximum size.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import atexit
+import os
+import shutil
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+COUNT_OF_REMOVING_THREADS = 2
+
+
+def directory_size(directory):
+    """
+        returns the count of bytes of all files below the given directory.
+    """
+
+    size = 0
+
+    for parent, _, file_names in os.walk(directory):
+        for file_name in file_names:
+            try:
+                size += os.lstat(os.path.join(parent, file_name)).st_size
+            except OSError:
+                pass
+
+    return size
+
+
+class BaseDirRemover (object):
+
+    """
+        Removes directories in a pool of daemon threads. Directories which
+        have not been removed yet are removed before the interpreter exits.
+    """
+
+    def __init__(self, count_of_threads=COUNT_OF_REMOVING_THREADS):
+        self.count_of_threads = count_of_threads
+        self.queue = Queue()
+        self.threads = []
+        self.threads_lock = threading.Lock()
+
+    def remove(self, directory):
+        """
+            schedules the removal of the given directory and returns at once.
+        """
+
+        with self.threads_lock:
+            if not self.threads:
+                for _ in range(self.count_of_threads):
+                    thread = threading.Thread(target=self.work)
+                    thread.daemon = True
+                    thread.start()
+                    self.threads.append(thread)
+
+                atexit.register(self.join)
+
+        self.queue.put(directory)
+
+    def work(self):
+        while True:
+            directory = self.queue.get()
+
+            try:
+                shutil.rmtree(directory, ignore_errors=True)
+            finally:
+                self.queue.task_done()
+
+    def join(self):
+        """
+            blocks until all scheduled directories have been removed.
+        """
+
+        self.queue.join()
+
+
+class RetainedBaseDirs (object):
+
+    """
+        Keeps track of the retained base directories (e.g. of failed tests).
+        When their total size exceeds the given maximum size, the oldest ones
+        are removed.
+    """
+
+    def __init__(self, remover):
+        self.remover = remover
+        self.directories = []
+        self.total_size = 0
+
+    def retain(self, directory, max_size=None):
+        """
+            retains the given directory and removes the oldest retained
+            directories while the total size exceeds max_size (in bytes).
+        """
+
+        if max_size is None:
+            return
+
+        size = directory_size(directory)
+        self.directories.append((directory, size))
+        self.total_size += size
+
+        while self.directories and self.total_size > max_size:
+            oldest_directory, oldest_size = self.directories.pop(0)
+            self.total_size -= oldest_size
+            self.remover.remove(oldest_directory)
@@ -0,0 +1,300 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+    this module provides the content-addressed blob store: payloads (stdin
+    of executions, stdout and stderr of answers) longer than
+    SPILL_THRESHOLD_IN_CHARACTERS are stored once per content in the blob
+    directory and referenced from the json files by their sha1 hash. A
+    BlobReference equals the payload it has been created from, so matching
+    and verifying compare hashes without reading the blob. Stubs copy blobs
+    and files (see shtub.answer.FileSource) to their file descriptors using
+    sendfile where possible, so these payloads are never loaded by the stubs.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import errno
+import io
+import os
+
+from shtub import BLOBS_DIRECTORY
+
+SPILL_THRESHOLD_IN_CHARACTERS = 64 * 1024
+COPY_BUFFER_SIZE = 64 * 1024
+
+
+def digest_of(text):
+    """
+        returns the sha1 hash of the utf-8 encoded text.
+    """
+    import hashlib
+
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class BlobReference (object):
+
+    """
+        References a payload in the blob store by the hash of its content.
+    """
+
+    def __init__(self, digest, length):
+        """
+            initializes a new reference to the blob with the given hash of a
+            payload of the given length (in characters).
+        """
+
+        self.digest = digest
+        self.length = length
+
+    @property
+    def filename(self):
+        """
+            returns the filename of the blob relative to the base directory.
+        """
+
+        return os.path.join(BLOBS_DIRECTORY, self.digest)
+
+    def open(self, base_directory=os.curdir):
+        """
+            opens the blob for reading the payload as text.
+        """
+
+        return io.open(os.path.join(base_directory, self.filename), mode='r', encoding='utf-8', newline='')
+
+    def read(self, base_directory=os.curdir):
+        """
+            returns the payload.
+        """
+
+        with self.open(base_directory) as blob_file:
+            return blob_file.read()
+
+    def as_dictionary(self):
+        """
+            returns a dictionary representation of this reference.
+        """
+
+        return {'blob': self.digest, 'length': self.length}
+
+    def __eq__(self, other):
+        """
+            returns True when the given reference references the same blob or
+            the given text is the referenced payload.
+        """
+
+        if isinstance(other, BlobReference):
+            return self.digest == other.digest
+
+        if not hasattr(other, 'encode') or len(other) != self.length:
+            return False
+
+        return digest_of(other) == self.digest
+
+    def __ne__(self, other):
+        return not(self == other)
+
+    def __hash__(self):
+        return hash(self.digest)
+
+    def __str__(self):
+        return 'blob %s (%d characters)' % (self.digest, self.length)
+
+    __repr__ = __str__
+
+    @staticmethod
+    def from_dictionary(dictionary):
+        """
+            returns a new reference with the properties from the given dictionary.
+        """
+
+        return BlobReference(dictionary['blob'], dictionary['length'])
+
+
+def is_referenced(payload):
+    """
+        returns True when the given payload is a reference to a blob or file
+        instead of text.
+    """
+
+    from shtub.answer import FileSource
+
+    return isinstance(payload, (BlobReference, FileSource))
+
+
+def store_blob(base_directory, text):
+    """
+        stores the given text in the blob store of the given base directory,
+        unless a blob with the same content exists, and returns its reference.
+    """
+    import tempfile
+
+    reference = BlobReference(digest_of(text), len(text))
+    filename = os.path.join(base_directory, reference.filename)
+
+    if not os.path.exists(filename):
+        directory = os.path.dirname(filename)
+
+        try:
+            os.makedirs(directory)
+        except OSError as error:
+            if error.errno != errno.EEXIST:
+                raise
+
+        file_descriptor, temporary_filename = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.fchmod(file_descriptor, 0o644)
+
+        with io.open(file_descriptor, mode='w', encoding='utf-8', newline='') as blob_file:
+            blob_file.write(text)
+
+        os.rename(temporary_filename, filename)
+
+    return reference
+
+
+def spill(base_directory, payload, threshold=SPILL_THRESHOLD_IN_CHARACTERS):
+    """
+        returns a reference to the stored payload if it is longer than the
+        given threshold, otherwise the payload itself.
+    """
+
+    if payload is None or is_referenced(payload) or len(payload) <= threshold:
+        return payload
+
+    return store_blob(base_directory, payload)
+
+
+def payload_as_dictionary(payload):
+    """
+        returns the json representation of the given payload.
+    """
+
+    if is_referenced(payload):
+        return payload.as_dictionary()
+
+    return payload
+
+
+def payload_from_dictionary(value):
+    """
+        returns the payload represented by the given json value.
+    """
+
+    if isinstance(value, dict):
+        if 'file' in value:
+            from shtub.answer import FileSource
+
+            return FileSource.from_dictionary(value)
+        return BlobReference.from_dictionary(value)
+
+    return value
+
+
+def send_file(source_file, file_descriptor):
+    """
+        copies the given file from its current position to the given file
+        descriptor using sendfile and returns the position after the copied
+        bytes. The kernel copies the data without passing it through python;
+        when sendfile is not available or does not support the file
+        descriptors nothing is copied.
+    """
+
+    offset = source_file.tell()
+
+    if not hasattr(os, 'sendfile'):
+        return offset
+
+    size = os.fstat(source_file.fileno()).st_size
+
+    try:
+        while offset < size:
+            sent = os.sendfile(file_descriptor, source_file.fileno(), offset, size - offset)
+
+            if not sent:
+                break
+
+            offset += sent
+    except OSError as error:
+        if error.errno not in (errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+            raise
+
+    return offset
+
+
+def copy_file(filename, file_descriptor):
+    """
+        copies the content of the given file to the given file descriptor
+        without loading it at once: using sendfile where possible, in chunks
+        otherwise.
+    """
+
+    with open(filename, mode='rb') as source_file:
+        source_file.seek(send_file(source_file, file_descriptor))
+
+        while True:
+            data = source_file.read(COPY_BUFFER_SIZE)
+
+            if not data:
+                break
+
+            while data:
+                written = os.write(file_descriptor, data)
+                data = data[written:]
+
+
+def payload_as_bytes(payload, encoding='utf-8', errors='strict', base_directory=os.curdir):
+    """
+        returns the given payload as bytes: files are read as they are, text
+        and blobs are encoded using the given encoding.
+    """
+
+    if payload is None:
+        return b''
+
+    from shtub.answer import FileSource
+
+    if isinstance(payload, FileSource):
+        return payload.read()
+
+    if isinstance(payload, BlobReference):
+        payload = payload.read(base_directory)
+
+    return payload.encode(encoding, errors)
+
+
+def copy_blob(reference, file_descriptor, base_directory=os.curdir):
+    """
+        copies the content of the referenced blob or file to the given file
+        descriptor.
+    """
+
+    copy_file(os.path.join(base_directory, reference.filename), file_descriptor)
+
+
+def write_payload(output, payload, base_directory=os.curdir):
+    """
+        writes the given payload to the given text file: text is written as
+        it is, blobs and files are copied.
+    """
+
+    if not is_referenced(payload):
+        output.write(payload)
+        return
+
+    output.flush()
+    copy_blob(payload, output.fileno(), base_directory)
@@ -22,6 +22,8 @@
 
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
+from shtub.blobs import payload_as_dictionary, payload_from_dictionary
+
 
 class CommandInput (object):
 
@@ -38,6 +40,17 @@ class CommandInput (object):
         self.command = command
         self.arguments = arguments or []
         self.stdin = stdin
+        self.argument_set = None
+
+    def freeze_arguments(self):
+        """
+            hashes the arguments once, so fulfilling this command input does
+            not hash them again. Returns self for invocation chaining.
+        """
+
+        self.argument_set = frozenset(self.arguments)
+
+        return self
 
     def as_dictionary(self):
         """
@@ -46,7 +59,7 @@ class CommandInput (object):
 
         return {'command': self.command,
                 'arguments': self.arguments,
-                'stdin': self.stdin}
+                'stdin': payload_as_dictionary(self.stdin)}
 
     def fulfills(self, other):
         """
@@ -62,11 +75,12 @@ class CommandInput (object):
             if other.stdin != self.stdin:
                 return False
 
-        for argument in other.arguments:
-            if argument not in self.arguments:
-                return False
+        argument_set = other.argument_set
+
+        if argument_set is None:
+            argument_set = frozenset(other.arguments)
 
-        return True
+        return argument_set.issubset(self.arguments)
 
     def __eq__(self, other):
         """
@@ -101,4 +115,4 @@ class CommandInput (object):
 
         return CommandInput(dictionary['command'],
                             dictionary['arguments'],
-                            dictionary['stdin'])
+                            payload_from_dictionary(dictionary['stdin']))
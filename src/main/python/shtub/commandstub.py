@@ -28,45 +28,33 @@ import time
 
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
-from select import select
-
 from shtub import (BASEDIR,
+                   ANSWER_CURSORS_FILENAME,
                    EXECUTIONS_FILENAME,
                    CONFIGURED_STUBS_FILENAME,
-                   lock,
-                   unlock,
+                   DISPATCH_INDEX_DIRECTORY,
                    LOG_FILENAME,
-                   READ_STDIN_TIMEOUT_IN_SECONDS,
-                   SERIALIZATION_LOCK_FILENAME,
-                   deserialize_executions,
-                   deserialize_stub_configurations,
-                   serialize_as_dictionaries)
+                   append_as_dictionary,
+                   deserialize_stub_configurations)
 
+from shtub.answercursors import advance_answer_cursor
+from shtub.answerwriter import send_answer_first
+from shtub.blobs import spill, write_payload
+from shtub.dispatchindex import find_candidate, load_candidates
 from shtub.execution import Execution
 from shtub.commandinput import CommandInput
-
-global lock_handle
+from shtub.stdinreader import needs_stdin, read_stdin, read_stdin_timeout
 
 
 def record_execution(execution):
     """
-        loads the list of recent executions from the EXECUTIONS_FILENAME file,
-        appends the given execution to the list, then writes the list back to
-        the file again. To assure only one process is reading and writing the
-        file a file lock is used.
+        appends the given execution as one record to the EXECUTIONS_FILENAME
+        journal. No lock is needed since the record is appended using a
+        single write.
     """
 
-    lock_file_handle = lock()
-    executions = []
-
-    if os.path.exists(EXECUTIONS_FILENAME):
-        executions = deserialize_executions(EXECUTIONS_FILENAME)
-
-    executions.append(execution)
-    serialize_as_dictionaries(EXECUTIONS_FILENAME, executions)
-    logging.info('Recorded %s executions.', len(executions))
-
-    unlock(lock_file_handle)
+    append_as_dictionary(EXECUTIONS_FILENAME, execution)
+    logging.info('Recorded %s.', execution)
 
 
 def send_answer(answer):
@@ -78,87 +66,114 @@ def send_answer(answer):
     logging.info('Sending %s', answer)
 
     if answer.stdout is not None:
-        sys.stdout.write(answer.stdout)
+        write_payload(sys.stdout, answer.stdout)
 
     if answer.stderr is not None:
-        sys.stderr.write(answer.stderr)
+        write_payload(sys.stderr, answer.stderr)
 
     sys.exit(answer.return_code)
 
 
-def dispatch(command_input):
+def load_stub_candidates(command):
+    """
+        returns the candidates (tuples of index and stub configuration) for
+        the given command from the dispatch index. If there is no dispatch
+        index they are taken from the file of all stub configurations.
+    """
+
+    candidates = load_candidates(command, DISPATCH_INDEX_DIRECTORY)
+
+    if candidates is None:
+        stub_configurations = deserialize_stub_configurations(
+            CONFIGURED_STUBS_FILENAME)
+        candidates = [(index, stub_configuration)
+                      for index, stub_configuration in enumerate(stub_configurations)
+                      if stub_configuration.command_input.command == command]
+
+    return candidates
+
+
+def dispatch(command_input, candidates=None):
     """
         currently this will handle the given command_input by testing whether it
-        fulfills a stub configuration. If so it will save a execution (with the expected flag
-        set to true) and send the next answer as defined in the stub configuration object.
+        fulfills a stub configuration of its command. Unless given the candidates are
+        loaded using load_stub_candidates. If so it will
+        save a execution (with the expected flag set to true), move the answer cursor of
+        the stub configuration forward and send the next answer as defined in the stub
+        configuration object. Only the answer cursor of the fulfilled stub configuration
+        is locked. Stub configurations answering first send the answer before the
+        execution is recorded.
     """
 
-    stub_configurations = deserialize_stub_configurations(
-        CONFIGURED_STUBS_FILENAME)
+    if candidates is None:
+        candidates = load_stub_candidates(command_input.command)
 
     logging.info('Got %s', command_input)
 
     execution = Execution(
-        command_input.command, command_input.arguments, command_input.stdin)
-
-    for stub_configuration in stub_configurations:
-        if command_input.fulfills(stub_configuration.command_input):
-            logging.info('Execution fulfills %s', stub_configuration)
-            execution.mark_as_expected()
-            record_execution(execution)
-            answer = stub_configuration.next_answer()
-            serialize_as_dictionaries(
-                CONFIGURED_STUBS_FILENAME, stub_configurations)
-            unlock(lock_handle)
-            if answer.milliseconds_to_wait:
-                time.sleep(answer.milliseconds_to_wait / 1000)
-            send_answer(answer)
-            return
+        command_input.command, command_input.arguments, spill(os.curdir, command_input.stdin))
 
-    unlock(lock_handle)
-    logging.error(
-        'Given command_input does not fulfill requirements of any stub configuration.')
-    sys.exit(255)
+    candidate = find_candidate(command_input, candidates)
 
+    if candidate is not None:
+        index, stub_configuration = candidate
+        logging.info('Execution fulfills %s', stub_configuration)
+        execution.mark_as_expected()
 
-def read_stdin():
-    """
-        waits READ_STDIN_TIMEOUT_IN_SECONDS seconds for input on stdin and
-        is going to return the complete input if there is any. If there is no
-        input it is going to returns an empty string.
-    """
-    read_list, _, _ = select(
-        [sys.stdin], [], [], READ_STDIN_TIMEOUT_IN_SECONDS)
+        if stub_configuration.answer_first:
+            answer = advance_answer_cursor(
+                ANSWER_CURSORS_FILENAME, index, stub_configuration)
+            logging.info('Sending %s before recording %s', answer, execution)
+            send_answer_first(answer, execution)
+            return
 
-    if len(read_list) > 0:
-        return read_list[0].read()
+        record_execution(execution)
+        answer = advance_answer_cursor(
+            ANSWER_CURSORS_FILENAME, index, stub_configuration)
+        if answer.milliseconds_to_wait:
+            time.sleep(answer.milliseconds_to_wait / 1000)
+        send_answer(answer)
+        return
 
-    return ''
+    logging.error(
+        'Given command_input does not fulfill requirements of any stub configuration.')
+    sys.exit(255)
 
 
-def handle_execution():
+def initialize_logging():
     """
-        creates the base directory, initializes the logging and will read in
-        the arguments and input from stdin to create a new execution object.
+        creates the base directory and initializes the logging into LOG_FILENAME.
     """
 
     if not os.path.exists(BASEDIR):
         os.mkdir(BASEDIR)
-    global lock_handle
-    lock_handle = lock(SERIALIZATION_LOCK_FILENAME)
 
     logging_format = '%(asctime)s %(levelname)5s [%(name)s] process[%(process)d] thread[%(thread)d] - %(message)s'
     logging.basicConfig(filename=LOG_FILENAME,
                         level=logging.INFO,
                         format=logging_format)
 
+
+def handle_execution():
+    """
+        creates the base directory, initializes the logging, loads the candidates
+        for the command and will read in the arguments and input from stdin (if
+        any candidate needs it) to create a new execution object.
+    """
+
+    initialize_logging()
+
     command = os.path.basename(sys.argv[0])
     arguments = sys.argv[1:]
-    stdin = read_stdin()
+    candidates = load_stub_candidates(command)
+    stdin = None
+
+    if needs_stdin(candidates):
+        stdin = read_stdin(read_stdin_timeout(candidates))
 
     command_input = CommandInput(command, arguments, stdin)
 
-    dispatch(command_input)
+    dispatch(command_input, candidates)
 
 
 if __name__ == '__main__':  # pragma: no cover
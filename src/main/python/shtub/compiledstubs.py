@@ -0,0 +1,132 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+    this module provides functions to write and read compiled stubs: one file
+    per command containing the candidates of the dispatch index marshalled
+    instead of json encoded, so the stub launcher loads them using a single
+    read without parsing json. A file is rewritten only when the candidates
+    of its command have changed.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import marshal
+import os
+
+from shtub import COMPILED_STUBS_DIRECTORY
+from shtub.dispatchindex import group_by_command, is_indexable
+from shtub.stubconfiguration import StubConfiguration
+
+MARSHAL_VERSION = 2
+
+
+def compile_candidates(candidates):
+    """
+        returns the marshalled records of the given candidates.
+    """
+
+    records = [[index, stub_configuration.as_dictionary()] for index, stub_configuration in candidates]
+    return marshal.dumps(records, MARSHAL_VERSION)
+
+
+def read_file(filename):
+    """
+        returns the content of the given file or None if it does not exist.
+    """
+
+    if not os.path.exists(filename):
+        return None
+
+    with open(filename, mode='rb') as compiled_file:
+        return compiled_file.read()
+
+
+def write_compiled_stubs(directory, stub_configurations):
+    """
+        writes the compiled stubs of the given stub configurations into the
+        given directory and returns the list of commands which have been
+        (re)written. Compiled stubs of commands which are not configured
+        anymore are removed, unchanged ones are kept as they are.
+    """
+
+    if not os.path.isdir(directory):
+        os.mkdir(directory)
+
+    obsolete_commands = set(os.listdir(directory))
+    written_commands = []
+
+    for command, candidates in sorted(group_by_command(stub_configurations).items()):
+        if not is_indexable(command):
+            continue
+
+        obsolete_commands.discard(command)
+        filename = os.path.join(directory, command)
+        data = compile_candidates(candidates)
+
+        if read_file(filename) == data:
+            continue
+
+        temporary_filename = filename + '.%d.tmp' % os.getpid()
+
+        with open(temporary_filename, mode='wb') as compiled_file:
+            compiled_file.write(data)
+
+        os.rename(temporary_filename, filename)
+        written_commands.append(command)
+
+    for command in obsolete_commands:
+        os.remove(os.path.join(directory, command))
+
+    return written_commands
+
+
+def remove_compiled_stubs(directory):
+    """
+        removes the given directory of compiled stubs, so the stub launcher
+        does not use compiled stubs of earlier fixtures anymore.
+    """
+    import shutil
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+
+
+def load_compiled_candidates(command, directory=COMPILED_STUBS_DIRECTORY):
+    """
+        returns the list of candidates for the given command or None when
+        there are no compiled stubs or they have been written by an
+        incompatible python version.
+    """
+
+    if not os.path.isdir(directory):
+        return None
+
+    if not is_indexable(command):
+        return []
+
+    data = read_file(os.path.join(directory, command))
+
+    if data is None:
+        return []
+
+    try:
+        records = marshal.loads(data)
+    except (EOFError, ValueError, TypeError):
+        return None
+
+    return [(index, StubConfiguration.from_dictionary(dictionary)) for index, dictionary in records]
@@ -0,0 +1,117 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides functions to write and read the dispatch index: one
+    file per command containing the stub configurations of this command
+    (the candidates) in the order of the fixture together with their index
+    in the list of all stub configurations. A command stub only has to load
+    the candidates of its own command.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import json
+import os
+
+from shtub import DISPATCH_INDEX_DIRECTORY
+from shtub.commandinput import CommandInput
+from shtub.stubconfiguration import StubConfiguration
+
+
+def is_indexable(command):
+    """
+        returns True when the given command can be used as filename in the
+        dispatch index, i.e. it can be the basename of a command stub.
+    """
+
+    return command not in ('', os.curdir, os.pardir) and os.path.basename(command) == command
+
+
+def group_by_command(stub_configurations):
+    """
+        returns a dictionary which maps each command to the list of its
+        candidates: tuples of index and stub configuration in first-match
+        order.
+    """
+
+    candidates_by_command = {}
+
+    for index, stub_configuration in enumerate(stub_configurations):
+        command = stub_configuration.command_input.command
+        candidates_by_command.setdefault(command, []).append((index, stub_configuration))
+
+    return candidates_by_command
+
+
+def write_dispatch_index(directory, stub_configurations):
+    """
+        (re)writes the dispatch index for the given stub configurations into
+        the given directory.
+    """
+    import shutil
+
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+
+    os.mkdir(directory)
+
+    for command, candidates in group_by_command(stub_configurations).items():
+        if not is_indexable(command):
+            continue
+
+        records = [[index, stub_configuration.as_dictionary()] for index, stub_configuration in candidates]
+
+        with open(os.path.join(directory, command), mode='w') as index_file:
+            index_file.write(json.dumps(records, sort_keys=True))
+
+
+def load_candidates(command, directory=DISPATCH_INDEX_DIRECTORY):
+    """
+        returns the list of candidates for the given command or None when
+        there is no dispatch index.
+    """
+
+    if not os.path.isdir(directory):
+        return None
+
+    filename = os.path.join(directory, command)
+
+    if not is_indexable(command) or not os.path.exists(filename):
+        return []
+
+    with open(filename, mode='r') as index_file:
+        records = json.loads(index_file.read())
+
+    return [(index, StubConfiguration.from_dictionary(dictionary)) for index, dictionary in records]
+
+
+def find_candidate(command_input, candidates):
+    """
+        returns the first candidate the given command input fulfills or None.
+        The arguments of the command input are hashed only once for all
+        candidates.
+    """
+
+    hashed_input = CommandInput(command_input.command,
+                                frozenset(command_input.arguments),
+                                command_input.stdin)
+
+    for index, stub_configuration in candidates:
+        if hashed_input.fulfills(stub_configuration.command_input):
+            return index, stub_configuration
+
+    return None
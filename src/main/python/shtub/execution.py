@@ -21,6 +21,7 @@
 
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
+from shtub.blobs import payload_from_dictionary
 from shtub.commandinput import CommandInput
 
 
@@ -79,5 +80,5 @@ class Execution (object):
 
         return Execution(command_input_dictionary['command'],
                          command_input_dictionary['arguments'],
-                         command_input_dictionary['stdin'],
+                         payload_from_dictionary(command_input_dictionary['stdin']),
                          dictionary['expected'])
@@ -23,10 +23,45 @@ __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
 import os
 
-from shtub import CONFIGURED_STUBS_FILENAME, serialize_as_dictionaries
+from shtub import (ANSWER_CURSORS_FILENAME,
+                   COMPILED_STUBS_DIRECTORY,
+                   CONFIGURED_STUBS_FILENAME,
+                   DISPATCH_INDEX_DIRECTORY,
+                   EXECUTIONS_FILENAME,
+                   SHELL_FUNCTIONS_FILENAME,
+                   serialize_as_dictionaries)
+from shtub.answercursors import write_answer_cursors
+from shtub.blobs import spill
+from shtub.compiledstubs import remove_compiled_stubs, write_compiled_stubs
+from shtub.dispatchindex import write_dispatch_index
+from shtub.shellfunctions import write_shell_functions
 from shtub.stubconfiguration import StubConfiguration
 
 
+def spill_payloads(base_directory, stub_configurations):
+    """
+        returns copies of the given stub configurations with long stdin,
+        stdout and stderr payloads replaced by references to the blob store.
+        The given stub configurations are not modified.
+    """
+
+    spilled_stub_configurations = []
+
+    for stub_configuration in stub_configurations:
+        dictionary = stub_configuration.as_dictionary()
+        spilled_stub_configuration = StubConfiguration.from_dictionary(dictionary)
+        command_input = spilled_stub_configuration.command_input
+        command_input.stdin = spill(base_directory, command_input.stdin)
+
+        for answer in spilled_stub_configuration.answers:
+            answer.stdout = spill(base_directory, answer.stdout)
+            answer.stderr = spill(base_directory, answer.stderr)
+
+        spilled_stub_configurations.append(spilled_stub_configuration)
+
+    return spilled_stub_configurations
+
+
 class Fixture (object):
 
     """
@@ -34,12 +69,24 @@ class Fixture (object):
         Please use instances of this class in a "with" statement.
     """
 
-    def __init__(self, base_directory):
+    def __init__(self, base_directory, read_stdin_timeout_in_seconds=None, shell_functions=False,
+                 answer_first=False, compiled_stubs=False):
         """
             initializes a new fixture with the given base directory.
+            read_stdin_timeout_in_seconds is used for all stub configurations
+            which do not set their own timeout. When shell_functions is True
+            a bash file defining functions for simple stub configurations is
+            written as well. When answer_first is True all stub configurations
+            answer before recording the execution. When compiled_stubs is True
+            the compiled stubs for the stub launcher are written as well,
+            otherwise compiled stubs of earlier fixtures are removed.
         """
 
         self.base_directory = base_directory
+        self.read_stdin_timeout_in_seconds = read_stdin_timeout_in_seconds
+        self.shell_functions = shell_functions
+        self.answer_first = answer_first
+        self.compiled_stubs = compiled_stubs
         self.stub_configurations = []
 
     def calling(self, command):
@@ -48,7 +95,10 @@ class Fixture (object):
             the stub_configurations, then returns the stub_configuration for invocation
             chaining.
         """
-        stub_configuration = StubConfiguration(command)
+        stub_configuration = StubConfiguration(
+            command,
+            read_stdin_timeout_in_seconds=self.read_stdin_timeout_in_seconds,
+            answer_first=self.answer_first)
         self.stub_configurations.append(stub_configuration)
 
         return stub_configuration
@@ -63,7 +113,11 @@ class Fixture (object):
     def __exit__(self, exception_type, exception_value, traceback):
         """
             since this class is designed to be used in a "with" statement
-            this will save the list of stub_configurations in the base directory.
+            this will save the list of stub_configurations, their answer
+            cursors, the dispatch index and, if enabled, the compiled stubs
+            and the shell functions in the base directory. Long payloads are
+            spilled to the blob store. The file of stub configurations will
+            not be modified by the command stubs.
 
             @return: False, when exception_type, exception_value or traceback given,
                      otherwise None
@@ -73,5 +127,22 @@ class Fixture (object):
             return False
 
         filename = os.path.join(self.base_directory, CONFIGURED_STUBS_FILENAME)
+        cursors_filename = os.path.join(self.base_directory, ANSWER_CURSORS_FILENAME)
+        index_directory = os.path.join(self.base_directory, DISPATCH_INDEX_DIRECTORY)
+
+        stub_configurations = spill_payloads(self.base_directory, self.stub_configurations)
+        serialize_as_dictionaries(filename, stub_configurations)
+        write_answer_cursors(cursors_filename, stub_configurations)
+        write_dispatch_index(index_directory, stub_configurations)
+
+        compiled_stubs_directory = os.path.join(self.base_directory, COMPILED_STUBS_DIRECTORY)
+
+        if self.compiled_stubs:
+            write_compiled_stubs(compiled_stubs_directory, stub_configurations)
+        else:
+            remove_compiled_stubs(compiled_stubs_directory)
 
-        serialize_as_dictionaries(filename, self.stub_configurations)
+        if self.shell_functions:
+            write_shell_functions(os.path.join(self.base_directory, SHELL_FUNCTIONS_FILENAME),
+                                  os.path.join(self.base_directory, EXECUTIONS_FILENAME),
+                                  stub_configurations)
@@ -0,0 +1,414 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the class Interception, which answers executions of
+    stubbed commands within the test process: subprocess.Popen (and so
+    subprocess.run, call, check_call and check_output) and os.system are
+    patched while the interception is active. Executions of stubbed commands
+    are dispatched against the stub configurations in memory and recorded in
+    memory, all other commands are executed as usual. Shell command lines
+    are intercepted only when they are a simple command.
+"""
+
+from __future__ import division
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import io
+import os
+import re
+import shlex
+import subprocess
+import sys
+import threading
+import time
+
+from shtub.blobs import payload_as_bytes
+from shtub.commandinput import CommandInput
+from shtub.dispatchindex import find_candidate, group_by_command
+from shtub.execution import Execution
+from shtub.stubconfiguration import StubConfiguration
+from shtub.verification.verifierloader import Verifier, raise_on_unexpected_executions
+
+UNEXPECTED_EXECUTION_RETURN_CODE = 255
+SHELL_METACHARACTERS = '|&;<>()$`\n'
+ASSIGNMENT_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*=')
+
+
+def split_shell_command(command):
+    """
+        returns the list of program and arguments of the given shell command
+        or None when the command is more than a simple command: it contains
+        shell metacharacters (pipelines, lists, redirections, substitutions),
+        starts with a variable assignment or cannot be split.
+    """
+
+    if any(character in command for character in SHELL_METACHARACTERS):
+        return None
+
+    try:
+        arguments = shlex.split(command)
+    except ValueError:
+        return None
+
+    if not arguments or ASSIGNMENT_PATTERN.match(arguments[0]):
+        return None
+
+    return arguments
+
+
+def split_command_line(args, shell):
+    """
+        returns the list of program and arguments of the given Popen args or
+        None when a shell has to execute them.
+    """
+
+    if isinstance(args, (list, tuple)):
+        arguments = [str(argument) for argument in args]
+        if shell:
+            command_arguments = split_shell_command(arguments[0]) if arguments else None
+            if command_arguments is None:
+                return None
+            arguments = command_arguments + arguments[1:]
+        return arguments
+
+    if shell:
+        return split_shell_command(args)
+
+    return [args]
+
+
+class Interception (object):
+
+    """
+        Answers executions of stubbed commands within the test process.
+        Please use instances of this class in a "with" statement.
+    """
+
+    def __init__(self, stub_configurations=None):
+        """
+            initializes a new interception with the given stub configurations.
+            More stub configurations can be added using calling.
+        """
+
+        self.stub_configurations = list(stub_configurations or [])
+        self.candidates_by_command = None
+        self.executions = []
+        self.lock = threading.Lock()
+        self.original_popen = None
+        self.original_system = None
+
+    def calling(self, command):
+        """
+            creates a new StubConfiguration with the given command like
+            Fixture.calling and returns it for invocation chaining.
+        """
+
+        stub_configuration = StubConfiguration(command)
+        self.stub_configurations.append(stub_configuration)
+        self.candidates_by_command = None
+
+        return stub_configuration
+
+    def is_stubbed(self, command):
+        """
+            returns True when there is a stub configuration for the given
+            command (the basename of the executed program).
+        """
+
+        return command in self.candidates()
+
+    def candidates(self):
+        """
+            returns the candidates of the stub configurations grouped by
+            command. They are grouped again after calling has been used.
+        """
+
+        candidates_by_command = self.candidates_by_command
+
+        if candidates_by_command is None:
+            candidates_by_command = group_by_command(self.stub_configurations)
+            self.candidates_by_command = candidates_by_command
+
+        return candidates_by_command
+
+    def dispatch(self, command, arguments, stdin):
+        """
+            records the execution of the given command and returns the next
+            answer of the first stub configuration it fulfills or None when it
+            does not fulfill any.
+        """
+
+        command_input = CommandInput(command, arguments, stdin)
+        execution = Execution(command, arguments, stdin)
+
+        with self.lock:
+            candidates = self.candidates().get(command, [])
+            candidate = find_candidate(command_input, candidates)
+            answer = None
+
+            if candidate is not None:
+                execution.mark_as_expected()
+                answer = candidate[1].next_answer()
+
+            self.executions.append(execution)
+
+        return answer
+
+    def verify(self):
+        """
+            returns a Verifier of the executions recorded so far and raises an
+            exception like VerifierLoader when one of them did not fulfill
+            any stub configuration.
+        """
+
+        with self.lock:
+            executions = list(self.executions)
+
+        raise_on_unexpected_executions(executions)
+
+        return Verifier(executions)
+
+    def popen(self, args, *popen_arguments, **keyword_arguments):
+        """
+            replaces subprocess.Popen: returns an InterceptedProcess for stubbed
+            commands and a subprocess.Popen for all other commands.
+        """
+
+        shell = keyword_arguments.get('shell', False)
+        arguments = split_command_line(args, shell)
+
+        if not arguments or not self.is_stubbed(os.path.basename(arguments[0])):
+            return self.original_popen(args, *popen_arguments, **keyword_arguments)
+
+        return InterceptedProcess(self, args, arguments, **keyword_arguments)
+
+    def system(self, command):
+        """
+            replaces os.system: answers stubbed commands, which write to the
+            stdout and stderr of the test process, and returns the wait status.
+        """
+
+        arguments = split_shell_command(command)
+
+        if not arguments or not self.is_stubbed(os.path.basename(arguments[0])):
+            return self.original_system(command)
+
+        process = InterceptedProcess(self, command, arguments, shell=True)
+        process.wait()
+
+        return process.returncode << 8
+
+    def __enter__(self):
+        """
+            patches subprocess.Popen and os.system.
+        """
+
+        self.original_popen = subprocess.Popen
+        self.original_system = os.system
+        subprocess.Popen = self.popen
+        os.system = self.system
+
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        """
+            restores subprocess.Popen and os.system.
+        """
+
+        subprocess.Popen = self.original_popen
+        os.system = self.original_system
+
+        return False
+
+
+class InterceptedInput (object):
+
+    """
+        Collects the input written to the stdin pipe of an InterceptedProcess.
+        In text mode text is written and encoded like subprocess.Popen does,
+        otherwise bytes are written. Closing the pipe keeps the input.
+    """
+
+    def __init__(self, text_mode, encoding, errors):
+        self.buffer = io.BytesIO()
+        self.text_mode = text_mode
+        self.encoding = encoding
+        self.errors = errors
+        self.closed = False
+
+    def write(self, data):
+        if self.text_mode:
+            self.buffer.write(data.encode(self.encoding, self.errors))
+        else:
+            self.buffer.write(data)
+
+        return len(data)
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def getvalue(self):
+        return self.buffer.getvalue()
+
+
+class InterceptedProcess (object):
+
+    """
+        Represents the execution of a stubbed command in place of a
+        subprocess.Popen. The execution is dispatched when the input has been
+        given: immediately unless stdin is a pipe, otherwise when communicate,
+        wait or poll is called.
+    """
+
+    def __init__(self, interception, args, arguments, stdin=None, stdout=None, stderr=None,
+                 universal_newlines=None, text=None, encoding=None, errors=None, **keyword_arguments):
+        self.interception = interception
+        self.args = args
+        self.arguments = arguments
+        self.pid = None
+        self.returncode = None
+        self.text_mode = bool(universal_newlines or text or encoding or errors)
+        self.encoding = encoding or 'utf-8'
+        self.errors = errors or 'strict'
+        self.stdout_target = stdout
+        self.stderr_target = stderr
+        self.stdout = None
+        self.stderr = None
+        self.stdin = None
+
+        if stdin == subprocess.PIPE:
+            self.stdin = InterceptedInput(self.text_mode, self.encoding, self.errors)
+        else:
+            self.answer(self.read_input(stdin))
+
+    def read_input(self, stdin):
+        if hasattr(stdin, 'read'):
+            data = stdin.read()
+            return data.decode(self.encoding) if isinstance(data, bytes) else data
+
+        return ''
+
+    def encode(self, text):
+        if isinstance(text, bytes):
+            return text
+        return text.encode(self.encoding, self.errors)
+
+    def decode(self, data):
+        if self.text_mode:
+            return data.decode(self.encoding, self.errors)
+        return data
+
+    def answer(self, stdin):
+        command = os.path.basename(self.arguments[0])
+        answer = self.interception.dispatch(command, self.arguments[1:], stdin)
+
+        if answer is None:
+            self.stdout_data, self.stderr_data = b'', b''
+            self.returncode = UNEXPECTED_EXECUTION_RETURN_CODE
+        else:
+            if answer.milliseconds_to_wait:
+                time.sleep(answer.milliseconds_to_wait / 1000)
+            self.stdout_data = payload_as_bytes(answer.stdout, self.encoding, self.errors)
+            self.stderr_data = payload_as_bytes(answer.stderr, self.encoding, self.errors)
+            self.returncode = answer.return_code
+
+        if self.stderr_target == subprocess.STDOUT:
+            self.stdout_data += self.stderr_data
+            self.stderr_data = b''
+
+        self.stdout = self.deliver(self.stdout_data, self.stdout_target, sys.stdout)
+        self.stderr = self.deliver(self.stderr_data, self.stderr_target, sys.stderr)
+
+    def deliver(self, data, target, inherited):
+        """
+            writes the given data to the given target like a child process
+            would and returns the file object to read it from if target is
+            subprocess.PIPE.
+        """
+
+        if target == subprocess.PIPE:
+            if self.text_mode:
+                return io.StringIO(self.decode(data))
+            return io.BytesIO(data)
+
+        if target in (subprocess.STDOUT, getattr(subprocess, 'DEVNULL', -3)) or not data:
+            return None
+
+        if target is None:
+            target = inherited
+
+        if isinstance(target, int):
+            os.write(target, data)
+        elif isinstance(target, io.TextIOBase) or not hasattr(target, 'mode') or 'b' not in target.mode:
+            target.write(data.decode(self.encoding, 'replace'))
+            target.flush()
+        else:
+            target.write(data)
+            target.flush()
+
+        return None
+
+    def dispatch_pending_input(self, input_data=None):
+        if self.returncode is not None:
+            return
+
+        data = self.stdin.getvalue() if self.stdin is not None else b''
+
+        if input_data is not None:
+            data += self.encode(input_data)
+
+        self.stdin = None
+        self.answer(data.decode(self.encoding, self.errors))
+
+    def communicate(self, input=None, timeout=None):
+        self.dispatch_pending_input(input)
+
+        stdout = self.stdout.read() if self.stdout is not None else None
+        stderr = self.stderr.read() if self.stderr is not None else None
+
+        return (stdout, stderr)
+
+    def wait(self, timeout=None):
+        self.dispatch_pending_input()
+        return self.returncode
+
+    def poll(self):
+        return self.wait()
+
+    def send_signal(self, signal):
+        pass
+
+    def terminate(self):
+        pass
+
+    def kill(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.wait()
+        return False
@@ -0,0 +1,92 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    the stub launcher: a lean command stub, which answers executions
+    fulfilling a stub configuration of the compiled stubs (or the dispatch
+    index) without importing logging. Everything else (no dispatch index,
+    unexpected executions) is handed over to the command stub, which logs
+    as usual.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import os
+import sys
+
+from shtub import (ANSWER_CURSORS_FILENAME,
+                   COMPILED_STUBS_DIRECTORY,
+                   DISPATCH_INDEX_DIRECTORY,
+                   EXECUTIONS_FILENAME,
+                   append_as_dictionary)
+from shtub.answercursors import advance_answer_cursor
+from shtub.answerwriter import send_answer, send_answer_first
+from shtub.blobs import spill
+from shtub.commandinput import CommandInput
+from shtub.compiledstubs import load_compiled_candidates
+from shtub.dispatchindex import find_candidate, load_candidates
+from shtub.execution import Execution
+from shtub.stdinreader import needs_stdin, read_stdin, read_stdin_timeout
+
+
+def handle_execution():
+    """
+        answers the execution of the command given in argv[0] using the
+        compiled stubs or, if there are none, the dispatch index.
+    """
+
+    command = os.path.basename(sys.argv[0])
+    arguments = sys.argv[1:]
+    candidates = load_compiled_candidates(command, COMPILED_STUBS_DIRECTORY)
+
+    if candidates is None:
+        candidates = load_candidates(command, DISPATCH_INDEX_DIRECTORY)
+
+    if candidates is None:
+        import shtub.commandstub
+        shtub.commandstub.handle_execution()
+        return
+
+    stdin = None
+
+    if needs_stdin(candidates):
+        stdin = read_stdin(read_stdin_timeout(candidates))
+
+    command_input = CommandInput(command, arguments, stdin)
+    candidate = find_candidate(command_input, candidates)
+
+    if candidate is None:
+        import shtub.commandstub
+        shtub.commandstub.initialize_logging()
+        shtub.commandstub.dispatch(command_input, candidates)
+        return
+
+    index, stub_configuration = candidate
+    execution = Execution(command, arguments, spill(os.curdir, stdin))
+    execution.mark_as_expected()
+
+    if stub_configuration.answer_first:
+        answer = advance_answer_cursor(ANSWER_CURSORS_FILENAME, index, stub_configuration)
+        send_answer_first(answer, execution)
+        return
+
+    append_as_dictionary(EXECUTIONS_FILENAME, execution)
+
+    send_answer(advance_answer_cursor(ANSWER_CURSORS_FILENAME, index, stub_configuration))
+
+
+if __name__ == '__main__':  # pragma: no cover
+    handle_execution()
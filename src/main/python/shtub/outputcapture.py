@@ -0,0 +1,123 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the streaming capture of the output of a command:
+    StreamCapture writes a stream to a file as it arrives and keeps only
+    the decoded tail in memory. The result is a CapturedOutput, which gives
+    access to the complete output on demand.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import codecs
+import io
+import os
+import threading
+
+TAIL_LIMIT_IN_CHARACTERS = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+
+
+class CapturedOutput (object):
+
+    """
+        Represents the captured output of a stream: the tail (at most
+        tail_limit characters) and the file containing the complete output.
+    """
+
+    def __init__(self, filename, encoding, tail, length, truncated):
+        self.filename = filename
+        self.encoding = encoding
+        self.tail = tail
+        self.length = length
+        self.truncated = truncated
+
+    def open(self):
+        """
+            returns a file handle to read the complete decoded output.
+        """
+
+        return io.open(self.filename, mode='r', encoding=self.encoding, errors='replace')
+
+    def read(self):
+        """
+            reads and returns the complete decoded output.
+        """
+
+        with self.open() as output_file:
+            return output_file.read()
+
+    def __str__(self):
+        return self.tail
+
+
+class StreamCapture (object):
+
+    """
+        Reads the given binary stream in a thread, appends every chunk to the
+        file with the given filename and keeps the last tail_limit decoded
+        characters.
+    """
+
+    def __init__(self, stream, filename, encoding, tail_limit=TAIL_LIMIT_IN_CHARACTERS):
+        self.stream = stream
+        self.filename = filename
+        self.encoding = encoding
+        self.tail_limit = tail_limit
+        self.decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        self.tail = ''
+        self.length = 0
+        self.truncated = False
+        self.thread = threading.Thread(target=self.capture)
+        self.thread.daemon = True
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def capture(self):
+        file_descriptor = self.stream.fileno()
+
+        with open(self.filename, mode='wb') as output_file:
+            while True:
+                chunk = os.read(file_descriptor, CHUNK_SIZE)
+                output_file.write(chunk)
+                self.append_to_tail(self.decoder.decode(chunk, final=not chunk))
+
+                if not chunk:
+                    break
+
+                self.length += len(chunk)
+
+        self.stream.close()
+
+    def append_to_tail(self, text):
+        self.tail += text
+
+        if len(self.tail) > self.tail_limit:
+            self.tail = self.tail[len(self.tail) - self.tail_limit:]
+            self.truncated = True
+
+    def join(self):
+        """
+            waits until the stream has been closed and returns the
+            CapturedOutput.
+        """
+
+        self.thread.join()
+
+        return CapturedOutput(self.filename, self.encoding, self.tail, self.length, self.truncated)
@@ -0,0 +1,242 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the output log of a test: one append-only file
+    containing the environment (written again only when it changes) and the
+    stdout and stderr of every executed command. The index holds one line of
+    json per command with the offsets of its stdout and stderr in the log, so
+    OutputLogReader can fetch the record of command N without parsing the log.
+    Output which has been streamed into files of OUTPUT_STREAMS_DIRECTORY is
+    referenced by the index only.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import fcntl
+import json
+import os
+
+from shtub import OUTPUT_LOG_FILENAME, OUTPUT_LOG_INDEX_FILENAME, OUTPUT_STREAMS_DIRECTORY
+
+ENVIRONMENT_HEADER = '--------------- ENVIRONMENT ----------------\n'
+COMMAND_HEADER = '================= COMMAND %02d =================\n'
+STDOUT_HEADER = '----------------- STDOUT -------------------\n'
+STDERR_HEADER = '----------------- STDERR -------------------\n'
+STREAMED_OUTPUT = '(%d bytes written to %s)\n'
+
+
+def append_to_file(filename, data):
+    """
+        appends the given bytes to the file with the given filename and
+        returns the offset they have been written to. The file is locked
+        while appending, so concurrent appends neither interleave nor report
+        the offset of another append.
+    """
+
+    file_descriptor = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    try:
+        fcntl.flock(file_descriptor, fcntl.LOCK_EX)
+        offset = os.lseek(file_descriptor, 0, os.SEEK_END)
+
+        while data:
+            written = os.write(file_descriptor, data)
+            data = data[written:]
+    finally:
+        os.close(file_descriptor)
+
+    return offset
+
+
+class OutputRecord (object):
+
+    """
+        Represents the output of one executed command.
+    """
+
+    def __init__(self, number, command, return_code, stdout, stderr):
+        self.number = number
+        self.command = command
+        self.return_code = return_code
+        self.stdout = stdout
+        self.stderr = stderr
+
+    def __str__(self):
+        return 'OutputRecord %02d %s' % (self.number, self.command)
+
+
+class OutputLog (object):
+
+    """
+        Appends the output of executed commands to the output log within the
+        given base directory.
+    """
+
+    def __init__(self, base_directory):
+        self.base_directory = base_directory
+        self.filename = os.path.join(base_directory, OUTPUT_LOG_FILENAME)
+        self.index_filename = os.path.join(base_directory, OUTPUT_LOG_INDEX_FILENAME)
+        self.environment = None
+
+    def append(self, number, command, environment, return_code, stdout, stderr):
+        """
+            appends the output of the command with the given number to the
+            log and its offsets to the index. The environment is written
+            when it differs from the one written last.
+        """
+
+        prefix = (self.header(number, command, environment) + STDOUT_HEADER).encode('utf-8')
+        stdout_data = stdout.encode('utf-8')
+        stderr_header = ('\n' if stdout_data and not stdout.endswith('\n') else '') + STDERR_HEADER
+        stderr_prefix = stderr_header.encode('utf-8')
+        stderr_data = stderr.encode('utf-8')
+        suffix = b'\n' if stderr_data and not stderr.endswith('\n') else b''
+
+        offset = append_to_file(self.filename, prefix + stdout_data + stderr_prefix + stderr_data + suffix)
+        stdout_offset = offset + len(prefix)
+        stderr_offset = stdout_offset + len(stdout_data) + len(stderr_prefix)
+
+        entry = {'number': number,
+                 'command': command,
+                 'return_code': return_code,
+                 'stdout': [stdout_offset, len(stdout_data)],
+                 'stderr': [stderr_offset, len(stderr_data)]}
+        self.append_to_index(entry)
+
+        return OutputRecord(number, command, return_code, stdout, stderr)
+
+    def append_streamed(self, number, command, environment, return_code, stdout, stderr):
+        """
+            appends a record for the command with the given number, whose
+            stdout and stderr (CapturedOutput) have been streamed into files.
+            Only the files are referenced.
+        """
+
+        text = self.header(number, command, environment)
+        entry = {'number': number,
+                 'command': command,
+                 'return_code': return_code}
+
+        for name, header, output in [('stdout', STDOUT_HEADER, stdout), ('stderr', STDERR_HEADER, stderr)]:
+            relative_filename = os.path.relpath(output.filename, self.base_directory)
+            text += header + STREAMED_OUTPUT % (output.length, relative_filename)
+            entry[name] = [0, output.length, relative_filename, output.encoding]
+
+        append_to_file(self.filename, text.encode('utf-8'))
+        self.append_to_index(entry)
+
+    def header(self, number, command, environment):
+        """
+            returns the header of a record, starting with the environment
+            when it differs from the one written last.
+        """
+
+        text = ''
+
+        if environment != self.environment:
+            text += ENVIRONMENT_HEADER
+            text += ''.join('%s=%s\n' % (key, environment[key]) for key in sorted(environment.keys()))
+            self.environment = dict(environment)
+
+        return text + COMMAND_HEADER % number + command + '\n'
+
+    def append_to_index(self, entry):
+        append_to_file(self.index_filename, (json.dumps(entry, sort_keys=True) + '\n').encode('utf-8'))
+
+    def stream_filename(self, number, name):
+        """
+            returns the filename to stream the output with the given name
+            (stdout or stderr) of the command with the given number into.
+        """
+
+        directory = os.path.join(self.base_directory, OUTPUT_STREAMS_DIRECTORY)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        return os.path.join(directory, '%02d-%s' % (number, name))
+
+
+class OutputLogReader (object):
+
+    """
+        Reads the records of the output log within the given base directory.
+        The index is read once; entries appended later are read when a
+        record is not known yet.
+    """
+
+    def __init__(self, base_directory):
+        self.base_directory = base_directory
+        self.filename = os.path.join(base_directory, OUTPUT_LOG_FILENAME)
+        self.index_filename = os.path.join(base_directory, OUTPUT_LOG_INDEX_FILENAME)
+        self.entries_by_number = {}
+        self.index_offset = 0
+
+    def read_index(self):
+        """
+            reads the complete lines appended to the index since it has been
+            read last.
+        """
+
+        if not os.path.exists(self.index_filename):
+            return
+
+        with open(self.index_filename, mode='rb') as index_file:
+            index_file.seek(self.index_offset)
+            data = index_file.read()
+
+        length = data.rfind(b'\n') + 1
+
+        for line in data[:length].decode('utf-8').splitlines():
+            if line.strip():
+                entry = json.loads(line)
+                self.entries_by_number.setdefault(entry['number'], entry)
+
+        self.index_offset += length
+
+    def __len__(self):
+        self.read_index()
+        return len(self.entries_by_number)
+
+    def record(self, number):
+        """
+            returns the OutputRecord of the command with the given number.
+        """
+
+        if number not in self.entries_by_number:
+            self.read_index()
+
+        entry = self.entries_by_number.get(number)
+
+        if entry is not None:
+            return OutputRecord(number,
+                                entry['command'],
+                                entry['return_code'],
+                                self.read(*entry['stdout']),
+                                self.read(*entry['stderr']))
+
+        raise IndexError('There is no output of command %d in "%s".' % (number, self.filename))
+
+    def read(self, offset, length, relative_filename=None, encoding='utf-8'):
+        filename = self.filename
+
+        if relative_filename is not None:
+            filename = os.path.join(self.base_directory, relative_filename)
+
+        with open(filename, mode='rb') as log_file:
+            log_file.seek(offset)
+            return log_file.read(length).decode(encoding, 'replace')
@@ -0,0 +1,198 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+"""
+    this module writes a bash file defining exported functions which replay
+    the answers of simple stub configurations without starting a command stub.
+    A command is replayed by a function when all of its stub configurations
+    have exactly one answer and do not expect any input; all other commands
+    are answered by the command stub as usual. Like the command stub the
+    functions read stdin only when a stub configuration sets a timeout for
+    reading it. The functions append their expected executions to the
+    executions journal using a single printf, so the VerifierLoader reads
+    them together with the executions of command stubs. Like the command
+    stub they return 255 without recording unexpected executions.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import re
+
+try:
+    from shlex import quote
+except ImportError:
+    from pipes import quote
+
+from shtub import READ_STDIN_TIMEOUT_IN_SECONDS
+from shtub.blobs import is_referenced
+from shtub.dispatchindex import group_by_command
+from shtub.stdinreader import needs_stdin, read_stdin_timeout
+
+UNEXPECTED_EXECUTION_RETURN_CODE = 255
+
+FUNCTION_NAME_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+
+CONTROL_CHARACTERS = "$'%s'" % ''.join('\\%03o' % code for code in range(1, 32))
+
+HELPER_FUNCTIONS_TEMPLATE = """__shtub_json () {
+    local value=$1 escaped='' character index
+    value=${value//'\\'/'\\\\'}
+    value=${value//'"'/'\\"'}
+    value=${value//$'\\n'/'\\n'}
+    value=${value//$'\\r'/'\\r'}
+    value=${value//$'\\t'/'\\t'}
+    if [[ $value == *[%(control_characters)s]* ]]; then
+        for (( index = 0; index < ${#value}; index++ )); do
+            character=${value:index:1}
+            case $character in
+                [%(control_characters)s]) printf -v character '\\\\u%%04x' "'$character" ;;
+            esac
+            escaped+=$character
+        done
+        value=$escaped
+    fi
+    __shtub_json_value="\\"$value\\""
+}
+
+__shtub_contains () {
+    local wanted=$1 argument
+    shift
+    for argument in "$@"; do
+        [ "$argument" = "$wanted" ] && return 0
+    done
+    return 1
+}
+
+__shtub_read_stdin () {
+    __shtub_stdin=''
+    if [ -p /dev/stdin ] || [ -S /dev/stdin ] || [ -f /dev/stdin ]; then
+        IFS= read -r -d '' -t "$1" __shtub_stdin
+    fi
+    return 0
+}
+
+__shtub_record () {
+    local command=$1 arguments='' argument
+    shift
+    for argument in "$@"; do
+        __shtub_json "$argument"
+        arguments+="${arguments:+, }$__shtub_json_value"
+    done
+    __shtub_json "$command"
+    local record="{\\"command_input\\": {\\"arguments\\": [$arguments], \\"command\\": $__shtub_json_value, "
+    if [ -n "${__shtub_stdin+captured}" ]; then
+        __shtub_json "$__shtub_stdin"
+    else
+        __shtub_json_value=null
+    fi
+    record+="\\"stdin\\": $__shtub_json_value}, \\"expected\\": true}"
+    printf '%%s\\n' "$record" >> %(executions_filename)s
+}
+
+export -f __shtub_json __shtub_contains __shtub_read_stdin __shtub_record
+"""
+
+
+def can_be_replayed(command, stub_configurations):
+    """
+        returns True when the given stub configurations of the given command
+        can be replayed by a shell function: each of them has exactly one
+        answer, which is neither spilled to the blob store nor read from a
+        file, and does not expect any input.
+    """
+
+    if not FUNCTION_NAME_PATTERN.match(command):
+        return False
+
+    for stub_configuration in stub_configurations:
+        if len(stub_configuration.answers) != 1 or stub_configuration.command_input.stdin is not None:
+            return False
+
+        answer = stub_configuration.answers[0]
+
+        if is_referenced(answer.stdout) or is_referenced(answer.stderr):
+            return False
+
+    return True
+
+
+def render_answer(answer):
+    lines = []
+
+    if answer.milliseconds_to_wait:
+        lines.append('sleep %s' % (answer.milliseconds_to_wait / 1000.0))
+
+    if answer.stdout is not None:
+        lines.append("printf '%%s' %s" % quote(answer.stdout))
+
+    if answer.stderr is not None:
+        lines.append("printf '%%s' %s >&2" % quote(answer.stderr))
+
+    lines.append('return %d' % answer.return_code)
+
+    return lines
+
+
+def render_function(command, candidates):
+    """
+        returns the definition of the shell function replaying the given
+        candidates of the given command.
+    """
+
+    lines = ['%s () {' % command]
+
+    if needs_stdin(candidates):
+        lines.append('    __shtub_read_stdin %s' % read_stdin_timeout(candidates, READ_STDIN_TIMEOUT_IN_SECONDS))
+    else:
+        lines.append('    unset __shtub_stdin')
+
+    for _, stub_configuration in candidates:
+        conditions = ['__shtub_contains %s "$@"' % quote(argument)
+                      for argument in stub_configuration.command_input.arguments]
+        lines.append('    if %s; then' % (' && '.join(conditions) or 'true'))
+        lines.append('        __shtub_record %s "$@"' % quote(command))
+        lines.extend('        ' + line for line in render_answer(stub_configuration.answers[0]))
+        lines.append('    fi')
+
+    lines.append('    return %d' % UNEXPECTED_EXECUTION_RETURN_CODE)
+    lines.append('}')
+    lines.append('export -f %s' % command)
+
+    return '\n'.join(lines) + '\n'
+
+
+def write_shell_functions(filename, executions_filename, stub_configurations):
+    """
+        writes the bash file defining the functions of all commands which can
+        be replayed and returns the list of these commands. The file is
+        written even if there are none, so functions of earlier fixtures are
+        not used anymore.
+    """
+
+    definitions = [HELPER_FUNCTIONS_TEMPLATE % {'executions_filename': quote(executions_filename),
+                                                'control_characters': CONTROL_CHARACTERS}]
+    replayed_commands = []
+
+    for command, candidates in sorted(group_by_command(stub_configurations).items()):
+        if can_be_replayed(command, [stub_configuration for _, stub_configuration in candidates]):
+            definitions.append(render_function(command, candidates))
+            replayed_commands.append(command)
+
+    with open(filename, mode='w') as shell_functions_file:
+        shell_functions_file.write('\n'.join(definitions))
+
+    return replayed_commands
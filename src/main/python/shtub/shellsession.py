@@ -0,0 +1,163 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the class ShellSession, which keeps one shell
+    running and executes commands in subshells of it. The end of the
+    output of a command is marked by a sentinel line on stdout (carrying the
+    return code) and on stderr.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import os
+import subprocess
+import uuid
+
+from select import select
+
+try:
+    from shlex import quote
+except ImportError:
+    from pipes import quote
+
+SHELL = '/bin/sh'
+READ_SIZE = 64 * 1024
+POLL_INTERVAL_IN_SECONDS = 0.1
+
+COMMAND_TEMPLATE = ("( eval %(command)s ) </dev/null\n"
+                    "__shtub_return_code=$?\n"
+                    "printf '\\n%%s %%d\\n' '%(sentinel)s' \"$__shtub_return_code\"\n"
+                    "printf '\\n%%s\\n' '%(sentinel)s' >&2\n")
+
+
+class ShellSessionException (Exception):
+
+    """
+        to be raised when the shell of the session is not running anymore.
+    """
+
+
+class ShellSession (object):
+
+    """
+        Keeps a shell running in the given directory with the given
+        environment. Please call close when the session is not needed anymore.
+    """
+
+    def __init__(self, cwd, env):
+        self.cwd = cwd
+        self.env = dict(env)
+        self.sentinel = ('shtub-' + uuid.uuid4().hex).encode('ascii')
+        self.process = subprocess.Popen(args=[SHELL],
+                                        stdin=subprocess.PIPE,
+                                        stdout=subprocess.PIPE,
+                                        stderr=subprocess.PIPE,
+                                        cwd=cwd,
+                                        env=env)
+
+    def is_alive(self):
+        return self.process.poll() is None
+
+    def execute(self, command):
+        """
+            executes the given command in a subshell with stdin from /dev/null
+            and returns the return code, stdout and stderr (as bytes). Raises a
+            ShellSessionException when the shell is not running, the command
+            has not been executed then. When the shell dies while executing
+            the command, its return code and the output read so far are
+            returned.
+        """
+
+        if not self.is_alive():
+            raise ShellSessionException('Shell session is not running.')
+
+        script = COMMAND_TEMPLATE % {'command': quote(command), 'sentinel': self.sentinel.decode('ascii')}
+
+        try:
+            self.process.stdin.write(script.encode('utf-8'))
+            self.process.stdin.flush()
+        except (IOError, OSError):
+            raise ShellSessionException('Could not send command to shell session.')
+
+        return self.read_output()
+
+    def read_output(self):
+        stdout_marker = b'\n' + self.sentinel + b' '
+        stderr_marker = b'\n' + self.sentinel + b'\n'
+        buffers = {self.process.stdout.fileno(): b'', self.process.stderr.fileno(): b''}
+        pending = list(buffers.keys())
+
+        while pending:
+            readable, _, _ = select(pending, [], [], POLL_INTERVAL_IN_SECONDS)
+
+            if not readable and not self.is_alive():
+                return self.output_of_died_shell(buffers)
+
+            for file_descriptor in readable:
+                chunk = os.read(file_descriptor, READ_SIZE)
+
+                if not chunk:
+                    return self.output_of_died_shell(buffers)
+
+                buffers[file_descriptor] += chunk
+                data = buffers[file_descriptor]
+
+                if file_descriptor == self.process.stderr.fileno():
+                    if data.endswith(stderr_marker):
+                        pending.remove(file_descriptor)
+                elif data.endswith(b'\n') and data.rfind(stdout_marker) >= 0:
+                    pending.remove(file_descriptor)
+
+        stdout = buffers[self.process.stdout.fileno()]
+        stderr = buffers[self.process.stderr.fileno()]
+
+        marker_position = stdout.rfind(stdout_marker)
+        return_code = int(stdout[marker_position + len(stdout_marker):].strip())
+
+        return (return_code, stdout[:marker_position], stderr[:-len(stderr_marker)])
+
+    def output_of_died_shell(self, buffers):
+        """
+            returns the return code of the shell, which died while executing
+            a command, and the output of the command read so far.
+        """
+
+        for file_descriptor in buffers.keys():
+            while select([file_descriptor], [], [], 0)[0]:
+                chunk = os.read(file_descriptor, READ_SIZE)
+                if not chunk:
+                    break
+                buffers[file_descriptor] += chunk
+
+        return (self.process.wait(),
+                buffers[self.process.stdout.fileno()],
+                buffers[self.process.stderr.fileno()])
+
+    def close(self):
+        """
+            terminates the shell.
+        """
+
+        if self.is_alive():
+            try:
+                self.process.stdin.close()
+            except (IOError, OSError):
+                pass
+            self.process.wait()
+
+        self.process.stdout.close()
+        self.process.stderr.close()
@@ -0,0 +1,42 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module executes an argv without a shell. The working directory is
+    changed in the child only, so the working directory of this process
+    (and its other threads) is never changed.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import subprocess
+
+
+def spawn_and_capture(argv, cwd, env):
+    """
+        executes the given argv in the given directory with the given
+        environment and returns the return code, stdout and stderr (as bytes).
+        The program is looked up in the PATH of the given environment.
+    """
+
+    process = subprocess.Popen(args=argv,
+                               stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE,
+                               cwd=cwd,
+                               env=env)
+    stdout, stderr = process.communicate()
+
+    return (process.returncode, stdout, stderr)
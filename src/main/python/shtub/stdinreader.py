@@ -0,0 +1,125 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module reads the input of a command stub from stdin. Instead of
+    waiting for input on every kind of stdin, stdin is classified using
+    fstat first: only pipes and sockets may deliver data later, so only
+    those are waited for. Stdin is not read at all when no stub
+    configuration needs it.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import os
+import stat
+import sys
+
+from select import select
+
+from shtub import READ_STDIN_TIMEOUT_IN_SECONDS
+
+STDIN_CLOSED = 'closed'
+STDIN_TERMINAL = 'terminal'
+STDIN_DEVICE = 'device'
+STDIN_FILE = 'file'
+STDIN_STREAM = 'stream'
+
+
+def classify_stdin(file_descriptor):
+    """
+        returns what kind of file the given file descriptor refers to:
+        STDIN_CLOSED, STDIN_TERMINAL, STDIN_DEVICE (e.g. /dev/null),
+        STDIN_FILE (a regular file) or STDIN_STREAM (a pipe or a socket).
+    """
+
+    try:
+        mode = os.fstat(file_descriptor).st_mode
+    except OSError:
+        return STDIN_CLOSED
+
+    if os.isatty(file_descriptor):
+        return STDIN_TERMINAL
+
+    if stat.S_ISREG(mode):
+        return STDIN_FILE
+
+    if stat.S_ISFIFO(mode) or stat.S_ISSOCK(mode):
+        return STDIN_STREAM
+
+    return STDIN_DEVICE
+
+
+def read_stdin(timeout_in_seconds=None, stdin=None):
+    """
+        returns the complete input from stdin. A terminal or a device (like
+        /dev/null) does not provide input, a regular file is read at once.
+        A pipe or socket is waited for at most timeout_in_seconds seconds
+        (default: READ_STDIN_TIMEOUT_IN_SECONDS) and then read until the end
+        of file if there is any input. Without input an empty string is
+        returned.
+    """
+
+    if stdin is None:
+        stdin = sys.stdin
+
+    if timeout_in_seconds is None:
+        timeout_in_seconds = READ_STDIN_TIMEOUT_IN_SECONDS
+
+    try:
+        file_descriptor = stdin.fileno()
+    except (AttributeError, ValueError):
+        return ''
+
+    kind_of_stdin = classify_stdin(file_descriptor)
+
+    if kind_of_stdin == STDIN_FILE:
+        return stdin.read()
+
+    if kind_of_stdin == STDIN_STREAM:
+        read_list, _, _ = select([stdin], [], [], timeout_in_seconds)
+
+        if len(read_list) > 0:
+            return stdin.read()
+
+    return ''
+
+
+def read_stdin_timeout(candidates, default=None):
+    """
+        returns the longest timeout for reading stdin configured by any of
+        the given candidates or default if none of them configures one.
+    """
+
+    timeouts = [stub_configuration.read_stdin_timeout_in_seconds
+                for _, stub_configuration in candidates
+                if stub_configuration.read_stdin_timeout_in_seconds is not None]
+
+    if not timeouts:
+        return default
+
+    return max(timeouts)
+
+
+def needs_stdin(candidates):
+    """
+        returns True when any of the given candidates matches stdin or
+        configures a timeout for reading it.
+    """
+
+    return any(stub_configuration.command_input.stdin is not None
+               or stub_configuration.read_stdin_timeout_in_seconds is not None
+               for _, stub_configuration in candidates)
@@ -0,0 +1,135 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    the stub client: forwards arguments, stdin and the file descriptors of
+    stdout and stderr to the stub server and exits with the returned code.
+    When no stub server is listening the command stub is used instead.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import array
+import json
+import os
+import socket
+import sys
+
+from shtub import STUB_SERVER_SOCKET_FILENAME
+from shtub.stdinreader import read_stdin
+
+
+def connect(socket_filename=STUB_SERVER_SOCKET_FILENAME):
+    """
+        returns a connection to the stub server or None if there is no stub
+        server listening on the given socket.
+    """
+
+    if not hasattr(socket, 'AF_UNIX') or not hasattr(socket.socket, 'sendmsg'):
+        return None
+
+    connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    try:
+        connection.connect(socket_filename)
+    except socket.error:
+        connection.close()
+        return None
+
+    return connection
+
+
+def send_message(connection, message):
+    """
+        sends the given message as line of json to the stub server.
+    """
+
+    connection.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+
+def send_request(connection, command, arguments):
+    """
+        sends command and arguments as line of json together with the file
+        descriptors of stdout and stderr to the stub server.
+    """
+
+    request = json.dumps({'command': command, 'arguments': arguments}) + '\n'
+    data = request.encode('utf-8')
+    file_descriptors = array.array('i', [sys.stdout.fileno(), sys.stderr.fileno()])
+
+    sent = connection.sendmsg([data], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, file_descriptors)])
+
+    if sent < len(data):
+        connection.sendall(data[sent:])
+
+
+def receive_message(response_file):
+    """
+        waits for the next message of the stub server and returns it. Returns
+        None when the stub server closed the connection.
+    """
+
+    response = response_file.readline()
+
+    if not response:
+        return None
+
+    return json.loads(response.decode('utf-8'))
+
+
+def handle_execution():
+    """
+        forwards the execution to the stub server and exits with the return
+        code of the answer. Exits with 255 when the stub server closed the
+        connection without answering.
+    """
+
+    connection = connect()
+
+    if connection is None:
+        import shtub.commandstub
+        shtub.commandstub.handle_execution()
+        return
+
+    command = os.path.basename(sys.argv[0])
+    arguments = sys.argv[1:]
+
+    sys.stdout.flush()
+    sys.stderr.flush()
+
+    response_file = connection.makefile('rb')
+    send_request(connection, command, arguments)
+    settings = receive_message(response_file)
+    return_code = 255
+
+    if settings is not None:
+        stdin = None
+
+        if settings.get('capture_stdin', True):
+            stdin = read_stdin(settings['read_stdin_timeout_in_seconds'])
+
+        send_message(connection, {'stdin': stdin})
+        response = receive_message(response_file)
+
+        if response is not None:
+            return_code = response['return_code']
+
+    connection.close()
+    sys.exit(return_code)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    handle_execution()
@@ -22,6 +22,7 @@
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner, Maximilien Riehl, Marcel Wolf'
 
 from shtub.answer import Answer
+from shtub.blobs import payload_from_dictionary
 from shtub.commandinput import CommandInput
 
 
@@ -31,16 +32,20 @@ class StubConfiguration(object):
         Represents the configuration of a command stub and contains the corresponding answers.
     """
 
-    def __init__(self, command, arguments=[], stdin=None, answers=[], initial_answer=0):
+    def __init__(self, command, arguments=[], stdin=None, answers=[], initial_answer=0,
+                 read_stdin_timeout_in_seconds=None, answer_first=False):
         """
             will initialize a new object with the given properties.
-            answers and initial_answer are not mandatory.
+            answers, initial_answer, read_stdin_timeout_in_seconds and
+            answer_first are not mandatory.
         """
 
-        self.command_input = CommandInput(command, arguments, stdin)
+        self.command_input = CommandInput(command, arguments, stdin).freeze_arguments()
 
         self.answers = []
         self.current_answer = initial_answer
+        self.read_stdin_timeout_in_seconds = read_stdin_timeout_in_seconds
+        self.answer_first = answer_first
 
         for answer in answers:
             self.answers.append(answer)
@@ -60,7 +65,9 @@ class StubConfiguration(object):
 
         result = {'command_input': self.command_input.as_dictionary(),
                   'answers': answers_list,
-                  'current_answer': self.current_answer}
+                  'current_answer': self.current_answer,
+                  'read_stdin_timeout_in_seconds': self.read_stdin_timeout_in_seconds,
+                  'answer_first': self.answer_first}
 
         return result
 
@@ -81,6 +88,15 @@ class StubConfiguration(object):
 
         return result
 
+    def has_static_answer(self):
+        """
+            returns True when next_answer will always return the same answer,
+            i.e. the current answer is the last one: moving the answer cursor
+            is not needed then.
+        """
+
+        return self.current_answer >= len(self.answers) - 1
+
     def then(self, answer):
         """
             will append the given answer to the list of answers and return
@@ -94,7 +110,8 @@ class StubConfiguration(object):
     def then_answer(self, stdout=None, stderr=None, return_code=0, milliseconds_to_wait=None):
         """
             a convenience method to "then" which will create a new answer
-            object with the given properties.
+            object with the given properties. stdout and stderr are either
+            text or a FileSource, which is copied by the stub.
         """
 
         return self.then(Answer(stdout, stderr, return_code, milliseconds_to_wait))
@@ -121,6 +138,7 @@ class StubConfiguration(object):
         """
 
         self.command_input.arguments = list(arguments)
+        self.command_input.freeze_arguments()
 
         return self
 
@@ -133,6 +151,27 @@ class StubConfiguration(object):
 
         return self
 
+    def with_read_stdin_timeout(self, seconds):
+        """
+            sets how many seconds the command stub waits for input on a pipe
+            or socket and returns self for invocation chaining
+        """
+
+        self.read_stdin_timeout_in_seconds = seconds
+
+        return self
+
+    def with_answer_first(self):
+        """
+            lets the command stub send the answer and detach from stdout and
+            stderr before it records the execution and returns self for
+            invocation chaining
+        """
+
+        self.answer_first = True
+
+        return self
+
     def __eq__(self, other):
         return  self.command_input == other.command_input \
             and self.current_answer == other.current_answer \
@@ -160,9 +199,10 @@ class StubConfiguration(object):
             command_input_dictionary['command'],
             command_input_dictionary[
                 'arguments'],
-            command_input_dictionary[
-                'stdin'],
+            payload_from_dictionary(command_input_dictionary['stdin']),
             answers,
-            dictionary['current_answer'])
+            dictionary['current_answer'],
+            dictionary.get('read_stdin_timeout_in_seconds'),
+            dictionary.get('answer_first', False))
 
         return stub_configuration
@@ -0,0 +1,301 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the class StubServer, which answers the executions
+    of command stubs within the test process. The configurations, the answer
+    cursors and the executions are kept in memory, so a stub client only has
+    to forward its input over a unix socket:
+
+        client: {"command": ..., "arguments": [...]} + stdout and stderr
+        server: {"read_stdin_timeout_in_seconds": ..., "capture_stdin": ...}
+        client: {"stdin": ...}
+        server: {"return_code": ...}
+"""
+
+from __future__ import division
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import array
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+try:
+    from socketserver import BaseRequestHandler, ThreadingMixIn, UnixStreamServer
+except ImportError:
+    from SocketServer import BaseRequestHandler, ThreadingMixIn, UnixStreamServer
+
+from shtub import (CONFIGURED_STUBS_FILENAME,
+                   EXECUTIONS_FILENAME,
+                   STUB_SERVER_SOCKET_FILENAME,
+                   append_as_dictionary,
+                   deserialize_stub_configurations)
+from shtub.blobs import copy_blob, is_referenced, spill
+from shtub.commandinput import CommandInput
+from shtub.dispatchindex import find_candidate, group_by_command
+from shtub.execution import Execution
+from shtub.stdinreader import needs_stdin, read_stdin_timeout
+
+UNEXPECTED_EXECUTION_RETURN_CODE = 255
+COUNT_OF_FORWARDED_FILE_DESCRIPTORS = 2
+RECEIVE_BUFFER_SIZE = 64 * 1024
+
+
+def receive_request(connection):
+    """
+        receives the first request of a stub client: a line of json, which has been
+        sent together with the file descriptors of stdout and stderr of the
+        client. Returns the decoded dictionary and the list of received file
+        descriptors.
+    """
+
+    file_descriptors = array.array('i')
+    ancillary_size = socket.CMSG_SPACE(
+        COUNT_OF_FORWARDED_FILE_DESCRIPTORS * file_descriptors.itemsize)
+    data, ancillary_data, _, _ = connection.recvmsg(RECEIVE_BUFFER_SIZE, ancillary_size)
+
+    for level, message_type, message_data in ancillary_data:
+        if level == socket.SOL_SOCKET and message_type == socket.SCM_RIGHTS:
+            usable_length = len(message_data) - (len(message_data) % file_descriptors.itemsize)
+            file_descriptors.frombytes(message_data[:usable_length])
+
+    chunks = [data]
+    while data and not data.endswith(b'\n'):
+        data = connection.recv(RECEIVE_BUFFER_SIZE)
+        chunks.append(data)
+
+    request = json.loads(b''.join(chunks).decode('utf-8'))
+    return request, list(file_descriptors)
+
+
+def write_to_file_descriptor(file_descriptor, text):
+    """
+        writes the given text utf-8 encoded to the given file descriptor.
+    """
+
+    data = text.encode('utf-8')
+
+    while data:
+        written = os.write(file_descriptor, data)
+        data = data[written:]
+
+
+class StubRequestHandler (BaseRequestHandler):
+
+    """
+        handles exactly one execution of a stub client.
+    """
+
+    def send_message(self, message):
+        self.request.sendall((json.dumps(message) + '\n').encode('utf-8'))
+
+    def handle(self):
+        """
+            receives command and arguments, tells the stub client whether and
+            how long to wait for stdin, receives stdin and responds with the
+            return code.
+        """
+
+        request, file_descriptors = receive_request(self.request)
+        return_code = UNEXPECTED_EXECUTION_RETURN_CODE
+
+        try:
+            stub_server = self.server.stub_server
+            selection = stub_server.select_candidates(request['command'])
+            candidates, _ = selection
+
+            self.send_message({'read_stdin_timeout_in_seconds': read_stdin_timeout(candidates),
+                               'capture_stdin': needs_stdin(candidates)})
+            stdin = json.loads(self.request.makefile('rb').readline().decode('utf-8'))['stdin']
+
+            command_input = CommandInput(request['command'], request['arguments'], stdin)
+            stdout_file_descriptor, stderr_file_descriptor = file_descriptors
+            return_code = stub_server.dispatch(
+                command_input, stdout_file_descriptor, stderr_file_descriptor, selection)
+        except Exception:
+            logging.exception('Could not handle request %s', request)
+        finally:
+            for file_descriptor in file_descriptors:
+                os.close(file_descriptor)
+
+        self.send_message({'return_code': return_code})
+
+
+class ThreadingUnixStreamServer (ThreadingMixIn, UnixStreamServer):
+
+    daemon_threads = True
+
+
+class StubServer (object):
+
+    """
+        Answers executions of stub clients within the base directory. Please
+        use instances of this class in a "with" statement or call start and
+        shutdown.
+    """
+
+    def __init__(self, base_directory):
+        """
+            initializes a new stub server for the given base directory.
+        """
+
+        self.base_directory = base_directory
+        self.socket_filename = os.path.join(base_directory, STUB_SERVER_SOCKET_FILENAME)
+        self.stub_configurations_filename = os.path.join(base_directory, CONFIGURED_STUBS_FILENAME)
+        self.executions_filename = os.path.join(base_directory, EXECUTIONS_FILENAME)
+
+        self.stub_configurations = []
+        self.stub_configurations_signature = None
+        self.candidates_by_command = {}
+        self.cursor_locks = []
+        self.executions = []
+
+        self.configurations_lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    def start(self):
+        """
+            binds the unix socket and serves requests in a daemon thread.
+        """
+
+        if os.path.exists(self.socket_filename):
+            os.remove(self.socket_filename)
+
+        self.server = ThreadingUnixStreamServer(self.socket_filename, StubRequestHandler)
+        self.server.stub_server = self
+
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+        return self
+
+    def shutdown(self):
+        """
+            stops serving requests and removes the unix socket.
+        """
+
+        if self.server is None:
+            return
+
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        self.server = None
+
+        if os.path.exists(self.socket_filename):
+            os.remove(self.socket_filename)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.shutdown()
+        return False
+
+    def load_stub_configurations(self):
+        """
+            (re)loads the stub configurations when the file written by the
+            fixture has changed since it has been loaded the last time.
+            The answer cursors are kept in memory, they start again when the
+            stub configurations are written again.
+        """
+
+        if not os.path.exists(self.stub_configurations_filename):
+            self.stub_configurations = []
+            self.stub_configurations_signature = None
+            self.candidates_by_command = {}
+            self.cursor_locks = []
+            return
+
+        status = os.stat(self.stub_configurations_filename)
+        signature = (status.st_ino, status.st_size, status.st_mtime)
+
+        if signature != self.stub_configurations_signature:
+            self.stub_configurations = deserialize_stub_configurations(
+                self.stub_configurations_filename)
+            self.stub_configurations_signature = signature
+            self.candidates_by_command = group_by_command(self.stub_configurations)
+            self.cursor_locks = [threading.Lock() for _ in self.stub_configurations]
+
+    def record_execution(self, execution):
+        """
+            appends the given execution to the executions in memory and to the
+            executions journal, so the VerifierLoader is able to read them.
+        """
+
+        self.executions.append(execution)
+        append_as_dictionary(self.executions_filename, execution)
+
+    def select_candidates(self, command):
+        """
+            returns the candidates of the given command and the locks of the
+            answer cursors of the current stub configurations.
+        """
+
+        with self.configurations_lock:
+            self.load_stub_configurations()
+            return self.candidates_by_command.get(command, []), self.cursor_locks
+
+    def dispatch(self, command_input, stdout_file_descriptor, stderr_file_descriptor, selection=None):
+        """
+            tests whether the given command_input fulfills a stub configuration.
+            If so the execution will be recorded and the next answer will be
+            written to the given file descriptors. Returns the return code the
+            stub client has to exit with. Only the answer cursor of the
+            fulfilled stub configuration is locked, unless its answer is
+            static.
+        """
+
+        execution = Execution(command_input.command, command_input.arguments,
+                              spill(self.base_directory, command_input.stdin))
+        answer = None
+
+        candidates, cursor_locks = selection or self.select_candidates(command_input.command)
+        candidate = find_candidate(command_input, candidates)
+
+        if candidate is not None:
+            index, stub_configuration = candidate
+            execution.mark_as_expected()
+            self.record_execution(execution)
+
+            if stub_configuration.has_static_answer():
+                answer = stub_configuration.next_answer()
+            else:
+                with cursor_locks[index]:
+                    answer = stub_configuration.next_answer()
+
+        if answer is None:
+            logging.error('%s does not fulfill requirements of any stub configuration.', command_input)
+            return UNEXPECTED_EXECUTION_RETURN_CODE
+
+        if answer.milliseconds_to_wait:
+            time.sleep(answer.milliseconds_to_wait / 1000)
+
+        for payload, file_descriptor in [(answer.stdout, stdout_file_descriptor),
+                                         (answer.stderr, stderr_file_descriptor)]:
+            if is_referenced(payload):
+                copy_blob(payload, file_descriptor, self.base_directory)
+            elif payload is not None:
+                write_to_file_descriptor(file_descriptor, payload)
+
+        return answer.return_code
@@ -16,61 +16,247 @@
 
 __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
-import codecs
 import os
 import subprocess
 import tempfile
+import threading
 import unittest
 import sys
 
+try:
+    from queue import Empty, Queue
+except ImportError:
+    from Queue import Empty, Queue
 
-from shtub import BASEDIR, STUBS_DIRECTORY
+try:
+    from shlex import quote
+except ImportError:
+    from pipes import quote
+
+
+import shtub
+from shtub import BASEDIR, SHELL_FUNCTIONS_FILENAME, STUBS_DIRECTORY
+from shtub.basedirs import BaseDirRemover, RetainedBaseDirs
 from shtub.fixture import Fixture
+from shtub.outputcapture import TAIL_LIMIT_IN_CHARACTERS, StreamCapture
+from shtub.outputlog import OutputLog, OutputLogReader
+from shtub.shellsession import ShellSession, ShellSessionException
+from shtub.spawn import spawn_and_capture
+from shtub.stubserver import StubServer
+from shtub.testbedtemplates import TESTBED_TEMPLATES, link_stub_commands, write_stub_script
 from shtub.verification.verifierloader import VerifierLoader
 
 
+RAM_BACKED_DIRECTORY = '/dev/shm'
+
+BASE_DIR_REMOVER = BaseDirRemover()
+RETAINED_BASE_DIRS = RetainedBaseDirs(BASE_DIR_REMOVER)
+
 STUB_SCRIPT_CONTENT = """#!/usr/bin/env python
 import shtub.commandstub
 
 shtub.commandstub.handle_execution()
 """
 
+STUB_CLIENT_SCRIPT_CONTENT = """#!/usr/bin/env python
+import shtub.stubclient
+
+shtub.stubclient.handle_execution()
+"""
+
+LAUNCHER_SCRIPT_TEMPLATE = """#!%(interpreter)s %(interpreter_flags)s
+import sys
+sys.path.insert(0, %(shtub_path)r)
+import shtub.launcher
+
+shtub.launcher.handle_execution()
+"""
+
+
+def ram_backed_directory(directory=RAM_BACKED_DIRECTORY):
+    """
+        returns the given tmpfs directory if temporary directories can be
+        created in it, otherwise None.
+    """
+
+    if os.path.isdir(directory) and os.access(directory, os.W_OK | os.X_OK):
+        return directory
+
+    return None
+
+
+def launcher_script_content():
+    """
+        returns the content of a stub script which runs the stub launcher
+        using the absolute path of the current interpreter in isolated mode
+        and without importing site. Since neither PYTHONPATH nor the site
+        packages are used, the path of shtub is inserted into sys.path.
+    """
+
+    if sys.version_info >= (3, 4):
+        interpreter_flags = '-IS'
+    else:
+        interpreter_flags = '-EsS'
+
+    shtub_path = os.path.dirname(os.path.dirname(os.path.abspath(shtub.__file__)))
+
+    return LAUNCHER_SCRIPT_TEMPLATE % {'interpreter': sys.executable,
+                                       'interpreter_flags': interpreter_flags,
+                                       'shtub_path': shtub_path}
+
+
+class OutcomeRecorder (object):
+
+    """
+        wraps a test result and records whether the test failed.
+    """
+
+    def __init__(self, result):
+        self.result = result
+        self.failed = False
+
+        if hasattr(result, 'addSubTest'):
+            self.addSubTest = self.add_sub_test
+
+    def addError(self, test, error):
+        self.failed = True
+        self.result.addError(test, error)
+
+    def addFailure(self, test, error):
+        self.failed = True
+        self.result.addFailure(test, error)
+
+    def add_sub_test(self, test, subtest, error):
+        if error is not None:
+            self.failed = True
+        self.result.addSubTest(test, subtest, error)
+
+    def __getattr__(self, name):
+        return getattr(self.result, name)
+
 
 class IntegrationTestBase (unittest.TestCase):
 
+    keep_base_dirs_of_failed_tests = True
+    max_size_of_retained_base_dirs = None
+    command_counter = 0
+    use_shell_functions = False
+    use_launcher = False
+
     def setUp(self):
         self.command_counter = 0
+        self.temporary_base_dirs = []
+        self.use_shell_functions = False
         self.set_base_dir(None)
 
-    def _normalize_command_line(self, command):
-        normalized = command.replace(' ', '_') \
-                            .replace('*', '_') \
-                            .replace('?', '_') \
-                            .replace(':', '_') \
-                            .replace('/', '_')
-        return normalized
+    def run(self, result=None):
+        if result is None:
+            result = self.defaultTestResult()
+
+        outcome = OutcomeRecorder(result)
+
+        try:
+            super(IntegrationTestBase, self).run(outcome)
+        finally:
+            self.tear_down_base_dirs(outcome.failed)
+
+        return result
+
+    def tear_down_base_dirs(self, failed):
+        """
+            removes the temporary base directories of this test in the
+            background. The current base directory is kept when cleanup_base_dir
+            is False, or when the test failed and keep_base_dirs_of_failed_tests
+            is set; kept base directories of failed tests are removed again
+            when they exceed max_size_of_retained_base_dirs (in bytes) in total.
+            The state directory of a given RAM-backed base directory is
+            removed unless the test failed and its base directory is kept.
+        """
+
+        state_dir = getattr(self, 'state_dir', None)
+
+        if state_dir:
+            if failed and self.keep_base_dirs_of_failed_tests:
+                RETAINED_BASE_DIRS.retain(state_dir, self.max_size_of_retained_base_dirs)
+            else:
+                BASE_DIR_REMOVER.remove(state_dir)
 
-    def _write_output_file(self, command, stdout, stderr):
-        normalized = self._normalize_command_line(command)
-        filename = '%02d-%s' % (self.command_counter, normalized)
-        output_path = os.path.join(self.base_dir, BASEDIR, filename)
+        for base_dir in getattr(self, 'temporary_base_dirs', []):
+            if base_dir != self.base_dir:
+                BASE_DIR_REMOVER.remove(base_dir)
+            elif not self.cleanup_base_dir:
+                continue
+            elif failed and self.keep_base_dirs_of_failed_tests:
+                RETAINED_BASE_DIRS.retain(base_dir, self.max_size_of_retained_base_dirs)
+            else:
+                BASE_DIR_REMOVER.remove(base_dir)
 
-        with codecs.open(output_path, 'w', 'utf-8') as output_file:
-            output_file.write('--------------- ENVIRONMENT ----------------\n')
-            for key in sorted(self.env.keys()):
-                output_file.write('%s=%s\n' % (key, self.env[key]))
+    def _output_log(self):
+        if getattr(self, 'output_log', None) is None or self.output_log.base_directory != self.base_dir:
+            self.output_log = OutputLog(self.base_dir)
 
-            output_file.write('----------------- STDOUT -------------------\n')
-            output_file.write(stdout)
+        return self.output_log
 
-            output_file.write('----------------- STDERR -------------------\n')
-            output_file.write(stderr)
+    def _write_output_file(self, command, return_code, stdout, stderr):
+        self._output_log().append(self.command_counter, command, self.env, return_code, stdout, stderr)
+
+    def read_output(self, number):
+        """
+            returns the OutputRecord of the command with the given number
+            from the output log.
+        """
+
+        if getattr(self, 'output_log_reader', None) is None or self.output_log_reader.base_directory != self.base_dir:
+            self.output_log_reader = OutputLogReader(self.base_dir)
+
+        return self.output_log_reader.record(number)
 
     def execute_command(self, command):
         return_code, _, _ = self.execute_command_and_capture_output(command)
         return return_code
 
-    def execute_command_and_capture_output(self, command):
+    def start_shell_session(self):
+        """
+            executes the following commands of this test in one shell, which
+            is started in the base directory with the environment of the
+            testbed. Each command runs in a subshell with stdin from /dev/null.
+            When the shell is not running anymore, commands are executed in a
+            new process again.
+        """
+
+        self.shell_session = ShellSession(self.base_dir, self.env)
+        self.addCleanup(self.stop_shell_session)
+
+    def stop_shell_session(self):
+        if getattr(self, 'shell_session', None) is not None:
+            self.shell_session.close()
+            self.shell_session = None
+
+    def _run_command_in_shell_session(self, command):
+        session = self.shell_session
+
+        if session.cwd != self.base_dir or session.env != self.env:
+            session.close()
+            session = self.shell_session = ShellSession(self.base_dir, self.env)
+
+        try:
+            return_code, stdout, stderr = session.execute(command)
+        except ShellSessionException:
+            self.stop_shell_session()
+            return None
+
+        stdout = stdout.decode(sys.stdout.encoding or 'utf-8')
+        stderr = stderr.decode(sys.stderr.encoding or 'utf-8')
+
+        return (return_code, stdout, stderr)
+
+    def _run_command(self, command, use_shell_session=True):
+        if use_shell_session and getattr(self, 'shell_session', None) is not None:
+            result = self._run_command_in_shell_session(command)
+
+            if result is not None:
+                return result
+
         shell_process = subprocess.Popen(args=[command],
                                          stdout=subprocess.PIPE,
                                          stderr=subprocess.PIPE,
@@ -81,44 +267,188 @@ class IntegrationTestBase (unittest.TestCase):
         stdout, stderr = shell_process.communicate()
         stdout = stdout.decode(sys.stdout.encoding or 'utf-8')
         stderr = stderr.decode(sys.stderr.encoding or 'utf-8')
-        self._write_output_file(command, stdout, stderr)
+
+        return (shell_process.returncode, stdout, stderr)
+
+    def execute_command_and_capture_output(self, command):
+        return_code, stdout, stderr = self._run_command(command)
+        self._write_output_file(command, return_code, stdout, stderr)
+
+        self.command_counter += 1
+        return (return_code, stdout, stderr)
+
+    def execute_argv(self, argv):
+        return_code, _, _ = self.execute_argv_and_capture_output(argv)
+        return return_code
+
+    def execute_argv_and_capture_output(self, argv):
+        """
+            executes the given list of program and arguments without a shell.
+            The program is looked up in the PATH of the testbed environment.
+            Returns the return code, stdout and stderr like
+            execute_command_and_capture_output.
+        """
+
+        return_code, stdout, stderr = spawn_and_capture(argv, self.base_dir, self.env)
+        stdout = stdout.decode(sys.stdout.encoding or 'utf-8')
+        stderr = stderr.decode(sys.stderr.encoding or 'utf-8')
+        self._write_output_file(' '.join(quote(argument) for argument in argv), return_code, stdout, stderr)
+
+        self.command_counter += 1
+        return (return_code, stdout, stderr)
+
+    def execute_commands_concurrently(self, commands, max_workers=None):
+        """
+            executes the given commands concurrently using a pool of at most
+            max_workers threads (default: one per command). Returns the
+            tuples of return code, stdout and stderr in the order of the
+            given commands. The commands are numbered in the given order and
+            their output is written in this order when all of them finished.
+        """
+
+        results = [None] * len(commands)
+        pending = Queue()
+
+        for index, command in enumerate(commands):
+            pending.put((index, command))
+
+        def work():
+            while True:
+                try:
+                    index, command = pending.get_nowait()
+                except Empty:
+                    return
+
+                try:
+                    results[index] = self._run_command(command, use_shell_session=False)
+                except Exception:
+                    results[index] = sys.exc_info()[1]
+
+        count_of_workers = min(max_workers or len(commands), len(commands))
+        workers = [threading.Thread(target=work) for _ in range(count_of_workers)]
+
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+
+        for command, (return_code, stdout, stderr) in zip(commands, results):
+            self._write_output_file(command, return_code, stdout, stderr)
+            self.command_counter += 1
+
+        return results
+
+    def execute_command_and_stream_output(self, command, tail_limit=TAIL_LIMIT_IN_CHARACTERS):
+        """
+            executes the given command like execute_command_and_capture_output,
+            but writes its stdout and stderr into files of the base directory
+            as they arrive and keeps at most tail_limit characters of each in
+            memory. Returns the return code and the CapturedOutput of stdout
+            and stderr, which give access to the complete output.
+        """
+
+        output_log = self._output_log()
+        shell_process = subprocess.Popen(args=[command],
+                                         stdout=subprocess.PIPE,
+                                         stderr=subprocess.PIPE,
+                                         shell=True,
+                                         cwd=self.base_dir,
+                                         env=self.env)
+
+        captures = [StreamCapture(shell_process.stdout,
+                                  output_log.stream_filename(self.command_counter, 'stdout'),
+                                  sys.stdout.encoding or 'utf-8',
+                                  tail_limit).start(),
+                    StreamCapture(shell_process.stderr,
+                                  output_log.stream_filename(self.command_counter, 'stderr'),
+                                  sys.stderr.encoding or 'utf-8',
+                                  tail_limit).start()]
+
+        shell_process.wait()
+        stdout, stderr = [capture.join() for capture in captures]
+        output_log.append_streamed(self.command_counter, command, self.env, shell_process.returncode, stdout, stderr)
 
         self.command_counter += 1
         return (shell_process.returncode, stdout, stderr)
 
-    def fixture(self):
-        return Fixture(self.base_dir)
+    def fixture(self, answer_first=False):
+        return Fixture(self.base_dir, shell_functions=self.use_shell_functions, answer_first=answer_first,
+                       compiled_stubs=self.use_launcher)
 
     def verify(self):
         return VerifierLoader(self.base_dir)
 
-    def prepare_testbed(self, env, stubs):
+    def prepare_testbed(self, env, stubs, use_stub_server=False, use_launcher=False, use_template=False,
+                        use_shell_functions=False):
+        if use_shell_functions:
+            env = dict(env, BASH_ENV=os.path.join(self.base_dir, SHELL_FUNCTIONS_FILENAME))
+
         self.env = env
         self.stubs = stubs
+        self.use_shell_functions = use_shell_functions
+        self.use_launcher = use_launcher
 
-        os.mkdir(os.path.join(self.base_dir, BASEDIR))
-        os.mkdir(self.stubs_dir)
-        self.stub_commands(self.stubs)
+        if use_stub_server:
+            script_content = STUB_CLIENT_SCRIPT_CONTENT
+        elif use_launcher:
+            script_content = launcher_script_content()
+        else:
+            script_content = STUB_SCRIPT_CONTENT
+
+        if not use_template or not TESTBED_TEMPLATES.clone(self.base_dir, self.stubs, script_content):
+            if not os.path.isdir(os.path.join(self.base_dir, BASEDIR)):
+                os.mkdir(os.path.join(self.base_dir, BASEDIR))
+            os.mkdir(self.stubs_dir)
+            self.stub_commands(self.stubs, script_content)
 
-    def stub_commands(self, command_list):
-        for command in command_list:
-            command_file_name = os.path.join(self.stubs_dir, command)
+        if use_stub_server:
+            self.start_stub_server()
 
-            with open(command_file_name, "w") as command_file:
-                command_file.write(STUB_SCRIPT_CONTENT)
+    def start_stub_server(self):
+        self.stub_server = StubServer(self.base_dir).start()
+        self.addCleanup(self.stub_server.shutdown)
 
-            os.chmod(command_file_name, 0o755)
+    def stub_commands(self, command_list, script_content=STUB_SCRIPT_CONTENT):
+        script_file_name = write_stub_script(self.base_dir, script_content)
+        link_stub_commands(self.stubs_dir, script_file_name, command_list)
 
-    def make_base_dir(self, base_dir):
+    def make_base_dir(self, base_dir, ram_backed=False):
         os.makedirs(base_dir)
-        self.set_base_dir(base_dir)
+        self.set_base_dir(base_dir, ram_backed)
+
+    def set_base_dir(self, base_dir, ram_backed=False):
+        """
+            sets the base directory of the testbed or creates a temporary one
+            if base_dir is not given. When ram_backed is True the stub state
+            is placed on a tmpfs (RAM_BACKED_DIRECTORY) if available: a
+            temporary base directory is created there, a given base directory
+            gets its state directory linked to one there.
+        """
+
+        ram_directory = ram_backed_directory() if ram_backed else None
+        self.temporary_base_dirs = getattr(self, 'temporary_base_dirs', [])
+
+        if getattr(self, 'state_dir', None):
+            self.temporary_base_dirs.append(self.state_dir)
+
+        self.state_dir = None
 
-    def set_base_dir(self, base_dir):
         if base_dir:
             self.base_dir = base_dir
             self.cleanup_base_dir = False
+
+            if ram_directory:
+                self.state_dir = tempfile.mkdtemp(prefix='integration-test-state-', dir=ram_directory)
+                os.symlink(self.state_dir, os.path.join(base_dir, BASEDIR))
         else:
-            self.base_dir = tempfile.mkdtemp(prefix='integration-test-')
+            self.base_dir = tempfile.mkdtemp(prefix='integration-test-', dir=ram_directory)
             self.cleanup_base_dir = True
+            self.temporary_base_dirs.append(self.base_dir)
+
+        self.ram_backed = ram_directory is not None
 
         self.stubs_dir = os.path.join(self.base_dir, STUBS_DIRECTORY)
@@ -0,0 +1,170 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+    this module provides the functions writing the stubs of a testbed and
+    the class TestbedTemplates, which keeps one prepared testbed per list of
+    stubs for the whole test session. New testbeds are cloned from their
+    template: the stub script is hardlinked, the links of the stubbed
+    commands are recreated, nothing is written.
+"""
+
+__author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
+
+import atexit
+import hashlib
+import os
+import shutil
+import tempfile
+
+from shtub import BASEDIR, STUBS_DIRECTORY, STUB_SCRIPTS_DIRECTORY
+
+
+def write_stub_script(base_dir, script_content):
+    """
+        writes the given script once per testbed and returns its filename.
+        The script resolves the stubbed command from argv[0].
+    """
+
+    scripts_dir = os.path.join(base_dir, STUB_SCRIPTS_DIRECTORY)
+    digest = hashlib.sha1(script_content.encode('utf-8')).hexdigest()
+    script_file_name = os.path.join(scripts_dir, digest)
+
+    if not os.path.exists(script_file_name):
+        if not os.path.isdir(scripts_dir):
+            os.makedirs(scripts_dir)
+
+        with open(script_file_name, "w") as script_file:
+            script_file.write(script_content)
+
+        os.chmod(script_file_name, 0o755)
+
+    return script_file_name
+
+
+def link_stub_commands(stubs_dir, script_file_name, command_list):
+    """
+        links each of the given commands in stubs_dir to the given script
+        using relative symlinks or hardlinks where symlinks are not available.
+    """
+
+    relative_script_file_name = os.path.relpath(script_file_name, stubs_dir)
+
+    for command in command_list:
+        command_file_name = os.path.join(stubs_dir, command)
+
+        if os.path.lexists(command_file_name):
+            os.remove(command_file_name)
+
+        try:
+            os.symlink(relative_script_file_name, command_file_name)
+        except (AttributeError, NotImplementedError, OSError):
+            os.link(script_file_name, command_file_name)
+
+
+class TestbedTemplates (object):
+
+    """
+        Keeps the templates of testbeds in a temporary directory, which is
+        removed when the interpreter exits.
+    """
+
+    def __init__(self):
+        self.directory = None
+        self.templates = {}
+
+    def template(self, stubs, script_content):
+        """
+            returns the template directory and its entries for the given stubs
+            and script content. The template is prepared on first use.
+        """
+
+        key = (tuple(stubs), script_content)
+
+        if key not in self.templates:
+            if self.directory is None:
+                self.directory = tempfile.mkdtemp(prefix='shtub-testbed-templates-')
+                atexit.register(shutil.rmtree, self.directory, True)
+
+            template_dir = tempfile.mkdtemp(dir=self.directory)
+            stubs_dir = os.path.join(template_dir, STUBS_DIRECTORY)
+
+            os.mkdir(os.path.join(template_dir, BASEDIR))
+            os.mkdir(stubs_dir)
+            link_stub_commands(stubs_dir, write_stub_script(template_dir, script_content), stubs)
+
+            self.templates[key] = (template_dir, list_entries(template_dir))
+
+        return self.templates[key]
+
+    def clone(self, base_dir, stubs, script_content):
+        """
+            clones the template for the given stubs and script content into
+            base_dir. Returns False without cloning when the state directory of
+            base_dir is not on the file system of the templates, since files
+            cannot be hardlinked then.
+        """
+
+        template_dir, entries = self.template(stubs, script_content)
+        state_dir = os.path.join(base_dir, BASEDIR)
+
+        if not os.path.isdir(state_dir):
+            state_dir = base_dir
+
+        if os.stat(template_dir).st_dev != os.stat(state_dir).st_dev:
+            return False
+
+        for kind, relative_path, link_target in entries:
+            path = os.path.join(base_dir, relative_path)
+
+            if kind == 'directory':
+                if not os.path.isdir(path):
+                    os.mkdir(path)
+            elif kind == 'symlink':
+                os.symlink(link_target, path)
+            else:
+                os.link(os.path.join(template_dir, relative_path), path)
+
+        return True
+
+
+def list_entries(directory):
+    """
+        returns the directories, files and symlinks below the given directory
+        as tuples of kind, relative path and link target; parents first.
+    """
+
+    entries = []
+
+    for parent, directory_names, file_names in os.walk(directory):
+        relative_parent = os.path.relpath(parent, directory)
+        directory_names.sort()
+
+        for name in directory_names + sorted(file_names):
+            path = os.path.join(parent, name)
+            relative_path = os.path.normpath(os.path.join(relative_parent, name))
+
+            if os.path.islink(path):
+                entries.append(('symlink', relative_path, os.readlink(path)))
+            elif os.path.isdir(path):
+                entries.append(('directory', relative_path, None))
+            else:
+                entries.append(('file', relative_path, None))
+
+    return entries
+
+
+TESTBED_TEMPLATES = TestbedTemplates()
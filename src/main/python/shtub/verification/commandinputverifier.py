@@ -79,6 +79,12 @@ class CommandInputVerifier (object):
             is different than the expected stdin input. Returns the wrapper
             itself to make invocation chaining possible.
         """
+        if self.stdin is None and expected_stdin is not None:
+            raise VerificationException(
+                'Stub "%s" has not captured stdin, since none of its stub configurations expects input. '
+                'Use "and_input" or "with_read_stdin_timeout" when configuring the stub.'
+                % self.command)
+
         if self.stdin != expected_stdin:
             raise VerificationException(
                 'Stub "%s" has not received the expected stdin "%s", but got "%s".'
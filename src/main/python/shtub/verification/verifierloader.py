@@ -23,11 +23,22 @@ __author__ = 'Alexander Metzner, Michael Gruber, Udo Juettner'
 
 import sys
 import os.path
-from shtub import EXECUTIONS_FILENAME, deserialize_executions
+from shtub import EXECUTIONS_FILENAME, JournalException, deserialize_executions
 from shtub.verification.commandinputverifier import CommandInputVerifier
 from shtub.verification import VerificationException
 
 
+def raise_on_unexpected_executions(executions):
+    """
+        raises an exception when one of the given executions did not fulfill
+        any stub configuration.
+    """
+
+    for execution in executions:
+        if not execution.expected:
+            raise VerificationException('Unexpected %s: did not fulfill any stub configuration.' % str(execution))
+
+
 class Verifier (object):
 
     def __init__(self, executions):
@@ -114,11 +125,12 @@ class VerifierLoader (Verifier):
         if not os.path.exists(filename):
             raise VerificationException('No executions found. Stubbed commands have never been called.')
 
-        self.executions = deserialize_executions(filename)
+        try:
+            self.executions = deserialize_executions(filename)
+        except JournalException as exception:
+            raise VerificationException('Executions could not be loaded: %s' % exception)
 
-        for execution in self.executions:
-            if not execution.expected:
-                raise VerificationException('Unexpected %s: did not fulfill any stub configuration.' % str(execution))
+        raise_on_unexpected_executions(self.executions)
 
         return self
 
@@ -0,0 +1,96 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import fcntl
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import ANY, call, patch
+
+from shtub.answer import Answer
+from shtub.answercursors import advance_answer_cursor, write_answer_cursors
+from shtub.stubconfiguration import StubConfiguration
+
+
+class AnswerCursorsTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, 'answer-cursors')
+
+    def create_stub_configuration(self, initial_answer=0):
+        return StubConfiguration('command',
+                                 answers=[Answer(None, None, 0), Answer(None, None, 1), Answer(None, None, 2)],
+                                 initial_answer=initial_answer)
+
+    def test_should_write_fixed_size_counter_for_each_stub_configuration(self):
+        write_answer_cursors(self.filename, [self.create_stub_configuration(),
+                                             self.create_stub_configuration(2)])
+
+        self.assertEqual(8, os.path.getsize(self.filename))
+
+    def test_should_return_answers_one_after_another_and_repeat_the_last_one(self):
+        write_answer_cursors(self.filename, [self.create_stub_configuration()])
+
+        actual_return_codes = [advance_answer_cursor(self.filename, 0, self.create_stub_configuration()).return_code
+                               for _ in range(4)]
+
+        self.assertEqual([0, 1, 2, 2], actual_return_codes)
+
+    def test_should_advance_cursors_of_stub_configurations_independently(self):
+        write_answer_cursors(self.filename, [self.create_stub_configuration(),
+                                             self.create_stub_configuration(1)])
+
+        advance_answer_cursor(self.filename, 0, self.create_stub_configuration())
+        actual_answer = advance_answer_cursor(self.filename, 1, self.create_stub_configuration())
+
+        self.assertEqual(1, actual_answer.return_code)
+
+    def test_should_start_with_initial_answer_when_cursors_have_not_been_written(self):
+        actual_answer = advance_answer_cursor(self.filename, 1, self.create_stub_configuration(1))
+        actual_next_answer = advance_answer_cursor(self.filename, 1, self.create_stub_configuration(1))
+        actual_other_answer = advance_answer_cursor(self.filename, 0, self.create_stub_configuration(2))
+
+        self.assertEqual(1, actual_answer.return_code)
+        self.assertEqual(2, actual_next_answer.return_code)
+        self.assertEqual(2, actual_other_answer.return_code)
+
+    @patch('fcntl.lockf')
+    def test_should_lock_only_the_cursor_of_the_given_stub_configuration(self, mock_lockf):
+        write_answer_cursors(self.filename, [self.create_stub_configuration(),
+                                             self.create_stub_configuration()])
+
+        advance_answer_cursor(self.filename, 1, self.create_stub_configuration())
+
+        self.assertEqual(call(ANY, fcntl.LOCK_EX, 4, 4, os.SEEK_SET), mock_lockf.call_args)
+
+    @patch('os.open')
+    def test_should_answer_static_answer_without_opening_cursors(self, mock_open):
+        stub_configuration = StubConfiguration('command', answers=[Answer(None, None, 5)])
+
+        actual_answers = [advance_answer_cursor(self.filename, 0, stub_configuration).return_code for _ in range(2)]
+
+        self.assertEqual([5, 5], actual_answers)
+        self.assertFalse(mock_open.called)
+        self.assertFalse(os.path.exists(self.filename))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import unittest
+
+from mock import call, patch
+
+from shtub import answerwriter
+from shtub.answer import Answer
+
+
+class AnswerWriterTests (unittest.TestCase):
+
+    @patch('time.sleep')
+    @patch('sys.exit')
+    def test_should_wait_and_exit_with_return_code_of_answer(self, mock_exit, mock_sleep):
+        answerwriter.send_answer(Answer(None, None, 7, 1500))
+
+        self.assertEqual(call(1.5), mock_sleep.call_args)
+        self.assertEqual(call(7), mock_exit.call_args)
+
+    @patch('sys.exit')
+    @patch('shtub.answerwriter.append_reserved_record')
+    @patch('shtub.answerwriter.detach_output')
+    @patch('shtub.answerwriter.write_answer')
+    @patch('shtub.answerwriter.reserve_journal_record')
+    def test_should_reserve_record_before_answering_and_record_execution_after_detaching_output(
+            self, mock_reserve, mock_write_answer, mock_detach_output, mock_append_reserved, mock_exit):
+        calls = []
+        answer = Answer(None, None, 7)
+        mock_reserve.side_effect = lambda filename: calls.append('reserve') or 'token'
+        mock_write_answer.side_effect = lambda answer: calls.append('answer')
+        mock_detach_output.side_effect = lambda: calls.append('detach')
+        mock_append_reserved.side_effect = lambda *arguments: calls.append('record')
+
+        answerwriter.send_answer_first(answer, 'execution', 'executions')
+
+        self.assertEqual(['reserve', 'answer', 'detach', 'record'], calls)
+        self.assertEqual(call('executions'), mock_reserve.call_args)
+        self.assertEqual(call(answer), mock_write_answer.call_args)
+        self.assertEqual(call('executions', 'token', 'execution'), mock_append_reserved.call_args)
+        self.assertEqual(call(7), mock_exit.call_args)
+
+    @patch('sys.exit')
+    @patch('shtub.answerwriter.append_reserved_record')
+    @patch('shtub.answerwriter.detach_output')
+    @patch('shtub.answerwriter.write_answer')
+    @patch('shtub.answerwriter.reserve_journal_record')
+    def test_should_record_execution_when_answer_could_not_be_written(
+            self, mock_reserve, mock_write_answer, mock_detach_output, mock_append_reserved, mock_exit):
+        mock_reserve.return_value = 'token'
+        mock_write_answer.side_effect = IOError(32, 'Broken pipe')
+
+        self.assertRaises(IOError, answerwriter.send_answer_first, Answer('out', None, 0), 'execution',
+                          'executions')
+
+        self.assertEqual(call('executions', 'token', 'execution'), mock_append_reserved.call_args)
+        self.assertFalse(mock_exit.called)
@@ -0,0 +1,125 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import asyncio
+import time
+import unittest
+
+from shtub.asyncinterception import AsyncInterception
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class AsyncInterceptionTests (unittest.TestCase):
+
+    def test_should_feed_stream_readers_from_answer(self):
+        async def execute():
+            process = await asyncio.create_subprocess_exec(
+                'ssh', '-arg1', stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+            stdout = await process.stdout.read()
+            stderr = await process.stderr.read()
+            return await process.wait(), stdout, stderr
+
+        with AsyncInterception() as interception:
+            interception.calling('ssh').at_least_with_arguments('-arg1').then_answer('Hello world', 'Hello error', 3)
+            actual = run(execute())
+
+        self.assertEqual((3, b'Hello world', b'Hello error'), actual)
+
+        with interception.verify() as verify:
+            verify.called('ssh').at_least_with_arguments('-arg1')
+
+    def test_should_pass_input_to_stubbed_shell_command(self):
+        async def execute():
+            process = await asyncio.create_subprocess_shell(
+                'ssh -arg1', stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE)
+            return await process.communicate(b'stdin')
+
+        with AsyncInterception() as interception:
+            interception.calling('ssh').with_input('stdin').then_answer('Hello world')
+            actual = run(execute())
+
+        self.assertEqual((b'Hello world', None), actual)
+
+        with interception.verify() as verify:
+            verify.called('ssh').at_least_with_arguments('-arg1').with_input('stdin')
+
+    def test_should_wait_concurrently_without_blocking_loop(self):
+        async def execute():
+            processes = [await asyncio.create_subprocess_exec('ssh') for _ in range(10)]
+            return await asyncio.gather(*[process.wait() for process in processes])
+
+        with AsyncInterception() as interception:
+            interception.calling('ssh').then_answer(return_code=0, milliseconds_to_wait=200)
+            started = time.time()
+            actual = run(execute())
+            elapsed = time.time() - started
+
+        self.assertEqual([0] * 10, actual)
+        self.assertTrue(elapsed < 1, elapsed)
+        self.assertEqual(10, len(interception.executions))
+
+    def test_should_return_bad_exit_code_when_execution_is_unexpected(self):
+        async def execute():
+            process = await asyncio.create_subprocess_exec('ssh', '-unexpected')
+            return await process.wait()
+
+        with AsyncInterception() as interception:
+            interception.calling('ssh').at_least_with_arguments('-arg1').then_answer('Hello world')
+            actual = run(execute())
+
+        self.assertEqual(255, actual)
+        self.assertFalse(interception.executions[0].expected)
+
+    def test_should_pass_through_commands_which_have_not_been_stubbed(self):
+        async def execute():
+            process = await asyncio.create_subprocess_exec('echo', 'real', stdout=asyncio.subprocess.PIPE)
+            return await process.communicate()
+
+        with AsyncInterception() as interception:
+            interception.calling('ssh').then_answer('Hello world')
+            actual = run(execute())
+
+        self.assertEqual((b'real\n', None), actual)
+        self.assertEqual([], interception.executions)
+
+    def test_should_pass_through_pipeline_led_by_stubbed_command(self):
+        async def execute():
+            process = await asyncio.create_subprocess_shell('true h | echo real', stdout=asyncio.subprocess.PIPE)
+            return await process.communicate()
+
+        with AsyncInterception() as interception:
+            interception.calling('true').then_answer('Hello world')
+            actual = run(execute())
+
+        self.assertEqual((b'real\n', None), actual)
+        self.assertEqual([], interception.executions)
+
+    def test_should_restore_asyncio_subprocess_api(self):
+        original_create_subprocess_exec = asyncio.create_subprocess_exec
+
+        with AsyncInterception():
+            self.assertNotEqual(original_create_subprocess_exec, asyncio.create_subprocess_exec)
+
+        self.assertEqual(original_create_subprocess_exec, asyncio.create_subprocess_exec)
+        self.assertEqual(original_create_subprocess_exec, asyncio.subprocess.create_subprocess_exec)
@@ -0,0 +1,74 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import Mock, call
+
+from shtub.basedirs import BaseDirRemover, RetainedBaseDirs, directory_size
+
+
+class BaseDirsTests (unittest.TestCase):
+
+    def make_directory(self, size):
+        directory = tempfile.mkdtemp(prefix='basedirs-test-')
+        self.addCleanup(shutil.rmtree, directory, True)
+
+        with open(os.path.join(directory, 'file'), 'wb') as test_file:
+            test_file.write(b'x' * size)
+
+        return directory
+
+    def test_should_return_size_of_files_in_directory(self):
+        directory = self.make_directory(100)
+        os.mkdir(os.path.join(directory, 'subdirectory'))
+        with open(os.path.join(directory, 'subdirectory', 'file'), 'wb') as test_file:
+            test_file.write(b'x' * 20)
+
+        self.assertEqual(120, directory_size(directory))
+
+    def test_should_remove_directories_in_background(self):
+        directories = [self.make_directory(10) for _ in range(5)]
+        remover = BaseDirRemover()
+
+        for directory in directories:
+            remover.remove(directory)
+        remover.join()
+
+        self.assertEqual([False] * 5, [os.path.exists(directory) for directory in directories])
+        self.assertEqual(2, len(remover.threads))
+
+    def test_should_not_remove_retained_directories_without_maximum_size(self):
+        remover = Mock()
+        retained_base_dirs = RetainedBaseDirs(remover)
+
+        retained_base_dirs.retain(self.make_directory(100))
+
+        self.assertEqual(None, remover.remove.call_args)
+
+    def test_should_remove_oldest_retained_directories_when_exceeding_maximum_size(self):
+        remover = Mock()
+        retained_base_dirs = RetainedBaseDirs(remover)
+        directories = [self.make_directory(100) for _ in range(3)]
+
+        for directory in directories:
+            retained_base_dirs.retain(directory, max_size=250)
+
+        self.assertEqual([call(directories[0])], remover.remove.call_args_list)
+        self.assertEqual(200, retained_base_dirs.total_size)
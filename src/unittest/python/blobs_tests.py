@@ -0,0 +1,171 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+
+import errno
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from mock import patch
+
+from shtub.answer import Answer, FileSource
+from shtub.blobs import (BlobReference, copy_blob, copy_file, digest_of, payload_as_bytes,
+                         payload_from_dictionary, spill, store_blob)
+from shtub.commandinput import CommandInput
+
+
+class BlobsTests (unittest.TestCase):
+
+    def setUp(self):
+        self.base_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.base_directory)
+
+    def test_should_keep_short_payloads_inline(self):
+        self.assertEqual('short', spill(self.base_directory, 'short', threshold=5))
+        self.assertEqual(None, spill(self.base_directory, None, threshold=5))
+        self.assertFalse(os.path.exists(os.path.join(self.base_directory, 'shtub')))
+
+    def test_should_store_long_payload_once_and_reference_it_by_hash(self):
+        first_reference = spill(self.base_directory, 'long payload', threshold=5)
+        second_reference = spill(self.base_directory, 'long payload', threshold=5)
+
+        self.assertEqual(BlobReference(digest_of('long payload'), 12), first_reference)
+        self.assertEqual(first_reference, second_reference)
+        self.assertEqual([first_reference.digest], os.listdir(os.path.join(self.base_directory, 'shtub', 'blobs')))
+        self.assertEqual('long payload', first_reference.read(self.base_directory))
+
+    def test_should_store_same_payload_concurrently(self):
+        payload = 'concurrent payload\n' * 10000
+        errors = []
+
+        def store():
+            try:
+                store_blob(self.base_directory, payload)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=store) for _ in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual([], errors)
+        self.assertEqual([digest_of(payload)], os.listdir(os.path.join(self.base_directory, 'shtub', 'blobs')))
+        self.assertEqual(payload, BlobReference(digest_of(payload), len(payload)).read(self.base_directory))
+
+    def test_should_equal_referenced_payload_only(self):
+        reference = BlobReference(digest_of('\u00fcber payload'), 12)
+
+        self.assertTrue(reference == '\u00fcber payload')
+        self.assertFalse(reference != '\u00fcber payload')
+        self.assertTrue(reference != 'other payload')
+        self.assertTrue(reference != None)
+
+    def test_should_serialize_references_in_command_inputs_and_answers(self):
+        reference = BlobReference('0123abcd', 42)
+
+        command_input = CommandInput.from_dictionary(CommandInput('command', [], reference).as_dictionary())
+        answer = Answer.from_dictionary(Answer(reference, 'stderr', 0).as_dictionary())
+
+        self.assertEqual({'blob': '0123abcd', 'length': 42}, CommandInput('command', [], reference).as_dictionary()['stdin'])
+        self.assertEqual(reference, command_input.stdin)
+        self.assertEqual(reference, answer.stdout)
+        self.assertEqual('stderr', answer.stderr)
+
+    def test_should_copy_blob_to_file_descriptor(self):
+        reference = store_blob(self.base_directory, 'Hello world\n' * 10000)
+        filename = os.path.join(self.base_directory, 'copy')
+        file_descriptor = os.open(filename, os.O_WRONLY | os.O_CREAT)
+
+        try:
+            copy_blob(reference, file_descriptor, self.base_directory)
+        finally:
+            os.close(file_descriptor)
+
+        with open(filename) as copied_file:
+            self.assertEqual('Hello world\n' * 10000, copied_file.read())
+
+    def test_should_serialize_file_sources_with_absolute_filename(self):
+        file_source = FileSource('dump.sql')
+        answer = Answer.from_dictionary(Answer(None, file_source, 0).as_dictionary())
+
+        self.assertEqual({'file': os.path.abspath('dump.sql')}, file_source.as_dictionary())
+        self.assertEqual(file_source, answer.stderr)
+        self.assertEqual(file_source, spill(self.base_directory, file_source, threshold=5))
+        self.assertEqual(file_source, payload_from_dictionary({'file': os.path.abspath('dump.sql')}))
+
+    def test_should_return_payloads_as_bytes(self):
+        filename = os.path.join(self.base_directory, 'dump')
+
+        with open(filename, 'wb') as dump_file:
+            dump_file.write(b'\x00\xff binary')
+
+        self.assertEqual(b'\x00\xff binary', payload_as_bytes(FileSource(filename)))
+        self.assertEqual(b'text', payload_as_bytes('text'))
+        self.assertEqual(b'', payload_as_bytes(None))
+
+    def assert_copies_file(self):
+        source_filename = os.path.join(self.base_directory, 'source')
+        filename = os.path.join(self.base_directory, 'copy')
+
+        with open(source_filename, 'wb') as source_file:
+            source_file.write(b'Hello world\n' * 10000)
+
+        file_descriptor = os.open(filename, os.O_WRONLY | os.O_CREAT)
+
+        try:
+            copy_blob(FileSource(source_filename), file_descriptor)
+        finally:
+            os.close(file_descriptor)
+
+        with open(filename, 'rb') as copied_file:
+            self.assertEqual(b'Hello world\n' * 10000, copied_file.read())
+
+    def test_should_copy_file_to_file_descriptor(self):
+        self.assert_copies_file()
+
+    @unittest.skipUnless(hasattr(os, 'sendfile'), 'sendfile is not available')
+    @patch('shtub.blobs.os.sendfile')
+    def test_should_copy_file_in_chunks_when_sendfile_does_not_support_file_descriptor(self, mock_sendfile):
+        mock_sendfile.side_effect = OSError(errno.EINVAL, 'Invalid argument')
+
+        self.assert_copies_file()
+
+    @unittest.skipUnless(hasattr(os, 'sendfile'), 'sendfile is not available')
+    def test_should_copy_file_using_sendfile(self):
+        source_filename = os.path.join(self.base_directory, 'source')
+
+        with open(source_filename, 'wb') as source_file:
+            source_file.write(b'Hello world\n')
+
+        read_file_descriptor, write_file_descriptor = os.pipe()
+
+        with patch('shtub.blobs.os.write') as mock_write:
+            copy_file(source_filename, write_file_descriptor)
+
+        os.close(write_file_descriptor)
+
+        self.assertEqual(b'Hello world\n', os.read(read_file_descriptor, 1024))
+        self.assertFalse(mock_write.called)
+        os.close(read_file_descriptor)
@@ -189,3 +189,14 @@ class CommandInputTests (unittest.TestCase):
 
         self.assertTrue(command_input1.fulfills(
             command_input2), 'comparison: command')
+
+    def test_should_use_frozen_arguments_of_other(self):
+        command_input = CommandInput('any_command', ['any_arg1', 'any_arg2'], None)
+        other = CommandInput('any_command', ['any_arg1'], None).freeze_arguments()
+
+        self.assertEqual(frozenset(['any_arg1']), other.argument_set)
+        self.assertTrue(command_input.fulfills(other))
+
+        other.argument_set = frozenset(['any_arg3'])
+
+        self.assertFalse(command_input.fulfills(other))
@@ -25,7 +25,7 @@ else:
     from StringIO import StringIO
     builtin_string = '__builtin__'
 
-from mock import ANY, Mock, call, patch
+from mock import Mock, call, patch
 
 from shtub import LOG_FILENAME, commandstub
 from shtub.answer import Answer
@@ -34,10 +34,13 @@ from shtub.commandinput import CommandInput
 from shtub.stubconfiguration import StubConfiguration
 
 
+def advance_in_memory(filename, index, stub_configuration):
+    return stub_configuration.next_answer()
+
+
 class Tests (unittest.TestCase):
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('shtub.commandstub.Execution')
     @patch('shtub.commandstub.record_execution')
     @patch('shtub.commandstub.send_answer')
@@ -47,7 +50,7 @@ class Tests (unittest.TestCase):
         self, mock_deserialize,
         mock_logging_info, mock_answer,
         mock_record, mock_execution_class,
-        mock_serialize, mock_unlock):
+        mock_advance):
 
         mock_execution = Mock(Execution)
         mock_execution_class.return_value = mock_execution
@@ -67,13 +70,12 @@ class Tests (unittest.TestCase):
         self.assertEqual(call(), mock_execution.mark_as_expected.call_args)
         self.assertEqual(call(mock_execution), mock_record.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('shtub.commandstub.record_execution')
     @patch('shtub.commandstub.send_answer')
     @patch('logging.info')
     @patch('shtub.commandstub.deserialize_stub_configurations')
-    def test_should_send_answer_when_execution_fulfills_stub_configurations(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_serialize, mock_unlock):
+    def test_should_send_answer_when_execution_fulfills_stub_configurations(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_advance):
 
         answer = Answer('Hello world', 'Hello error', 15)
         stub_configuration = StubConfiguration(
@@ -88,19 +90,18 @@ class Tests (unittest.TestCase):
 
         self.assertEqual(call(answer), mock_answer.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('shtub.commandstub.record_execution')
     @patch('shtub.commandstub.send_answer')
     @patch('logging.info')
     @patch('shtub.commandstub.deserialize_stub_configurations')
-    def test_should_serialize_stubs_configuration_before_sending_answer(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_serialize, mock_unlock):
+    def test_should_advance_answer_cursor_of_fulfilled_stub_configuration_before_sending_answer(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_advance):
 
         answer = Answer('Hello world', 'Hello error', 15)
         stub_configuration = StubConfiguration(
             'command', ['-arg1', '-arg2', '-arg3'], 'stdin')
         stub_configuration.then(answer)
-        stub_configurations = [stub_configuration]
+        stub_configurations = [StubConfiguration('other_command'), stub_configuration]
         mock_deserialize.return_value = stub_configurations
 
         command_input = CommandInput(
@@ -109,16 +110,35 @@ class Tests (unittest.TestCase):
         commandstub.dispatch(command_input)
 
         self.assertEqual(
-            call('shtub/stub-configurations', stub_configurations), mock_serialize.call_args)
+            call('shtub/answer-cursors', 1, stub_configuration), mock_advance.call_args)
+        self.assertEqual(call(answer), mock_answer.call_args)
+
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
+    @patch('shtub.commandstub.record_execution')
+    @patch('shtub.commandstub.send_answer')
+    @patch('logging.info')
+    @patch('shtub.commandstub.deserialize_stub_configurations')
+    @patch('shtub.commandstub.load_candidates')
+    def test_should_use_candidates_from_dispatch_index_instead_of_loading_all_stub_configurations(
+            self, mock_load_candidates, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_advance):
+        answer = Answer('Hello world', 'Hello error', 15)
+        stub_configuration = StubConfiguration('command', ['-arg1'], answers=[answer])
+        mock_load_candidates.return_value = [(7, stub_configuration)]
+
+        commandstub.dispatch(CommandInput('command', ['-arg1'], 'stdin'))
+
+        self.assertEqual(call('command', 'shtub/dispatch-index'), mock_load_candidates.call_args)
+        self.assertEqual(None, mock_deserialize.call_args)
+        self.assertEqual(call('shtub/answer-cursors', 7, stub_configuration), mock_advance.call_args)
+        self.assertEqual(call(answer), mock_answer.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('time.sleep')
     @patch('shtub.commandstub.record_execution')
     @patch('shtub.commandstub.send_answer')
     @patch('logging.info')
     @patch('shtub.commandstub.deserialize_stub_configurations')
-    def test_should_wait_when_answer_fulfills_stub_configurations_and_needs_waiting(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_sleep, mock_serialize, mock_unlock):
+    def test_should_wait_when_answer_fulfills_stub_configurations_and_needs_waiting(self, mock_deserialize, mock_logging_info, mock_answer, mock_record, mock_sleep, mock_advance):
 
         answer = Answer(
             'Hello world', 'Hello error', 15, milliseconds_to_wait=5)
@@ -135,15 +155,14 @@ class Tests (unittest.TestCase):
         self.assertEqual(call(answer), mock_answer.call_args)
         self.assertEqual(call(5 / 1000), mock_sleep.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('sys.exit')
     @patch('logging.error')
     @patch('logging.info')
     @patch('shtub.commandstub.deserialize_stub_configurations', return_value=[])
     def test_should_exit_with_error_code_255_when_execution_not_in_stub_configuration(
         self,
-        mock_deserialize, mock_logging_info, mock_logging_error, mock_exit, mock_serialize, mock_unlock):
+        mock_deserialize, mock_logging_info, mock_logging_error, mock_exit, mock_advance):
 
         command_input = CommandInput(
             'command', ['-arg1', '-arg2', '-arg3'], 'stdin')
@@ -152,13 +171,12 @@ class Tests (unittest.TestCase):
 
         self.assertEqual(call(255), mock_exit.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
+    @patch('shtub.commandstub.advance_answer_cursor', side_effect=advance_in_memory)
     @patch('sys.exit')
     @patch('logging.error')
     @patch('logging.info')
     @patch('shtub.commandstub.deserialize_stub_configurations', return_value=[])
-    def test_should_load_configured_stubs(self, mock_deserialize, mock_logging_info, mock_logging_error, mock_exit, mock_serialize, mock_unlock):
+    def test_should_load_configured_stubs(self, mock_deserialize, mock_logging_info, mock_logging_error, mock_exit, mock_advance):
         command_input = CommandInput(
             'command', ['-arg1', '-arg2', '-arg3'], 'stdin')
 
@@ -167,47 +185,21 @@ class Tests (unittest.TestCase):
         self.assertEqual(
             call('shtub/stub-configurations'), mock_deserialize.call_args)
 
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.lock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
-    @patch('shtub.commandstub.deserialize_executions', return_value=[])
-    @patch('os.path.exists', return_value=True)
-    def test_should_append_execution_and_serialize(self,
-                                                   mock_exists, mock_deserialize, mock_serialize, mock_lock, mock_unlock):
+    @patch('shtub.commandstub.append_as_dictionary')
+    def test_should_append_execution_to_journal(self, mock_append):
         execution = Execution('command', ['-arg1', '-arg2', '-arg3'], 'stdin')
 
         commandstub.record_execution(execution)
 
         self.assertEqual(
-            call('shtub/executions', ANY), mock_serialize.call_args)
-
-        actual_recorded_calls = mock_serialize.call_args[0][1]
-
-        self.assertEqual(str(execution), str(actual_recorded_calls[0]))
-
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.lock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
-    @patch('shtub.commandstub.deserialize_executions')
-    @patch('os.path.exists', return_value=True)
-    def test_should_deserialize_when_file_exists(self,
-                                                 mock_exists, mock_deserialize, mock_serialize, mock_lock, mock_unlock):
-        execution = Execution('command', ['-arg1', '-arg2', '-arg3'], 'stdin')
-
-        commandstub.record_execution(execution)
+            call('shtub/executions', execution), mock_append.call_args)
 
-        self.assertEqual(call('shtub/executions'), mock_deserialize.call_args)
-
-    @patch('shtub.commandstub.unlock')
-    @patch('shtub.commandstub.lock')
-    @patch('shtub.commandstub.serialize_as_dictionaries')
-    @patch('shtub.commandstub.deserialize_executions')
-    @patch('os.path.exists', return_value=False)
-    def test_should_not_deserialize_when_file_does_not_exist(self,
-                                                             mock_exists, mock_deserialize, mock_serialize, mock_lock, mock_unlock):
+    @patch('shtub.commandstub.append_as_dictionary')
+    def test_should_not_read_journal_when_recording_execution(self, mock_append):
         execution = Execution('command', ['-arg1', '-arg2', '-arg3'], 'stdin')
 
-        commandstub.record_execution(execution)
+        with patch('shtub.deserialize_executions') as mock_deserialize:
+            commandstub.record_execution(execution)
 
         self.assertEqual(None, mock_deserialize.call_args)
 
@@ -235,68 +227,45 @@ class Tests (unittest.TestCase):
         self.assertEqual('', mock_stderr.getvalue())
         self.assertEqual(call(123), mock_exit.call_args)
 
-    @patch('sys.stdin')
-    @patch('shtub.commandstub.select', return_value=([], [], []))
-    def test_should_use_a_one_second_timeout_when_waiting_for_stdin(self, mock_select, mock_stdin):
-        commandstub.read_stdin()
-
-        self.assertEqual(call([sys.stdin], [], [], 1), mock_select.call_args)
-
-    @patch('sys.stdin')
-    @patch('shtub.commandstub.select', return_value=([], [], []))
-    def test_should_return_None_when_no_input_from_stdin(self, mock_select, mock_stdin):
-        actual = commandstub.read_stdin()
-
-        self.assertEqual('', actual)
-
-    @patch('sys.stdin')
-    @patch('shtub.commandstub.select')
-    def test_should_return_input_from_stdin(self, mock_select, mock_stdin):
-        mock_select.return_value = ([StringIO('Hello world')], [], [])
-
-        actual = commandstub.read_stdin()
-
-        self.assertEqual('Hello world', actual)
-
-    @patch('shtub.commandstub.lock')
     @patch.object(sys, 'argv', ['command', '-arg1', '-arg2', '-arg3'])
+    @patch('shtub.commandstub.load_stub_candidates', return_value=[])
     @patch('shtub.commandstub.read_stdin', return_value=None)
     @patch('shtub.commandstub.dispatch')
     @patch('logging.basicConfig')
     @patch('os.mkdir')
     @patch('os.path.exists', return_value=False)
     def test_should_create_basedir_if_does_not_exist(self,
-                                                     mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_lock):
+                                                     mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates):
 
         commandstub.handle_execution()
 
         self.assertEqual(call('shtub'), mock_exists.call_args)
         self.assertEqual(call('shtub'), mock_mkdir.call_args)
 
-    @patch('shtub.commandstub.lock')
     @patch.object(sys, 'argv', ['command', '-arg1', '-arg2', '-arg3'])
+    @patch('shtub.commandstub.load_stub_candidates', return_value=[])
     @patch('shtub.commandstub.read_stdin', return_value=None)
     @patch('shtub.commandstub.dispatch')
     @patch('logging.basicConfig')
     @patch('os.mkdir')
     @patch('os.path.exists', return_value=True)
     def test_should_not_create_basedir_if_already_exist(self,
-                                                        mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_lock):
+                                                        mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates):
 
         commandstub.handle_execution()
 
         self.assertEqual(call('shtub'), mock_exists.call_args)
         self.assertEqual(None, mock_mkdir.call_args)
 
-    @patch('shtub.commandstub.lock')
     @patch.object(sys, 'argv', ['command', '-arg1', '-arg2', '-arg3'])
+    @patch('shtub.commandstub.load_stub_candidates', return_value=[])
     @patch('shtub.commandstub.read_stdin', return_value=None)
     @patch('shtub.commandstub.dispatch')
     @patch('logging.basicConfig')
     @patch('os.mkdir')
     @patch('os.path.exists', return_value=True)
     def test_should_initialize_basic_logging_configuration(self,
-                                                           mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_lock):
+                                                           mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates):
 
         commandstub.handle_execution()
 
@@ -308,14 +277,27 @@ class Tests (unittest.TestCase):
                               + '- %(message)s'),
                          mock_logging.call_args)
 
-    @patch('shtub.commandstub.lock')
+    @patch('shtub.lock')
     @patch.object(sys, 'argv', ['command', '-arg1', '-arg2', '-arg3'])
+    @patch('shtub.commandstub.load_stub_candidates', return_value=[])
     @patch('shtub.commandstub.read_stdin', return_value=None)
     @patch('shtub.commandstub.dispatch')
     @patch('logging.basicConfig')
     @patch('os.mkdir')
     @patch('os.path.exists', return_value=True)
-    def test_should_dispatch_execution(self, mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_lock):
+    def test_should_not_take_a_global_lock(self, mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates, mock_lock):
+        commandstub.handle_execution()
+
+        self.assertEqual(None, mock_lock.call_args)
+
+    @patch.object(sys, 'argv', ['command', '-arg1', '-arg2', '-arg3'])
+    @patch('shtub.commandstub.load_stub_candidates', return_value=[])
+    @patch('shtub.commandstub.read_stdin', return_value=None)
+    @patch('shtub.commandstub.dispatch')
+    @patch('logging.basicConfig')
+    @patch('os.mkdir')
+    @patch('os.path.exists', return_value=True)
+    def test_should_dispatch_execution(self, mock_exists, mock_mkdir, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates):
         commandstub.handle_execution()
 
         mock_dispatch.assert_called()
@@ -324,3 +306,19 @@ class Tests (unittest.TestCase):
             CommandInput('command', ['-arg1', '-arg2', '-arg3'], stdin=None))
         actual_execution = str(mock_dispatch.call_args[0][0])
         self.assertEqual(expected_input, actual_execution)
+
+    @patch.object(sys, 'argv', ['command'])
+    @patch('shtub.commandstub.load_stub_candidates')
+    @patch('shtub.commandstub.read_stdin', return_value='stdin')
+    @patch('shtub.commandstub.dispatch')
+    @patch('logging.basicConfig')
+    @patch('os.path.exists', return_value=True)
+    def test_should_read_stdin_with_timeout_of_candidates(self, mock_exists, mock_logging, mock_dispatch, mock_read_stdin, mock_load_stub_candidates):
+        candidates = [(0, StubConfiguration('command', read_stdin_timeout_in_seconds=0.25))]
+        mock_load_stub_candidates.return_value = candidates
+
+        commandstub.handle_execution()
+
+        self.assertEqual(call('command'), mock_load_stub_candidates.call_args)
+        self.assertEqual(call(0.25), mock_read_stdin.call_args)
+        self.assertEqual(candidates, mock_dispatch.call_args[0][1])
@@ -0,0 +1,80 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from shtub.answer import Answer
+from shtub.compiledstubs import load_compiled_candidates, remove_compiled_stubs, write_compiled_stubs
+from shtub.stubconfiguration import StubConfiguration
+
+
+class CompiledStubsTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), 'compiled-stubs')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.directory))
+
+        self.stub_configurations = [
+            StubConfiguration('ssh', ['-v'], answers=[Answer('first', None, 0)]),
+            StubConfiguration('rsync', answers=[Answer('second', None, 0)]),
+            StubConfiguration('ssh', answers=[Answer('third', None, 0)]),
+            StubConfiguration('bin/ssh', answers=[Answer('fourth', None, 0)])]
+
+    def test_should_return_none_when_there_are_no_compiled_stubs(self):
+        self.assertEqual(None, load_compiled_candidates('ssh', self.directory))
+
+    def test_should_load_only_candidates_of_given_command_with_their_index_in_fixture_order(self):
+        write_compiled_stubs(self.directory, self.stub_configurations)
+
+        actual_candidates = load_compiled_candidates('ssh', self.directory)
+
+        self.assertEqual([(0, self.stub_configurations[0]), (2, self.stub_configurations[2])], actual_candidates)
+        self.assertEqual([], load_compiled_candidates('curl', self.directory))
+        self.assertEqual([], load_compiled_candidates('..', self.directory))
+
+    def test_should_rewrite_only_compiled_stubs_of_changed_commands(self):
+        self.assertEqual(['rsync', 'ssh'], write_compiled_stubs(self.directory, self.stub_configurations))
+
+        self.stub_configurations[1].then_answer('changed')
+
+        self.assertEqual(['rsync'], write_compiled_stubs(self.directory, self.stub_configurations))
+        self.assertEqual([], write_compiled_stubs(self.directory, self.stub_configurations))
+
+    def test_should_remove_compiled_stubs_of_commands_which_are_not_configured_anymore(self):
+        write_compiled_stubs(self.directory, self.stub_configurations)
+        write_compiled_stubs(self.directory, self.stub_configurations[1:2])
+
+        self.assertEqual(['rsync'], os.listdir(self.directory))
+        self.assertEqual([(0, self.stub_configurations[1])], load_compiled_candidates('rsync', self.directory))
+
+    def test_should_remove_directory_of_compiled_stubs(self):
+        write_compiled_stubs(self.directory, self.stub_configurations)
+
+        remove_compiled_stubs(self.directory)
+        remove_compiled_stubs(self.directory)
+
+        self.assertEqual(None, load_compiled_candidates('ssh', self.directory))
+
+    def test_should_return_none_when_compiled_stub_cannot_be_unmarshalled(self):
+        os.mkdir(self.directory)
+        with open(os.path.join(self.directory, 'ssh'), 'wb') as compiled_file:
+            compiled_file.write(b'\xff')
+
+        self.assertEqual(None, load_compiled_candidates('ssh', self.directory))
@@ -0,0 +1,79 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from shtub.answer import Answer
+from shtub.commandinput import CommandInput
+from shtub.dispatchindex import find_candidate, load_candidates, write_dispatch_index
+from shtub.stubconfiguration import StubConfiguration
+
+
+class DispatchIndexTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = os.path.join(tempfile.mkdtemp(), 'dispatch-index')
+        self.addCleanup(shutil.rmtree, os.path.dirname(self.directory))
+
+        self.stub_configurations = [
+            StubConfiguration('ssh', ['-v'], answers=[Answer('first', None, 0)]),
+            StubConfiguration('rsync', answers=[Answer('second', None, 0)]),
+            StubConfiguration('ssh', answers=[Answer('third', None, 0)]),
+            StubConfiguration('bin/ssh', answers=[Answer('fourth', None, 0)])]
+
+    def test_should_return_none_when_there_is_no_dispatch_index(self):
+        self.assertEqual(None, load_candidates('ssh', self.directory))
+
+    def test_should_load_only_candidates_of_given_command_with_their_index_in_fixture_order(self):
+        write_dispatch_index(self.directory, self.stub_configurations)
+
+        actual_candidates = load_candidates('ssh', self.directory)
+
+        self.assertEqual([(0, self.stub_configurations[0]), (2, self.stub_configurations[2])], actual_candidates)
+
+    def test_should_return_no_candidates_for_command_without_stub_configuration(self):
+        write_dispatch_index(self.directory, self.stub_configurations)
+
+        self.assertEqual([], load_candidates('curl', self.directory))
+        self.assertEqual([], load_candidates('..', self.directory))
+
+    def test_should_remove_candidates_of_previous_dispatch_index(self):
+        write_dispatch_index(self.directory, self.stub_configurations)
+        write_dispatch_index(self.directory, self.stub_configurations[1:2])
+
+        self.assertEqual([], load_candidates('ssh', self.directory))
+        self.assertEqual([(0, self.stub_configurations[1])], load_candidates('rsync', self.directory))
+
+    def test_should_find_first_fulfilled_candidate(self):
+        candidates = [(0, self.stub_configurations[0]), (2, self.stub_configurations[2])]
+
+        self.assertEqual((0, self.stub_configurations[0]),
+                         find_candidate(CommandInput('ssh', ['host', '-v'], ''), candidates))
+        self.assertEqual((2, self.stub_configurations[2]),
+                         find_candidate(CommandInput('ssh', ['host'], ''), candidates))
+
+    def test_should_not_find_candidate_when_stdin_does_not_match(self):
+        candidates = [(0, StubConfiguration('ssh', ['-v'], 'expected stdin'))]
+
+        self.assertEqual(None, find_candidate(CommandInput('ssh', ['-v'], 'other stdin'), candidates))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -18,7 +18,7 @@ import unittest
 
 from mock import patch, call
 
-from shtub.fixture import Fixture
+from shtub.fixture import Fixture, spill_payloads
 
 
 class FixtureTest (unittest.TestCase):
@@ -63,8 +63,26 @@ class FixtureTest (unittest.TestCase):
         self.assertEqual([], actual_stub_configuration.command_input.arguments)
         self.assertEqual(None, actual_stub_configuration.command_input.stdin)
 
+    def test_should_pass_read_stdin_timeout_to_new_stub_configurations(self):
+        fixture = Fixture('/test123', read_stdin_timeout_in_seconds=0.1)
+
+        actual_stub_configuration = fixture.calling('any_command')
+
+        self.assertEqual(0.1, actual_stub_configuration.read_stdin_timeout_in_seconds)
+
+    def test_should_pass_answer_first_to_new_stub_configurations(self):
+        fixture = Fixture('/test123', answer_first=True)
+
+        actual_stub_configuration = fixture.calling('any_command')
+
+        self.assertTrue(actual_stub_configuration.answer_first)
+
+    @patch('shtub.fixture.remove_compiled_stubs')
+    @patch('shtub.fixture.write_compiled_stubs')
+    @patch('shtub.fixture.write_dispatch_index')
+    @patch('shtub.fixture.write_answer_cursors')
     @patch('shtub.fixture.serialize_as_dictionaries')
-    def test_should_return_fixture_itself_when_entering_with_statement_and_serialize_stub_configurations_when_exiting(self, serialize_mock):
+    def test_should_return_fixture_itself_when_entering_with_statement_and_serialize_stub_configurations_when_exiting(self, serialize_mock, write_cursors_mock, write_index_mock, write_compiled_mock, remove_compiled_mock):
         fixture = Fixture('/hello/world')
 
         with fixture as fix:
@@ -72,6 +90,70 @@ class FixtureTest (unittest.TestCase):
 
         self.assertEqual(
             call('/hello/world/shtub/stub-configurations', []), serialize_mock.call_args)
+        self.assertEqual(
+            call('/hello/world/shtub/answer-cursors', []), write_cursors_mock.call_args)
+        self.assertEqual(
+            call('/hello/world/shtub/dispatch-index', []), write_index_mock.call_args)
+        self.assertFalse(write_compiled_mock.called)
+        self.assertEqual(call('/hello/world/shtub/compiled-stubs'), remove_compiled_mock.call_args)
+
+    @patch('shtub.fixture.remove_compiled_stubs')
+    @patch('shtub.fixture.write_compiled_stubs')
+    @patch('shtub.fixture.write_dispatch_index')
+    @patch('shtub.fixture.write_answer_cursors')
+    @patch('shtub.fixture.serialize_as_dictionaries')
+    def test_should_write_compiled_stubs_when_enabled(self, serialize_mock, write_cursors_mock, write_index_mock,
+                                                      write_compiled_mock, remove_compiled_mock):
+        with Fixture('/hello/world', compiled_stubs=True):
+            pass
+
+        self.assertEqual(
+            call('/hello/world/shtub/compiled-stubs', []), write_compiled_mock.call_args)
+        self.assertFalse(remove_compiled_mock.called)
+
+    @patch('shtub.fixture.write_shell_functions')
+    @patch('shtub.fixture.remove_compiled_stubs')
+    @patch('shtub.fixture.write_compiled_stubs')
+    @patch('shtub.fixture.write_dispatch_index')
+    @patch('shtub.fixture.write_answer_cursors')
+    @patch('shtub.fixture.serialize_as_dictionaries')
+    def test_should_write_shell_functions_when_enabled(self, serialize_mock, write_cursors_mock, write_index_mock,
+                                                       write_compiled_mock, remove_compiled_mock, write_functions_mock):
+        with Fixture('/hello/world', shell_functions=True):
+            pass
+
+        self.assertEqual(
+            call('/hello/world/shtub/shell-functions', '/hello/world/shtub/executions', []),
+            write_functions_mock.call_args)
+
+    @patch('shtub.fixture.write_shell_functions')
+    @patch('shtub.fixture.remove_compiled_stubs')
+    @patch('shtub.fixture.write_compiled_stubs')
+    @patch('shtub.fixture.write_dispatch_index')
+    @patch('shtub.fixture.write_answer_cursors')
+    @patch('shtub.fixture.serialize_as_dictionaries')
+    def test_should_not_write_shell_functions_by_default(self, serialize_mock, write_cursors_mock, write_index_mock,
+                                                         write_compiled_mock, remove_compiled_mock, write_functions_mock):
+        with Fixture('/hello/world'):
+            pass
+
+        self.assertFalse(write_functions_mock.called)
+
+    @patch('shtub.fixture.spill')
+    def test_should_spill_payloads_of_stub_configurations(self, mock_spill):
+        mock_spill.side_effect = lambda base_directory, payload: payload and payload.upper()
+        fixture = Fixture('/hello/world')
+        fixture.calling('command').and_input('stdin').then_answer('stdout', None, 0)
+
+        spilled_stub_configurations = spill_payloads('/hello/world', fixture.stub_configurations)
+
+        stub_configuration = spilled_stub_configurations[0]
+        self.assertEqual('STDIN', stub_configuration.command_input.stdin)
+        self.assertEqual('STDOUT', stub_configuration.answers[0].stdout)
+        self.assertEqual(None, stub_configuration.answers[0].stderr)
+        self.assertEqual(call('/hello/world', 'stdout'), mock_spill.call_args_list[1])
+        self.assertEqual('stdin', fixture.stub_configurations[0].command_input.stdin)
+        self.assertEqual('stdout', fixture.stub_configurations[0].answers[0].stdout)
 
     def test_should_not_suppress_exceptions(self):
         fixture = Fixture('/spam/eggs')
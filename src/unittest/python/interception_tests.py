@@ -0,0 +1,160 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import subprocess
+import tempfile
+import unittest
+
+from mock import call, patch
+
+from shtub.answer import FileSource
+from shtub.interception import Interception, split_command_line
+from shtub.verification import VerificationException
+
+
+class InterceptionTests (unittest.TestCase):
+
+    def test_should_split_command_line_of_shell(self):
+        self.assertEqual(['ssh', '-arg1', 'with space'], split_command_line('ssh -arg1 "with space"', True))
+        self.assertEqual(['ssh', '-arg1'], split_command_line(['ssh', '-arg1'], False))
+        self.assertEqual(['/usr/bin/ssh'], split_command_line('/usr/bin/ssh', False))
+
+    def test_should_not_split_shell_command_lines_which_are_not_simple_commands(self):
+        for command_line in ['ssh h | grep x', 'ssh h && rm f', 'ssh h > out', 'ssh $(hostname)',
+                             'ssh h; rm f', 'ssh "unbalanced', 'VAR=value ssh h', 'ssh h\nrm f']:
+            self.assertEqual(None, split_command_line(command_line, True), command_line)
+            self.assertEqual(None, split_command_line([command_line], True), command_line)
+
+    @patch('os.system', return_value=0)
+    def test_should_execute_pipeline_led_by_stubbed_command_as_usual(self, mock_system):
+        with Interception() as interception:
+            interception.calling('ssh').then_return(1)
+
+            actual = os.system('ssh h | grep x')
+
+        self.assertEqual(0, actual)
+        self.assertEqual(call('ssh h | grep x'), mock_system.call_args)
+        self.assertEqual([], interception.executions)
+
+    def test_should_group_candidates_again_after_calling(self):
+        interception = Interception()
+        interception.calling('ssh').then_return(0)
+
+        self.assertTrue(interception.is_stubbed('ssh'))
+        self.assertTrue(interception.candidates() is interception.candidates())
+
+        interception.calling('scp').then_return(0)
+
+        self.assertTrue(interception.is_stubbed('scp'))
+
+    def test_should_answer_stubbed_command_with_captured_output(self):
+        with Interception() as interception:
+            interception.calling('ssh').at_least_with_arguments('-arg1').then_answer('Hello world', 'Hello error', 3)
+
+            actual = subprocess.run(['/usr/bin/ssh', '-arg1', '-arg2'], stdout=subprocess.PIPE,
+                                    stderr=subprocess.PIPE, universal_newlines=True)
+
+        self.assertEqual((3, 'Hello world', 'Hello error'), (actual.returncode, actual.stdout, actual.stderr))
+
+        with interception.verify() as verify:
+            verify.called('ssh').with_arguments('-arg1', '-arg2')
+
+    def test_should_pass_input_to_stubbed_command(self):
+        with Interception() as interception:
+            interception.calling('ssh').with_input('stdin').then_answer('Hello world')
+
+            actual = subprocess.check_output('ssh -arg1', shell=True, input=b'stdin')
+
+        self.assertEqual(b'Hello world', actual)
+
+        with interception.verify() as verify:
+            verify.called('ssh').with_input('stdin')
+
+    def test_should_pass_text_written_to_stdin_pipe_in_text_mode(self):
+        with Interception() as interception:
+            interception.calling('ssh').with_input('stdin').then_answer('Hello world')
+
+            process = subprocess.Popen(['ssh'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                       universal_newlines=True)
+            process.stdin.write('std')
+            actual = process.communicate('in')
+
+        self.assertEqual(('Hello world', None), actual)
+
+        with interception.verify() as verify:
+            verify.called('ssh').with_input('stdin')
+
+    def test_should_answer_with_content_of_file(self):
+        with tempfile.NamedTemporaryFile() as dump_file:
+            dump_file.write(b'\x00\xff dump')
+            dump_file.flush()
+
+            with Interception() as interception:
+                interception.calling('pg_dump').then_answer(FileSource(dump_file.name))
+
+                actual = subprocess.check_output(['pg_dump'])
+
+        self.assertEqual(b'\x00\xff dump', actual)
+
+    def test_should_return_bad_exit_code_and_record_unexpected_execution(self):
+        with Interception() as interception:
+            interception.calling('ssh').at_least_with_arguments('-arg1').then_answer('Hello world')
+
+            actual = subprocess.call(['ssh', '-unexpected'])
+
+        self.assertEqual(255, actual)
+        self.assertFalse(interception.executions[0].expected)
+        self.assertRaises(VerificationException, interception.verify)
+
+    def test_should_merge_stderr_into_stdout(self):
+        with Interception() as interception:
+            interception.calling('ssh').then_answer('out', 'err')
+
+            process = subprocess.Popen(['ssh'], stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            actual = process.communicate()
+
+        self.assertEqual((b'outerr', None), actual)
+
+    def test_should_answer_stubbed_command_executed_using_os_system(self):
+        with patch('sys.stdout') as mock_stdout:
+            with Interception() as interception:
+                interception.calling('ssh').then_answer('Hello world', return_code=2)
+
+                actual = os.system('ssh -arg1')
+
+        self.assertEqual(2 << 8, actual)
+        mock_stdout.write.assert_called_with('Hello world')
+
+    def test_should_pass_through_commands_which_have_not_been_stubbed(self):
+        with Interception() as interception:
+            interception.calling('ssh').then_answer('Hello world')
+
+            actual = subprocess.check_output(['echo', 'real'])
+
+        self.assertEqual(b'real\n', actual)
+        self.assertEqual([], interception.executions)
+
+    def test_should_restore_subprocess_and_os_system(self):
+        original_popen = subprocess.Popen
+        original_system = os.system
+
+        with Interception():
+            self.assertNotEqual(original_popen, subprocess.Popen)
+
+        self.assertEqual(original_popen, subprocess.Popen)
+        self.assertEqual(original_system, os.system)
@@ -0,0 +1,132 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import sys
+import unittest
+
+from mock import call, patch
+
+from shtub import launcher
+from shtub.answer import Answer
+from shtub.stubconfiguration import StubConfiguration
+
+
+class LauncherTests (unittest.TestCase):
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('shtub.commandstub.handle_execution')
+    @patch('shtub.launcher.read_stdin')
+    @patch('shtub.launcher.load_candidates', return_value=None)
+    def test_should_hand_over_to_command_stub_when_there_is_no_dispatch_index(
+            self, mock_load_candidates, mock_read_stdin, mock_handle_execution):
+        launcher.handle_execution()
+
+        self.assertEqual(call('command', 'shtub/dispatch-index'), mock_load_candidates.call_args)
+        self.assertEqual(call(), mock_handle_execution.call_args)
+        self.assertFalse(mock_read_stdin.called)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1', '-arg2'])
+    @patch('shtub.launcher.send_answer')
+    @patch('shtub.launcher.advance_answer_cursor')
+    @patch('shtub.launcher.append_as_dictionary')
+    @patch('shtub.launcher.read_stdin', return_value='stdin')
+    @patch('shtub.launcher.load_candidates')
+    def test_should_record_execution_and_send_next_answer_when_execution_fulfills_candidate(
+            self, mock_load_candidates, mock_read_stdin, mock_append, mock_advance, mock_send_answer):
+        stub_configuration = StubConfiguration('command', ['-arg2'], 'stdin', [Answer('Hello world', None, 0)])
+        mock_load_candidates.return_value = [(3, stub_configuration)]
+
+        launcher.handle_execution()
+
+        self.assertEqual(call(None), mock_read_stdin.call_args)
+        actual_execution = mock_append.call_args[0][1]
+        self.assertEqual('shtub/executions', mock_append.call_args[0][0])
+        self.assertEqual(['-arg1', '-arg2'], actual_execution.command_input.arguments)
+        self.assertTrue(actual_execution.expected)
+        self.assertEqual(call('shtub/answer-cursors', 3, stub_configuration), mock_advance.call_args)
+        self.assertEqual(call(mock_advance.return_value), mock_send_answer.call_args)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('shtub.launcher.send_answer')
+    @patch('shtub.launcher.advance_answer_cursor')
+    @patch('shtub.launcher.append_as_dictionary')
+    @patch('shtub.launcher.read_stdin', return_value='')
+    @patch('shtub.launcher.load_candidates')
+    @patch('shtub.launcher.load_compiled_candidates')
+    def test_should_use_compiled_stubs_instead_of_dispatch_index(
+            self, mock_load_compiled_candidates, mock_load_candidates, mock_read_stdin, mock_append, mock_advance,
+            mock_send_answer):
+        stub_configuration = StubConfiguration('command', ['-arg1'], None, [Answer('Hello world', None, 0)])
+        mock_load_compiled_candidates.return_value = [(0, stub_configuration)]
+
+        launcher.handle_execution()
+
+        self.assertEqual(call('command', 'shtub/compiled-stubs'), mock_load_compiled_candidates.call_args)
+        self.assertFalse(mock_load_candidates.called)
+        self.assertEqual(call('shtub/answer-cursors', 0, stub_configuration), mock_advance.call_args)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-unexpected'])
+    @patch('shtub.commandstub.dispatch')
+    @patch('shtub.commandstub.initialize_logging')
+    @patch('shtub.launcher.append_as_dictionary')
+    @patch('shtub.launcher.read_stdin', return_value='')
+    @patch('shtub.launcher.load_candidates')
+    def test_should_hand_over_to_command_stub_when_execution_does_not_fulfill_any_candidate(
+            self, mock_load_candidates, mock_read_stdin, mock_append, mock_initialize_logging, mock_dispatch):
+        candidates = [(0, StubConfiguration('command', ['-arg1']))]
+        mock_load_candidates.return_value = candidates
+
+        launcher.handle_execution()
+
+        self.assertFalse(mock_append.called)
+        self.assertEqual(call(), mock_initialize_logging.call_args)
+        self.assertEqual(['-unexpected'], mock_dispatch.call_args[0][0].arguments)
+        self.assertEqual(candidates, mock_dispatch.call_args[0][1])
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('shtub.launcher.send_answer_first')
+    @patch('shtub.launcher.advance_answer_cursor')
+    @patch('shtub.launcher.append_as_dictionary')
+    @patch('shtub.launcher.read_stdin', return_value='')
+    @patch('shtub.launcher.load_compiled_candidates')
+    def test_should_send_answer_first_when_fulfilled_candidate_answers_first(
+            self, mock_load_compiled_candidates, mock_read_stdin, mock_append, mock_advance, mock_send_answer_first):
+        stub_configuration = StubConfiguration('command', answers=[Answer('Hello world', None, 0)], answer_first=True)
+        mock_load_compiled_candidates.return_value = [(0, stub_configuration)]
+
+        launcher.handle_execution()
+
+        self.assertFalse(mock_append.called)
+        actual_answer, actual_execution = mock_send_answer_first.call_args[0]
+        self.assertEqual(mock_advance.return_value, actual_answer)
+        self.assertEqual(['-arg1'], actual_execution.command_input.arguments)
+        self.assertTrue(actual_execution.expected)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('shtub.launcher.send_answer')
+    @patch('shtub.launcher.advance_answer_cursor')
+    @patch('shtub.launcher.append_as_dictionary')
+    @patch('shtub.launcher.read_stdin')
+    @patch('shtub.launcher.load_compiled_candidates')
+    def test_should_not_read_stdin_when_no_candidate_needs_it(
+            self, mock_load_compiled_candidates, mock_read_stdin, mock_append, mock_advance, mock_send_answer):
+        stub_configuration = StubConfiguration('command', ['-arg1'], None, [Answer('Hello world', None, 0)])
+        mock_load_compiled_candidates.return_value = [(0, stub_configuration)]
+
+        launcher.handle_execution()
+
+        self.assertFalse(mock_read_stdin.called)
+        self.assertEqual(None, mock_append.call_args[0][1].command_input.stdin)
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from shtub.outputcapture import StreamCapture
+
+
+class StreamCaptureTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='outputcapture-test-')
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.filename = os.path.join(self.directory, '00-stdout')
+
+    def capture(self, chunks, tail_limit):
+        read_end, write_end = os.pipe()
+        capture = StreamCapture(os.fdopen(read_end, 'rb'), self.filename, 'utf-8', tail_limit).start()
+
+        for chunk in chunks:
+            os.write(write_end, chunk)
+        os.close(write_end)
+
+        return capture.join()
+
+    def test_should_write_complete_output_and_keep_tail(self):
+        actual = self.capture([b'0123456789' * 1000, b'abcdef'], tail_limit=10)
+
+        self.assertEqual('6789abcdef', actual.tail)
+        self.assertTrue(actual.truncated)
+        self.assertEqual(10006, actual.length)
+        self.assertEqual('0123456789' * 1000 + 'abcdef', actual.read())
+
+    def test_should_not_truncate_output_shorter_than_tail_limit(self):
+        actual = self.capture([b'Hello world'], tail_limit=100)
+
+        self.assertEqual('Hello world', actual.tail)
+        self.assertEqual('Hello world', str(actual))
+        self.assertFalse(actual.truncated)
+
+    def test_should_decode_characters_split_between_chunks(self):
+        data = '\u00fcber'.encode('utf-8')
+
+        actual = self.capture([data[:1], data[1:]], tail_limit=100)
+
+        self.assertEqual('\u00fcber', actual.tail)
+        with actual.open() as output_file:
+            self.assertEqual('\u00fcber', output_file.read())
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from mock import patch
+
+from shtub.outputcapture import CapturedOutput
+from shtub.outputlog import OutputLog, OutputLogReader
+
+
+class OutputLogTests (unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix='outputlog-test-')
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        os.mkdir(os.path.join(self.base_dir, 'shtub'))
+
+    def read_log(self):
+        with open(os.path.join(self.base_dir, 'shtub', 'output-log')) as log_file:
+            return log_file.read()
+
+    def test_should_write_environment_only_once(self):
+        output_log = OutputLog(self.base_dir)
+
+        output_log.append(0, 'command1', {'B': '2', 'A': '1'}, 0, 'out\n', '')
+        output_log.append(1, 'command2', {'B': '2', 'A': '1'}, 3, '', 'err\n')
+
+        self.assertEqual('--------------- ENVIRONMENT ----------------\n'
+                         'A=1\n'
+                         'B=2\n'
+                         '================= COMMAND 00 =================\n'
+                         'command1\n'
+                         '----------------- STDOUT -------------------\n'
+                         'out\n'
+                         '----------------- STDERR -------------------\n'
+                         '================= COMMAND 01 =================\n'
+                         'command2\n'
+                         '----------------- STDOUT -------------------\n'
+                         '----------------- STDERR -------------------\n'
+                         'err\n', self.read_log())
+
+    def test_should_write_environment_again_when_it_changed(self):
+        output_log = OutputLog(self.base_dir)
+
+        output_log.append(0, 'command', {'A': '1'}, 0, '', '')
+        output_log.append(1, 'command', {'A': '2'}, 0, '', '')
+
+        self.assertEqual(2, self.read_log().count('ENVIRONMENT'))
+
+    def test_should_read_record_of_given_command(self):
+        output_log = OutputLog(self.base_dir)
+        output_log.append(0, 'command1', {}, 0, 'out1', 'err1')
+        output_log.append(1, 'command2', {}, 21, '\u00fcber', 'err2')
+
+        reader = OutputLogReader(self.base_dir)
+        actual_record = reader.record(1)
+
+        self.assertEqual(2, len(reader))
+        self.assertEqual('command2', actual_record.command)
+        self.assertEqual(21, actual_record.return_code)
+        self.assertEqual('\u00fcber', actual_record.stdout)
+        self.assertEqual('err2', actual_record.stderr)
+        self.assertEqual('out1', reader.record(0).stdout)
+
+    def test_should_read_index_once_and_entries_appended_later(self):
+        output_log = OutputLog(self.base_dir)
+        output_log.append(0, 'command1', {}, 0, 'out1', '')
+        reader = OutputLogReader(self.base_dir)
+
+        self.assertEqual('out1', reader.record(0).stdout)
+
+        output_log.append(1, 'command2', {}, 0, 'out2', '')
+
+        with patch.object(reader, 'read_index', wraps=reader.read_index) as mock_read_index:
+            self.assertEqual('out1', reader.record(0).stdout)
+            self.assertFalse(mock_read_index.called)
+            self.assertEqual('out2', reader.record(1).stdout)
+            self.assertTrue(mock_read_index.called)
+
+    def test_should_report_offsets_of_concurrent_appends(self):
+        output_log = OutputLog(self.base_dir)
+
+        def append(number):
+            output_log.append(number, 'command', {}, 0, 'out%d\n' % number * 1000, '')
+
+        threads = [threading.Thread(target=append, args=(number,)) for number in range(8)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        reader = OutputLogReader(self.base_dir)
+
+        for number in range(8):
+            self.assertEqual('out%d\n' % number * 1000, reader.record(number).stdout)
+
+    def test_should_raise_index_error_when_command_has_no_record(self):
+        reader = OutputLogReader(self.base_dir)
+
+        self.assertEqual(0, len(reader))
+        self.assertRaises(IndexError, reader.record, 0)
+
+    def test_should_reference_streamed_output(self):
+        output_log = OutputLog(self.base_dir)
+        stdout_filename = output_log.stream_filename(0, 'stdout')
+        stderr_filename = output_log.stream_filename(0, 'stderr')
+        with open(stdout_filename, 'wb') as stdout_file:
+            stdout_file.write(b'Hello world')
+        open(stderr_filename, 'wb').close()
+
+        output_log.append_streamed(0, 'command', {}, 0,
+                                   CapturedOutput(stdout_filename, 'utf-8', 'world', 11, True),
+                                   CapturedOutput(stderr_filename, 'utf-8', '', 0, False))
+
+        actual_record = OutputLogReader(self.base_dir).record(0)
+
+        self.assertEqual('Hello world', actual_record.stdout)
+        self.assertEqual('', actual_record.stderr)
+        self.assertTrue('(11 bytes written to shtub/output-streams/00-stdout)' in self.read_log())
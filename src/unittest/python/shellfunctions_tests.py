@@ -0,0 +1,99 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+
+from shtub import deserialize_executions
+from shtub.execution import Execution
+from shtub.stubconfiguration import StubConfiguration
+from shtub.shellfunctions import can_be_replayed, render_function, write_shell_functions
+
+
+class ShellFunctionsTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.functions_filename = os.path.join(self.directory, 'shell-functions')
+        self.executions_filename = os.path.join(self.directory, 'executions')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def execute(self, script, stdin=b''):
+        process = subprocess.Popen(['bash', '-c', script], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, env={'BASH_ENV': self.functions_filename,
+                                                                'PATH': os.environ.get('PATH', '/bin:/usr/bin')})
+        stdout, stderr = process.communicate(stdin)
+        return process.returncode, stdout.decode('utf-8'), stderr.decode('utf-8')
+
+    def test_should_replay_configurations_with_one_answer_and_without_input(self):
+        self.assertTrue(can_be_replayed('ssh', [StubConfiguration('ssh', ['-arg1']).then_answer('out')]))
+
+    def test_should_not_replay_configurations_with_several_answers_or_input(self):
+        self.assertFalse(can_be_replayed('ssh', [StubConfiguration('ssh').then_answer('1').then_answer('2')]))
+        self.assertFalse(can_be_replayed('ssh', [StubConfiguration('ssh', stdin='in').then_answer('out')]))
+        self.assertFalse(can_be_replayed('ssh.exe', [StubConfiguration('ssh.exe').then_answer('out')]))
+
+    def test_should_render_exported_function_returning_bad_exit_code_without_recording_when_nothing_matches(self):
+        actual = render_function('ssh', [(0, StubConfiguration('ssh', ['-arg1']).then_answer('out', None, 3))])
+
+        self.assertTrue(actual.startswith('ssh () {\n'))
+        self.assertTrue('    if __shtub_contains -arg1 "$@"; then\n' in actual)
+        self.assertTrue("        printf '%s' out\n        return 3\n" in actual)
+        self.assertTrue('        __shtub_record ssh "$@"\n' in actual)
+        self.assertTrue(actual.endswith('    fi\n    return 255\n}\nexport -f ssh\n'))
+
+    def test_should_write_functions_of_replayable_commands_only(self):
+        actual = write_shell_functions(self.functions_filename, self.executions_filename, [
+            StubConfiguration('ssh').then_answer('out'),
+            StubConfiguration('scp', stdin='in').then_answer('out')])
+
+        self.assertEqual(['ssh'], actual)
+
+    def test_should_answer_and_journal_executions_readable_by_verifier(self):
+        write_shell_functions(self.functions_filename, self.executions_filename, [
+            StubConfiguration('ssh', ['-arg1']).then_answer('Hello "world"\n', 'Hello error', 3)])
+
+        actual = self.execute('ssh -arg1 "with space" $\'new\\nline\\\\\'; echo $?; ssh -unexpected', b'stdin')
+
+        self.assertEqual((255, 'Hello "world"\n3\n', 'Hello error'), actual)
+        self.assertEqual([Execution('ssh', ['-arg1', 'with space', 'new\nline\\'], None, True)],
+                         deserialize_executions(self.executions_filename))
+
+    def test_should_escape_control_characters_in_journal(self):
+        write_shell_functions(self.functions_filename, self.executions_filename, [
+            StubConfiguration('ssh').then_answer('out')])
+
+        self.execute('ssh $\'\\e[31mred\\e[0m\' $\'back\\bspace\' $\'\\x01\\x1f\\t\' \'\\u00e9\' \u00e9')
+
+        self.assertEqual([Execution('ssh', ['\x1b[31mred\x1b[0m', 'back\bspace', '\x01\x1f\t', '\\u00e9', '\u00e9'],
+                                    None, True)],
+                         deserialize_executions(self.executions_filename))
+
+    def test_should_capture_stdin_when_read_stdin_timeout_is_configured(self):
+        write_shell_functions(self.functions_filename, self.executions_filename, [
+            StubConfiguration('ssh').with_read_stdin_timeout(0.5).then_answer('Hello world')])
+
+        actual = self.execute('ssh', b'stdin')
+
+        self.assertEqual((0, 'Hello world', ''), actual)
+        self.assertEqual([Execution('ssh', [], 'stdin', True)], deserialize_executions(self.executions_filename))
@@ -0,0 +1,65 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from shtub.shellsession import ShellSession, ShellSessionException
+
+
+class ShellSessionTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='shellsession-test-')
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.session = ShellSession(self.directory, {'PATH': os.environ.get('PATH', '/bin:/usr/bin'), 'VALUE': '42'})
+        self.addCleanup(self.session.close)
+
+    def test_should_return_return_code_stdout_and_stderr(self):
+        actual = self.session.execute('echo "$VALUE"; printf error >&2; exit 3')
+
+        self.assertEqual((3, b'42\n', b'error'), actual)
+
+    def test_should_keep_output_without_trailing_newline(self):
+        actual = self.session.execute('printf "no newline"')
+
+        self.assertEqual((0, b'no newline', b''), actual)
+
+    def test_should_execute_commands_in_subshells_of_one_shell(self):
+        self.session.execute('cd /; VALUE=0')
+
+        actual = self.session.execute('pwd; echo "$VALUE"; echo $$')
+        second = self.session.execute('echo $$')
+
+        lines = actual[1].decode('utf-8').splitlines()
+        self.assertEqual(os.path.realpath(self.directory), os.path.realpath(lines[0]))
+        self.assertEqual('42', lines[1])
+        self.assertEqual(lines[2], second[1].decode('utf-8').strip())
+        self.assertEqual(str(self.session.process.pid), lines[2])
+
+    def test_should_not_pass_session_input_to_commands(self):
+        actual = self.session.execute('cat')
+
+        self.assertEqual((0, b'', b''), actual)
+
+    def test_should_return_output_when_shell_dies_while_executing_command(self):
+        actual = self.session.execute('echo before; kill -9 $$; sleep 5')
+
+        self.assertEqual((-9, b'before\n', b''), actual)
+        self.assertFalse(self.session.is_alive())
+        self.assertRaises(ShellSessionException, self.session.execute, 'true')
@@ -14,7 +14,10 @@
 #   You should have received a copy of the GNU General Public License
 #   along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 
 from mock import Mock, call, patch
@@ -24,7 +27,9 @@ if sys.version_info[0] == 3:
 else:
     builtin_string = '__builtin__'
 
-from shtub import __version__, serialize_as_dictionaries, deserialize_executions, deserialize_stub_configurations, lock, unlock
+from shtub import (__version__, serialize_as_dictionaries, deserialize_executions, deserialize_stub_configurations,
+                   append_as_dictionary, append_reserved_record, reserve_journal_record, lock, unlock,
+                   JournalException)
 from shtub.answer import Answer
 from shtub.execution import Execution
 from shtub.stubconfiguration import StubConfiguration
@@ -114,6 +119,58 @@ class ShtubTests (unittest.TestCase):
             call('stub_configuration.json', mode='w'), mock_open.call_args)
         self.assertEqual(call('[{"some": "json"}]'), fake_file.write.call_args)
 
+    def test_should_append_executions_to_journal_and_deserialize_them_in_order(self):
+        journal_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_directory)
+        journal_filename = os.path.join(journal_directory, 'executions')
+        first_execution = Execution('command', ['-arg1'], 'stdin', expected=True)
+        second_execution = Execution('command', ['-arg2'], 'multi\nline\nstdin', expected=True)
+
+        append_as_dictionary(journal_filename, first_execution)
+        append_as_dictionary(journal_filename, second_execution)
+
+        with open(journal_filename) as journal_file:
+            self.assertEqual(2, len(journal_file.readlines()))
+
+        self.assertEqual([first_execution, second_execution], deserialize_executions(journal_filename))
+
+    def test_should_deserialize_reserved_records_at_position_of_their_placeholders(self):
+        journal_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_directory)
+        journal_filename = os.path.join(journal_directory, 'executions')
+        first_execution = Execution('command', ['-arg1'], None, expected=True)
+        second_execution = Execution('command', ['-arg2'], None, expected=True)
+        third_execution = Execution('command', ['-arg3'], None, expected=True)
+
+        first_token = reserve_journal_record(journal_filename)
+        second_token = reserve_journal_record(journal_filename)
+        append_as_dictionary(journal_filename, third_execution)
+        append_reserved_record(journal_filename, second_token, second_execution)
+        append_reserved_record(journal_filename, first_token, first_execution)
+
+        self.assertEqual([first_execution, second_execution, third_execution],
+                         deserialize_executions(journal_filename))
+
+    def test_should_raise_exception_when_journal_contains_torn_record(self):
+        journal_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_directory)
+        journal_filename = os.path.join(journal_directory, 'executions')
+        append_as_dictionary(journal_filename, Execution('command', ['-arg1'], 'stdin', expected=True))
+
+        with open(journal_filename, 'a') as journal_file:
+            journal_file.write('{"command_input": {"arguments": ["-ar')
+
+        self.assertRaises(JournalException, deserialize_executions, journal_filename)
+
+    def test_should_raise_exception_when_placeholder_has_no_record(self):
+        journal_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, journal_directory)
+        journal_filename = os.path.join(journal_directory, 'executions')
+        reserve_journal_record(journal_filename)
+        append_as_dictionary(journal_filename, Execution('command', ['-arg1'], None, expected=True))
+
+        self.assertRaises(JournalException, deserialize_executions, journal_filename)
+
     def return_file_when_calling(self, mock_open, content=None):
         file_handle = Mock()
 
@@ -0,0 +1,62 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from shtub.spawn import spawn_and_capture
+
+
+class SpawnTests (unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp(prefix='spawn-test-')
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.executable = os.path.join(self.directory, 'program')
+
+        with open(self.executable, 'w') as executable_file:
+            executable_file.write('#!/bin/sh\npwd\necho "$VALUE" >&2\nexit 7\n')
+        os.chmod(self.executable, 0o755)
+
+        self.env = {'PATH': self.directory + os.pathsep + '/bin', 'VALUE': 'value'}
+
+    def test_should_spawn_in_given_directory_with_given_environment(self):
+        previous_cwd = os.getcwd()
+
+        actual = spawn_and_capture(['program'], self.directory, self.env)
+
+        self.assertEqual(7, actual[0])
+        self.assertEqual(os.path.realpath(self.directory), os.path.realpath(actual[1].decode('utf-8').strip()))
+        self.assertEqual(b'value\n', actual[2])
+        self.assertEqual(previous_cwd, os.getcwd())
+
+    def test_should_return_negative_signal_when_killed(self):
+        actual = spawn_and_capture(['/bin/sh', '-c', 'kill -9 $$'], self.directory, self.env)
+
+        self.assertEqual(-9, actual[0])
+
+    def test_should_raise_oserror_when_executable_is_not_in_path(self):
+        self.assertRaises(OSError, spawn_and_capture, ['program'], self.directory, {'PATH': '/does/not/exist'})
+
+    def test_should_not_change_working_directory_of_this_process(self):
+        with patch('os.chdir') as mock_chdir:
+            spawn_and_capture(['program'], self.directory, self.env)
+
+        self.assertFalse(mock_chdir.called)
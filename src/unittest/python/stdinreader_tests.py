@@ -0,0 +1,108 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+import time
+import unittest
+
+from mock import Mock, patch
+
+from shtub.stdinreader import (STDIN_DEVICE, STDIN_FILE, STDIN_STREAM,
+                               classify_stdin, needs_stdin, read_stdin, read_stdin_timeout)
+from shtub.stubconfiguration import StubConfiguration
+
+
+class StdinReaderTests (unittest.TestCase):
+
+    def test_should_classify_dev_null_as_device(self):
+        with open(os.devnull) as stdin:
+            self.assertEqual(STDIN_DEVICE, classify_stdin(stdin.fileno()))
+
+    def test_should_classify_pipe_as_stream(self):
+        read_end, write_end = os.pipe()
+        self.addCleanup(os.close, read_end)
+        self.addCleanup(os.close, write_end)
+
+        self.assertEqual(STDIN_STREAM, classify_stdin(read_end))
+
+    def test_should_return_empty_string_immediately_when_stdin_is_dev_null(self):
+        with open(os.devnull) as stdin:
+            start = time.time()
+            actual = read_stdin(stdin=stdin)
+
+        self.assertEqual('', actual)
+        self.assertTrue(time.time() - start < 0.5)
+
+    def test_should_read_regular_file_without_waiting(self):
+        with tempfile.TemporaryFile(mode='w+') as stdin:
+            stdin.write('Hello world')
+            stdin.seek(0)
+
+            self.assertEqual(STDIN_FILE, classify_stdin(stdin.fileno()))
+            self.assertEqual('Hello world', read_stdin(stdin=stdin))
+
+    def test_should_read_input_from_pipe(self):
+        read_end, write_end = os.pipe()
+        os.write(write_end, b'Hello world')
+        os.close(write_end)
+
+        with os.fdopen(read_end) as stdin:
+            actual = read_stdin(stdin=stdin)
+
+        self.assertEqual('Hello world', actual)
+
+    def test_should_wait_at_most_given_timeout_for_silent_pipe(self):
+        read_end, write_end = os.pipe()
+        self.addCleanup(os.close, write_end)
+
+        with os.fdopen(read_end) as stdin:
+            start = time.time()
+            actual = read_stdin(0.1, stdin=stdin)
+
+        self.assertEqual('', actual)
+        self.assertTrue(time.time() - start < 0.5)
+
+    def test_should_return_empty_string_when_stdin_has_no_file_descriptor(self):
+        stdin = Mock()
+        stdin.fileno.side_effect = ValueError('closed file')
+
+        self.assertEqual('', read_stdin(stdin=stdin))
+
+    @patch('shtub.stdinreader.select', return_value=([], [], []))
+    @patch('shtub.stdinreader.classify_stdin', return_value=STDIN_STREAM)
+    def test_should_use_a_one_second_timeout_by_default(self, mock_classify, mock_select):
+        stdin = Mock()
+
+        read_stdin(stdin=stdin)
+
+        self.assertEqual(1, mock_select.call_args[0][3])
+
+    def test_should_return_longest_configured_timeout_of_candidates(self):
+        candidates = [(0, StubConfiguration('command')),
+                      (1, StubConfiguration('command', read_stdin_timeout_in_seconds=0.5)),
+                      (2, StubConfiguration('command', read_stdin_timeout_in_seconds=2))]
+
+        self.assertEqual(2, read_stdin_timeout(candidates))
+
+    def test_should_return_default_timeout_when_no_candidate_configures_one(self):
+        self.assertEqual(None, read_stdin_timeout([(0, StubConfiguration('command'))]))
+        self.assertEqual(3, read_stdin_timeout([], default=3))
+
+    def test_should_need_stdin_only_when_a_candidate_matches_it_or_configures_a_timeout(self):
+        self.assertFalse(needs_stdin([(0, StubConfiguration('command', ['-arg1']))]))
+        self.assertTrue(needs_stdin([(0, StubConfiguration('command')), (1, StubConfiguration('command', stdin=''))]))
+        self.assertTrue(needs_stdin([(0, StubConfiguration('command', read_stdin_timeout_in_seconds=0.1))]))
@@ -0,0 +1,108 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import sys
+import unittest
+
+from mock import Mock, call, patch
+
+from shtub import stubclient
+
+
+class StubClientTests (unittest.TestCase):
+
+    def test_should_return_none_when_no_stub_server_is_listening(self):
+        actual = stubclient.connect('/does/not/exist/stub-server')
+
+        self.assertEqual(None, actual)
+
+    @patch('shtub.commandstub.handle_execution')
+    @patch('shtub.stubclient.connect', return_value=None)
+    def test_should_fall_back_to_command_stub_when_no_stub_server_is_listening(self, mock_connect, mock_handle_execution):
+        stubclient.handle_execution()
+
+        self.assertEqual(call(), mock_handle_execution.call_args)
+
+    def test_should_return_message_from_response(self):
+        response_file = Mock()
+        response_file.readline.return_value = b'{"return_code": 21}\n'
+
+        actual = stubclient.receive_message(response_file)
+
+        self.assertEqual({'return_code': 21}, actual)
+
+    def test_should_return_none_when_stub_server_did_not_answer(self):
+        response_file = Mock()
+        response_file.readline.return_value = b''
+
+        actual = stubclient.receive_message(response_file)
+
+        self.assertEqual(None, actual)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('sys.exit')
+    @patch('shtub.stubclient.receive_message', side_effect=[{'read_stdin_timeout_in_seconds': 0.5}, {'return_code': 21}])
+    @patch('shtub.stubclient.send_message')
+    @patch('shtub.stubclient.send_request')
+    @patch('shtub.stubclient.read_stdin', return_value='stdin')
+    @patch('shtub.stubclient.connect')
+    def test_should_forward_execution_and_exit_with_return_code(
+            self, mock_connect, mock_read_stdin, mock_send_request, mock_send_message, mock_receive, mock_exit):
+        connection = mock_connect.return_value
+
+        stubclient.handle_execution()
+
+        self.assertEqual(call(connection, 'command', ['-arg1']), mock_send_request.call_args)
+        self.assertEqual(call(0.5), mock_read_stdin.call_args)
+        self.assertEqual(call(connection, {'stdin': 'stdin'}), mock_send_message.call_args)
+        self.assertEqual(call(), connection.close.call_args)
+        self.assertEqual(call(21), mock_exit.call_args)
+
+    @patch.object(sys, 'argv', ['/path/to/command', '-arg1'])
+    @patch('sys.exit')
+    @patch('shtub.stubclient.receive_message',
+           side_effect=[{'read_stdin_timeout_in_seconds': None, 'capture_stdin': False}, {'return_code': 0}])
+    @patch('shtub.stubclient.send_message')
+    @patch('shtub.stubclient.send_request')
+    @patch('shtub.stubclient.read_stdin')
+    @patch('shtub.stubclient.connect')
+    def test_should_not_read_stdin_when_stub_server_does_not_capture_it(
+            self, mock_connect, mock_read_stdin, mock_send_request, mock_send_message, mock_receive, mock_exit):
+        connection = mock_connect.return_value
+
+        stubclient.handle_execution()
+
+        self.assertFalse(mock_read_stdin.called)
+        self.assertEqual(call(connection, {'stdin': None}), mock_send_message.call_args)
+        self.assertEqual(call(0), mock_exit.call_args)
+
+    @patch.object(sys, 'argv', ['/path/to/command'])
+    @patch('sys.exit')
+    @patch('shtub.stubclient.receive_message', return_value=None)
+    @patch('shtub.stubclient.send_message')
+    @patch('shtub.stubclient.send_request')
+    @patch('shtub.stubclient.read_stdin')
+    @patch('shtub.stubclient.connect')
+    def test_should_exit_with_255_when_stub_server_closed_connection_before_reading_stdin(
+            self, mock_connect, mock_read_stdin, mock_send_request, mock_send_message, mock_receive, mock_exit):
+        stubclient.handle_execution()
+
+        self.assertFalse(mock_read_stdin.called)
+        self.assertEqual(call(255), mock_exit.call_args)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -59,6 +59,29 @@ class StubConfigurationTests (unittest.TestCase):
         self.assertEqual('Spam eggs.', actual_second_answer.stdout)
         self.assertEqual('Error!', actual_second_answer.stderr)
         self.assertEqual(21, actual_second_answer.return_code)
+        self.assertEqual(None, actual_stub_configuration.read_stdin_timeout_in_seconds)
+
+    def test_should_set_read_stdin_timeout_and_keep_it_in_dictionary(self):
+        stub_configuration = StubConfiguration('any_command')
+
+        actual_return_value = stub_configuration.with_read_stdin_timeout(0.25)
+
+        self.assertEqual(stub_configuration, actual_return_value)
+        self.assertEqual(0.25, stub_configuration.as_dictionary()['read_stdin_timeout_in_seconds'])
+
+        actual_stub_configuration = StubConfiguration.from_dictionary(stub_configuration.as_dictionary())
+
+        self.assertEqual(0.25, actual_stub_configuration.read_stdin_timeout_in_seconds)
+
+    def test_should_answer_first_and_keep_it_in_dictionary(self):
+        stub_configuration = StubConfiguration('any_command')
+
+        self.assertFalse(stub_configuration.answer_first)
+
+        actual_return_value = stub_configuration.with_answer_first()
+
+        self.assertEqual(stub_configuration, actual_return_value)
+        self.assertTrue(StubConfiguration.from_dictionary(stub_configuration.as_dictionary()).answer_first)
 
     def test_should_create_new_object_with_given_properties(self):
         actual = StubConfiguration(
@@ -220,6 +243,15 @@ class StubConfigurationTests (unittest.TestCase):
         self.assertEqual(stub_configuration, actual_return_value)
         self.assertEqual(['-arg1', '-arg2', '-arg3'],
                          stub_configuration.command_input.arguments)
+        self.assertEqual(frozenset(['-arg1', '-arg2', '-arg3']),
+                         stub_configuration.command_input.argument_set)
+
+    def test_should_freeze_arguments_of_loaded_stub_configuration(self):
+        stub_configuration = StubConfiguration('any_command', ['-arg1'])
+
+        actual = StubConfiguration.from_dictionary(stub_configuration.as_dictionary())
+
+        self.assertEqual(frozenset(['-arg1']), actual.command_input.argument_set)
 
     def test_should_set_empty_stdin_as_default(self):
         stub_configuration = StubConfiguration('any_command')
@@ -292,6 +324,20 @@ class StubConfigurationTests (unittest.TestCase):
         self.assertEqual('Foo error!', actual_third_answer.stderr)
         self.assertEqual(1, actual_third_answer.return_code)
 
+    def test_should_have_static_answer_when_current_answer_is_the_last_one(self):
+        stub_configuration = StubConfiguration('any_command')
+        stub_configuration.then_answer('Hello world!')
+
+        self.assertTrue(stub_configuration.has_static_answer())
+
+        stub_configuration.then_answer('Foo bar!')
+
+        self.assertFalse(stub_configuration.has_static_answer())
+
+        stub_configuration.next_answer()
+
+        self.assertTrue(stub_configuration.has_static_answer())
+
     def test_should_send_answers_in_given_order_when_asking_for_next_answer(self):
         stub_configuration = StubConfiguration(
             'any_command', ['any_arg1', 'any_arg2'], 'any_stdin')
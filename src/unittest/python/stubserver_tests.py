@@ -0,0 +1,124 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import threading
+import unittest
+
+from mock import call, patch
+
+from shtub.answer import Answer
+from shtub.commandinput import CommandInput
+from shtub.stubconfiguration import StubConfiguration
+from shtub.dispatchindex import group_by_command
+from shtub.stubserver import StubServer
+
+
+class StubServerTests (unittest.TestCase):
+
+    def test_should_create_object_with_paths_in_given_base_directory(self):
+        actual = StubServer('/abc/def')
+
+        self.assertEqual('/abc/def/shtub/stub-server', actual.socket_filename)
+        self.assertEqual('/abc/def/shtub/stub-configurations', actual.stub_configurations_filename)
+        self.assertEqual('/abc/def/shtub/executions', actual.executions_filename)
+        self.assertEqual([], actual.executions)
+
+    @patch('shtub.stubserver.write_to_file_descriptor')
+    @patch('shtub.stubserver.append_as_dictionary')
+    @patch('shtub.stubserver.StubServer.load_stub_configurations')
+    def test_should_record_execution_and_write_answer_when_execution_fulfills_stub_configuration(
+            self, mock_load, mock_append, mock_write):
+        stub_server = StubServer('/abc/def')
+        stub_server.stub_configurations = [
+            StubConfiguration('command', ['-arg1'], 'stdin', [Answer('Hello world', 'Hello error', 15)])]
+        stub_server.candidates_by_command = group_by_command(stub_server.stub_configurations)
+        stub_server.cursor_locks = [threading.Lock()]
+
+        actual_return_code = stub_server.dispatch(
+            CommandInput('command', ['-arg1', '-arg2'], 'stdin'), 3, 4)
+
+        self.assertEqual(15, actual_return_code)
+        self.assertEqual(1, len(stub_server.executions))
+        self.assertTrue(stub_server.executions[0].expected)
+        self.assertEqual(call('/abc/def/shtub/executions', stub_server.executions[0]), mock_append.call_args)
+        self.assertEqual([call(3, 'Hello world'), call(4, 'Hello error')], mock_write.call_args_list)
+
+    @patch('shtub.stubserver.write_to_file_descriptor')
+    @patch('shtub.stubserver.append_as_dictionary')
+    @patch('shtub.stubserver.StubServer.load_stub_configurations')
+    def test_should_keep_answer_cursors_in_memory(self, mock_load, mock_append, mock_write):
+        stub_server = StubServer('/abc/def')
+        stub_server.stub_configurations = [
+            StubConfiguration('command', answers=[Answer(None, None, 1), Answer(None, None, 2)])]
+        stub_server.candidates_by_command = group_by_command(stub_server.stub_configurations)
+        stub_server.cursor_locks = [threading.Lock()]
+
+        actual_return_codes = [stub_server.dispatch(CommandInput('command', [], ''), 3, 4)
+                               for _ in range(3)]
+
+        self.assertEqual([1, 2, 2], actual_return_codes)
+        self.assertEqual(None, mock_write.call_args)
+
+    @patch('logging.error')
+    @patch('shtub.stubserver.append_as_dictionary')
+    @patch('shtub.stubserver.StubServer.load_stub_configurations')
+    def test_should_return_255_and_not_record_execution_when_execution_not_in_stub_configuration(
+            self, mock_load, mock_append, mock_logging_error):
+        stub_server = StubServer('/abc/def')
+
+        actual_return_code = stub_server.dispatch(CommandInput('command', [], ''), 3, 4)
+
+        self.assertEqual(255, actual_return_code)
+        self.assertEqual([], stub_server.executions)
+        self.assertEqual(None, mock_append.call_args)
+
+    @patch('shtub.stubserver.StubServer.load_stub_configurations')
+    def test_should_select_candidates_of_command(self, mock_load):
+        stub_server = StubServer('/abc/def')
+        stub_server.stub_configurations = [StubConfiguration('command1'), StubConfiguration('command2')]
+        stub_server.candidates_by_command = group_by_command(stub_server.stub_configurations)
+        stub_server.cursor_locks = [threading.Lock(), threading.Lock()]
+
+        actual_candidates, actual_cursor_locks = stub_server.select_candidates('command2')
+
+        self.assertEqual([(1, StubConfiguration('command2'))], actual_candidates)
+        self.assertEqual(stub_server.cursor_locks, actual_cursor_locks)
+        self.assertEqual(call(), mock_load.call_args)
+
+    @patch('shtub.stubserver.deserialize_stub_configurations', return_value=[StubConfiguration('command')])
+    @patch('os.stat')
+    @patch('os.path.exists', return_value=True)
+    def test_should_load_stub_configurations_only_when_file_has_changed(self, mock_exists, mock_stat, mock_deserialize):
+        mock_stat.return_value = os.stat_result((0, 1, 0, 0, 0, 0, 10, 0, 20, 0))
+        stub_server = StubServer('/abc/def')
+
+        stub_server.load_stub_configurations()
+        stub_server.load_stub_configurations()
+
+        self.assertEqual([StubConfiguration('command')], stub_server.stub_configurations)
+        self.assertEqual(['command'], list(stub_server.candidates_by_command.keys()))
+        self.assertEqual([call('/abc/def/shtub/stub-configurations')], mock_deserialize.call_args_list)
+
+        mock_stat.return_value = os.stat_result((0, 1, 0, 0, 0, 0, 11, 0, 21, 0))
+        stub_server.load_stub_configurations()
+
+        self.assertEqual(2, len(mock_deserialize.call_args_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from mock import call, patch
+
+from shtub.testbase import IntegrationTestBase, ram_backed_directory
+
+
+class RamBackedDirectoryTests (unittest.TestCase):
+
+    def test_should_return_given_directory_when_it_is_writable(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+
+        self.assertEqual(directory, ram_backed_directory(directory))
+
+    def test_should_return_none_when_directory_does_not_exist(self):
+        self.assertEqual(None, ram_backed_directory('/does/not/exist'))
+
+    def test_should_return_none_when_directory_is_not_writable(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        os.chmod(directory, 0o500)
+        self.addCleanup(os.chmod, directory, 0o700)
+
+        if os.access(directory, os.W_OK):
+            self.skipTest('permissions are not enforced for this user')
+
+        self.assertEqual(None, ram_backed_directory(directory))
+
+
+class SetBaseDirTests (unittest.TestCase):
+
+    @patch('shtub.testbase.BASE_DIR_REMOVER')
+    def test_should_remove_temporary_base_dir_set_without_set_up(self, mock_remover):
+        test_base = IntegrationTestBase('run')
+
+        test_base.set_base_dir(None)
+        self.addCleanup(shutil.rmtree, test_base.base_dir)
+        test_base.tear_down_base_dirs(failed=False)
+
+        self.assertEqual(call(test_base.base_dir), mock_remover.remove.call_args)
+        self.assertEqual(0, test_base.command_counter)
+
+    @patch('shtub.testbase.ram_backed_directory')
+    @patch('shtub.testbase.BASE_DIR_REMOVER')
+    def test_should_remove_state_dirs_of_given_ram_backed_base_dirs(self, mock_remover, mock_ram_backed_directory):
+        ram_directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, ram_directory)
+        mock_ram_backed_directory.return_value = ram_directory
+        test_base = IntegrationTestBase('run')
+
+        test_base.make_base_dir(os.path.join(ram_directory, 'first'), ram_backed=True)
+        first_state_dir = test_base.state_dir
+        test_base.make_base_dir(os.path.join(ram_directory, 'second'), ram_backed=True)
+        test_base.tear_down_base_dirs(failed=False)
+
+        self.assertEqual([call(test_base.state_dir), call(first_state_dir)], mock_remover.remove.call_args_list)
+        self.assertTrue(os.path.islink(os.path.join(ram_directory, 'second', 'shtub')))
+
+    def test_should_not_modify_given_environment_when_using_shell_functions(self):
+        test_base = IntegrationTestBase('run')
+        test_base.set_base_dir(None)
+        self.addCleanup(shutil.rmtree, test_base.base_dir)
+        env = {'PATH': '/bin'}
+
+        test_base.prepare_testbed(env, ['ssh'], use_shell_functions=True)
+
+        self.assertEqual({'PATH': '/bin'}, env)
+        self.assertEqual(os.path.join(test_base.base_dir, 'shtub', 'shell-functions'), test_base.env['BASH_ENV'])
+
+
+class ExecuteCommandsConcurrentlyTests (unittest.TestCase):
+
+    def setUp(self):
+        self.test_base = IntegrationTestBase('run')
+        self.test_base.command_counter = 3
+
+    @patch.object(IntegrationTestBase, '_write_output_file')
+    @patch.object(IntegrationTestBase, '_run_command')
+    def test_should_return_results_and_write_output_in_order_of_commands(self, mock_run_command, mock_write):
+        def run_command(command, use_shell_session):
+            time.sleep(0.1 if command == 'first' else 0)
+            return (0, command, '')
+
+        mock_run_command.side_effect = run_command
+
+        actual_results = self.test_base.execute_commands_concurrently(['first', 'second'])
+
+        self.assertEqual([(0, 'first', ''), (0, 'second', '')], actual_results)
+        self.assertEqual([call('first', 0, 'first', ''), call('second', 0, 'second', '')],
+                         mock_write.call_args_list)
+        self.assertEqual(5, self.test_base.command_counter)
+        self.assertEqual(call('first', use_shell_session=False), mock_run_command.call_args_list[0])
+
+    @patch.object(IntegrationTestBase, '_write_output_file')
+    @patch.object(IntegrationTestBase, '_run_command', side_effect=OSError('could not execute'))
+    def test_should_raise_exception_of_failed_command(self, mock_run_command, mock_write):
+        self.assertRaises(OSError, self.test_base.execute_commands_concurrently, ['command'])
+        self.assertEqual(None, mock_write.call_args)
@@ -0,0 +1,84 @@
+#   shtub - shell command stub
+#   Copyright (C) 2012-2013 Immobilien Scout GmbH
+#
+#   This program is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   This program is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import patch
+
+from shtub.testbedtemplates import list_entries
+from shtub import testbedtemplates
+
+
+class TestbedTemplatesTests (unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp(prefix='testbed-templates-test-')
+        self.addCleanup(shutil.rmtree, self.base_dir)
+        self.templates = testbedtemplates.TestbedTemplates()
+        self.addCleanup(lambda: self.templates.directory and shutil.rmtree(self.templates.directory))
+
+    def test_should_prepare_template_only_once(self):
+        first_template = self.templates.template(['ssh', 'scp'], 'script')
+        second_template = self.templates.template(['ssh', 'scp'], 'script')
+
+        self.assertTrue(first_template is second_template)
+        self.assertEqual(1, len(os.listdir(self.templates.directory)))
+
+    def test_should_list_parents_before_their_entries(self):
+        template_dir, _ = self.templates.template(['ssh'], 'script')
+
+        actual_entries = list_entries(template_dir)
+
+        self.assertEqual([('directory', 'shtub', None),
+                          ('directory', 'shtub/stub-scripts', None),
+                          ('directory', 'shtub/stubs', None)], actual_entries[:3])
+        self.assertEqual('file', actual_entries[3][0])
+        self.assertEqual(('symlink', 'shtub/stubs/ssh'), actual_entries[4][:2])
+
+    def test_should_clone_template_with_hardlinked_stub_script(self):
+        template_dir, _ = self.templates.template(['ssh', 'scp'], 'script')
+
+        actual = self.templates.clone(self.base_dir, ['ssh', 'scp'], 'script')
+
+        self.assertTrue(actual)
+
+        for command in ['ssh', 'scp']:
+            cloned_stub = os.path.join(self.base_dir, 'shtub', 'stubs', command)
+            template_stub = os.path.join(template_dir, 'shtub', 'stubs', command)
+
+            self.assertTrue(os.path.islink(cloned_stub))
+            self.assertEqual(os.stat(template_stub).st_ino, os.stat(cloned_stub).st_ino)
+            with open(cloned_stub) as stub_file:
+                self.assertEqual('script', stub_file.read())
+
+    def test_should_not_clone_template_into_other_file_system(self):
+        self.templates.template(['ssh'], 'script')
+        real_stat = os.stat
+
+        def stat_on_other_device(path):
+            result = real_stat(path)
+            if path == self.base_dir:
+                return os.stat_result(result[:2] + (result.st_dev + 1,) + result[3:10])
+            return result
+
+        with patch('os.stat', side_effect=stat_on_other_device):
+            actual = self.templates.clone(self.base_dir, ['ssh'], 'script')
+
+        self.assertFalse(actual)
+        self.assertEqual([], os.listdir(self.base_dir))
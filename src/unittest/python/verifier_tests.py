@@ -24,6 +24,7 @@ except ImportError:
     from io import StringIO
 
 from shtub.verification.verifierloader import VerifierLoader, Verifier
+from shtub import JournalException
 from shtub.verification import VerificationException
 from shtub.verification.commandinputverifier import CommandInputVerifier
 from shtub.execution import Execution
@@ -65,6 +66,15 @@ class VerifierLoaderTest (unittest.TestCase):
         self.assertEqual(
             call('/hello/world/shtub/executions'), mock_deserialize.call_args)
 
+    @patch('os.path.exists')
+    @patch('shtub.verification.verifierloader.deserialize_executions')
+    def test_should_raise_exception_when_executions_journal_contains_torn_record(self, mock_deserialize, mock_exists):
+        mock_exists.return_value = True
+        mock_deserialize.side_effect = JournalException('Torn record')
+        verifier = VerifierLoader('/hello/world')
+
+        self.assertRaises(VerificationException, verifier.__enter__)
+
     @patch('os.path.exists')
     @patch('shtub.verification.verifierloader.deserialize_executions')
     def test_should_raise_exception_when_execution_has_not_been_accepted(self, mock_deserialize, mock_exists):
@@ -319,6 +329,15 @@ class CommandInputVerifierTests (unittest.TestCase):
         self.assertRaises(
             VerificationException, wrapper.with_input, 'hello world')
 
+    def test_should_raise_exception_explaining_that_input_has_not_been_captured(self):
+        wrapper = CommandInputVerifier(CommandInput('command', ['-arg1'], None))
+
+        try:
+            wrapper.with_input('stdin')
+            self.fail('VerificationException expected')
+        except VerificationException as exception:
+            self.assertTrue('has not captured stdin' in str(exception))
+
     def test_should_verify_input_using_with_or_and(self):
         command_input = CommandInput(
             'command', ['-arg1', '-arg2', '-arg3'], 'stdin')